@@ -1,10 +1,12 @@
 """Various algorithms that are used in generating the dungeon."""
 import heapq
-import random
+import time
+from array import array
 
 from entities.cell import Cell
 from entities.geometry import Edge, Triangle, Vertex
 from entities.map import Map
+from values import PATH_WEIGHT
 
 
 def get_unique_edges(edges: list) -> list:
@@ -17,16 +19,11 @@ def get_unique_edges(edges: list) -> list:
     Returns:
         list: The filtered list of edges.
     """
-    unique_edges = []
+    counts = {}
+    for edge in edges:
+        counts[edge] = counts.get(edge, 0) + 1
 
-    for i, edge1 in enumerate(edges):
-        unique = True
-        for j, edge2 in enumerate(edges):
-            if i != j and edge1 == edge2:
-                unique = False
-                break
-        if unique:
-            unique_edges.append(edge1)
+    unique_edges = [edge for edge in edges if counts[edge] == 1]
 
     return unique_edges
 
@@ -63,20 +60,94 @@ def add_vertex_and_update(vertex: Vertex, triangles: list) -> list:
     return valid_triangles
 
 
-def bowyer_watson(x_y_coords: list) -> list:
+def add_vertices_vectorized(vertices: list, supertriangle: Triangle) -> list:
+    """Does the same as calling add_vertex_and_update for every vertex, but keeps the
+    circumcenters and circumcircle radii of all triangles in NumPy arrays, so the triangles
+    whose circumcircle contains a new vertex are found with one vectorized comparison.
+    The circumcircles are calculated by the Triangle class and compared with the same
+    floating point operations, so the result is exactly the same.
+
+    Args:
+        vertices (list): The vertices that will be added.
+        supertriangle (Triangle): The triangle that contains all vertices.
+
+    Raises:
+        ImportError: Raised if NumPy is not installed.
+
+    Returns:
+        list: The triangles of the triangulation, in the same order as add_vertex_and_update
+        would return them.
+    """
+    import numpy
+
+    capacity = 2 * len(vertices) + 16
+    centers_x = numpy.empty(capacity)
+    centers_y = numpy.empty(capacity)
+    radii = numpy.empty(capacity)
+    alive = numpy.zeros(capacity, dtype=bool)
+    # triangles are kept in the order they were created, removed triangles are set to None
+    triangles = []
+
+    def add_triangle(triangle: Triangle):
+        nonlocal capacity, centers_x, centers_y, radii, alive
+        if len(triangles) == capacity:
+            capacity *= 2
+            centers_x = numpy.resize(centers_x, capacity)
+            centers_y = numpy.resize(centers_y, capacity)
+            radii = numpy.resize(radii, capacity)
+            alive = numpy.concatenate(
+                (alive, numpy.zeros(capacity - len(alive), dtype=bool)))
+        index = len(triangles)
+        centers_x[index], centers_y[index] = triangle.circumcenter
+        radii[index] = triangle.circumcircle_radius
+        alive[index] = True
+        triangles.append(triangle)
+
+    add_triangle(supertriangle)
+    vertex: Vertex
+    for vertex in vertices:
+        count = len(triangles)
+        dx = centers_x[:count] - vertex.x
+        dy = centers_y[:count] - vertex.y
+        inside = numpy.sqrt(dx * dx + dy * dy) <= radii[:count]
+        edges = []
+        for index in numpy.flatnonzero(inside & alive[:count]):
+            edges.extend(triangles[index].get_edges())
+            triangles[index] = None
+            alive[index] = False
+        edge: Edge
+        for edge in get_unique_edges(edges):
+            add_triangle(Triangle(edge.v0, edge.v1, vertex))
+
+    return [triangle for triangle in triangles if triangle is not None]
+
+
+def bowyer_watson(x_y_coords: list, backend: str = "python") -> list:
     """An implementation of the Bowyer-Watson algorithm.
 
     Args:
         vertices (list): List of (x, y) coordinates (representing rooms)
         that are added to the triangulation.
+        backend (str, optional): "python" checks the triangles one at a time,
+        "numpy" uses add_vertices_vectorized, which is faster for medium amounts of rooms
+        but needs NumPy. Both give the same result. Defaults to "python".
+
+    Raises:
+        ValueError: Raised if the backend is unknown.
 
     Returns:
         list: List of triangles that are in the valid Delaunay triangulation.
     """
-    # converts x,y coordinate pairs into Vertices
+    if backend not in ("python", "numpy"):
+        raise ValueError(f"Unknown triangulation backend: {backend}")
+
+    # converts x,y coordinate pairs into Vertices, one Vertex for each coordinate
+    interned = {}
     vertices = []
     for coord in x_y_coords:
-        vertices.append(Vertex(coord[0], coord[1]))
+        if coord not in interned:
+            interned[coord] = Vertex(coord[0], coord[1])
+        vertices.append(interned[coord])
 
     x_coords = []
     y_coords = []
@@ -93,12 +164,15 @@ def bowyer_watson(x_y_coords: list) -> list:
     st = Triangle(Vertex(smallest_x - 1000, smallest_y - 1000),
                   Vertex(0, largest_y + 1000), Vertex(largest_x + 1000, smallest_y - 1000))
 
-    # the list that will contain all our triangles
-    triangles = [st]
+    if backend == "numpy":
+        triangles = add_vertices_vectorized(vertices, st)
+    else:
+        # the list that will contain all our triangles
+        triangles = [st]
 
-    # adds vertices one at a time, and removes and adds triangles as needed
-    for vertex in vertices:
-        triangles = add_vertex_and_update(vertex, triangles)
+        # adds vertices one at a time, and removes and adds triangles as needed
+        for vertex in vertices:
+            triangles = add_vertex_and_update(vertex, triangles)
 
     st_vertices = [st.v0, st.v1, st.v2]
     # remove supertriangle and all triangles sharing its vertices for the final result
@@ -110,124 +184,404 @@ def bowyer_watson(x_y_coords: list) -> list:
 
 
 class UnionFind:
-    """Used by kruskal's algorithm.
-    Copied from TIRA 2024 course material.
+    """Used by kruskal's algorithm. Based on TIRA 2024 course material.
+    The nodes are the integers 0, ..., size - 1. Finding a root halves the path to it,
+    and a smaller tree is always linked under a larger one, so a long sequence
+    of operations takes practically linear time.
     """
 
-    def __init__(self, nodes: list):
-        self.link = {node: None for node in nodes}
-        self.size = {node: 1 for node in nodes}
+    def __init__(self, size: int):
+        self.link = list(range(size))
+        self.rank = [0] * size
 
-    def find(self, x: Vertex):
-        while self.link[x]:
-            x = self.link[x]
+    def find(self, x: int) -> int:
+        link = self.link
+        while link[x] != x:
+            link[x] = link[link[x]]
+            x = link[x]
         return x
 
-    def union(self, a: Vertex, b: Vertex):
+    def union(self, a: int, b: int) -> bool:
+        """Joins the sets of a and b.
+
+        Returns:
+            bool: True if a and b were in different sets, and False otherwise.
+        """
         a = self.find(a)
         b = self.find(b)
         if a == b:
-            return
+            return False
 
-        if self.size[a] > self.size[b]:
+        if self.rank[a] > self.rank[b]:
             a, b = b, a
         self.link[a] = b
-        self.size[b] += self.size[a]
+        if self.rank[a] == self.rank[b]:
+            self.rank[b] += 1
+        return True
+
+
+def distinct_edges(edges: list) -> list:
+    """Leaves out edges that connect the same 2 vertices as an earlier edge.
+
+    Args:
+        edges (list): The edges, for example 3 from every triangle.
+
+    Returns:
+        list: The first edge between each pair of vertices, in the original order.
+    """
+    unique = {}
+    for edge in edges:
+        unique.setdefault(edge.key(), edge)
+    return list(unique.values())
 
 
 def kruskal(nodes: list, edges: list) -> list:
-    """Creates a minimum spanning tree.
+    """Creates a minimum spanning tree. The nodes are numbered, so that the
+    union-find works on integers, and each pair of nodes is considered only once
+    even if several edges connect it.
 
     Args:
-        nodes (list): List of nodes.
+        nodes (list): List of nodes. Nodes with the same coordinates are the same node.
         edges (list): List of edges connecting the nodes.
 
     Returns:
-        list: The minimum spanning tree.
+        list: The edges of the minimum spanning tree, shortest first.
     """
-    edges.sort(key=lambda x: x.length)
-    uf = UnionFind(nodes)
-    tree_weight = 0
+    ids = {}
+    for node in nodes:
+        ids.setdefault(node, len(ids))
+    uf = UnionFind(len(ids))
     result = []
 
     edge: Edge
-    for edge in edges:
-        node_a, node_b, weight = edge.v0, edge.v1, edge.length
-        if uf.find(node_a) != uf.find(node_b):
-            uf.union(node_a, node_b)
-            tree_weight += weight
+    # sorted is stable, so equally long edges are considered in the given order
+    for edge in sorted(distinct_edges(edges), key=lambda x: x.length):
+        if uf.union(ids[edge.v0], ids[edge.v1]):
             result.append(edge)
+            if len(result) == len(ids) - 1:
+                break
 
     return result
 
 
-def shortest_path_a_star(map: Map, start_cell: Cell, end_cell: Cell) -> list:
+# maps with more cells than this keep the search state in dictionaries, see SparseSearchBuffers
+DENSE_SEARCH_MAX_CELLS = 4_000_000
+
+
+class SearchBuffers:
+    """Flat arrays that shortest_path_a_star reuses between calls on the same map.
+    Instead of clearing the arrays for every search, each search gets a new generation number,
+    and a value in the arrays is only valid if the cell's stamp equals the current generation.
+    This way the cost of starting a search does not depend on the size of the map.
+
+    Attributes:
+        distances (array): Distance from the start cell to every reached cell.
+        previous (array): The cell that every reached cell was reached from.
+        stamps (array): The generation in which each cell was last reached.
+        generation (int): Number of the current search.
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        Args:
+            size (int): Amount of cells on the map.
+        """
+        self.size = size
+        self.distances = array("d", [0]) * size
+        self.previous = array("q", [-1]) * size
+        self.stamps = array("I", [0]) * size
+        self.generation = 0
+
+    def next_generation(self) -> int:
+        """Starts a new search, invalidating the values of every previous search.
+
+        Returns:
+            int: The new generation number.
+        """
+        self.generation += 1
+        if self.generation >= 2**32:
+            self.stamps[:] = array("I", [0]) * len(self.stamps)
+            self.generation = 1
+        return self.generation
+
+
+class _Stamps(dict):
+    """A dictionary where cells that have not been reached have the stamp 0."""
+
+    def __missing__(self, key: int) -> int:
+        return 0
+
+
+class SparseSearchBuffers:
+    """The same search state as SearchBuffers, kept in dictionaries that only hold
+    the cells that the current search has reached. Used for very large maps,
+    where allocating arrays for every cell would take too much memory.
+
+    Attributes:
+        distances (dict): Distance from the start cell to every reached cell.
+        previous (dict): The cell that every reached cell was reached from.
+        stamps (dict): The generation in which each cell was reached.
+        generation (int): Number of the current search.
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        Args:
+            size (int): Amount of cells on the map.
+        """
+        self.size = size
+        self.distances = {}
+        self.previous = {}
+        self.stamps = _Stamps()
+        self.generation = 0
+
+    def next_generation(self) -> int:
+        """Starts a new search, forgetting the cells of the previous search.
+
+        Returns:
+            int: The new generation number.
+        """
+        self.distances.clear()
+        self.previous.clear()
+        self.stamps.clear()
+        self.generation = 1
+        return self.generation
+
+
+def get_search_buffers(map: Map) -> SearchBuffers | SparseSearchBuffers:
+    """Returns the search buffers of the map, creating them if the map does not have
+    buffers for its size yet. On maps with more than DENSE_SEARCH_MAX_CELLS cells,
+    SparseSearchBuffers is used.
+    """
+    size = len(map.grid.weights)
+    if map.search_buffers is None or map.search_buffers.size != size:
+        if size > DENSE_SEARCH_MAX_CELLS:
+            map.search_buffers = SparseSearchBuffers(size)
+        else:
+            map.search_buffers = SearchBuffers(size)
+    return map.search_buffers
+
+
+def shortest_path_a_star(map: Map, start_cell: Cell, end_cell: Cell, stats=None) -> list:
     """Copied from TIRA 2024 course material with some changes. \n
     Calculates the shortest path between start_cell and end_cell. 
     Going through rooms is expensive, and going through existing hallways is cheap.
+    Cells are handled by their index in map.grid, and the search state is kept
+    in the map's SearchBuffers, so only cells that the search reaches are touched.
+    On maps with more than DENSE_SEARCH_MAX_CELLS cells, SparseSearchBuffers is used instead.
 
     Args:
         start_cell (Cell): The cell where the algorithm starts.
         end_cell (Cell): The cell where the algorithm ends.
+        stats (GenerationStats, optional): If given, the amount of expanded and pushed
+        cells is recorded in it. Defaults to None.
 
     Returns:
         list: A list of coordinate tuples that is the shortest path between the 2 cells.
     """
+    started = time.perf_counter() if stats is not None else 0
+    grid = map.grid
+    weights = grid.weights
+    size_x = grid.size_x
+    buffers = get_search_buffers(map)
+    distances = buffers.distances
+    previous = buffers.previous
+    stamps = buffers.stamps
+    generation = buffers.next_generation()
+
+    start = grid.index(start_cell.coords)
+    end = grid.index(end_cell.coords)
+    end_x, end_y = end_cell.coords
+    last_row = len(weights) - size_x
+
+    stamps[start] = generation
+    distances[start] = 0
+    previous[start] = -1
+
+    # ties are broken by the weight of the cell, like Cell.__lt__ does
+    queue = []
+    heapq.heappush(queue, (0, weights[start], start))
 
-    def heuristic(cell1: Cell, cell2: Cell):
-        return abs((cell1.coords[0] - cell2.coords[0]) + (cell1.coords[1] - cell2.coords[1]))
+    pushed = 1
+    visited = set()
+    while queue:
+        index1 = heapq.heappop(queue)[2]
+        if index1 == end:
+            break
+        if index1 in visited:
+            continue
+        visited.add(index1)
 
-    cells = map.cells.values()
-    distances = {}
-    for cell in cells:
-        distances[cell] = float("inf")
+        x = index1 % size_x
+        neighbors = [index1 + size_x if index1 < last_row else -1,
+                     index1 - size_x if index1 >= size_x else -1,
+                     index1 + 1 if x < size_x - 1 else -1,
+                     index1 - 1 if x > 0 else -1]
+        # possibly makes hallway generation more natural
+        map.rng.shuffle(neighbors)
 
-    distances[start_cell] = 0
-    previous = {}
-    previous[start_cell] = None
+        distance1 = distances[index1]
+        for index2 in neighbors:
+            if index2 == -1:
+                continue
+            weight = weights[index2]
+            new_distance = distance1 + weight
+            if stamps[index2] != generation or new_distance < distances[index2]:
+                stamps[index2] = generation
+                distances[index2] = new_distance
+                previous[index2] = index1
+                heuristic = abs((index2 % size_x - end_x) + (index2 // size_x - end_y))
+                heapq.heappush(queue, (new_distance + heuristic, weight, index2))
+                pushed += 1
+
+    if stamps[end] != generation:
+        if stats is not None:
+            stats.record_search(len(visited), pushed, 0,
+                                time.perf_counter() - started)
+        return None
 
-    queue = []
-    heapq.heappush(queue, (0, start_cell))
+    path = []
+    index = end
+    while index != -1:
+        path.append(grid.coords(index))
+        index = previous[index]
+
+    path.reverse()
+    if stats is not None:
+        stats.record_search(len(visited), pushed, len(path),
+                            time.perf_counter() - started)
+    return path
+
+
+# shortest_path_bucket counts costs in units of 1 / COST_SCALE, so that every weight
+# (PATH_WEIGHT 0.5, EMPTY_WEIGHT 1 and ROOM_WEIGHT 3) is a whole number
+COST_SCALE = 2
+# the initial amount of buckets, grown when a cell's priority does not fit
+BUCKET_RING_SIZE = 16
+
+
+def shortest_path_bucket(map: Map, start_cell: Cell, end_cell: Cell, stats=None) -> list:
+    """Calculates the shortest path between start_cell and end_cell like
+    shortest_path_a_star, but keeps the open cells in a bucket queue (Dial's algorithm)
+    instead of a binary heap.
 
+    Costs are multiplied by COST_SCALE and rounded to whole numbers, and the heuristic
+    is the Manhattan distance times the scaled PATH_WEIGHT, which is consistent
+    as long as no cell is cheaper than PATH_WEIGHT. The priority of a new cell is then
+    at most the largest scaled weight plus one higher than the priority being handled,
+    so the queue is a ring of lists indexed by priority: adding and removing a cell
+    takes constant time, and only the cell index is stored, without a tuple.
+    Unlike shortest_path_a_star, the path is always one of the cheapest paths.
+
+    Args:
+        start_cell (Cell): The cell where the algorithm starts.
+        end_cell (Cell): The cell where the algorithm ends.
+        stats (GenerationStats, optional): If given, the amount of expanded and pushed
+        cells is recorded in it. Defaults to None.
+
+    Returns:
+        list: A list of coordinate tuples that is the shortest path between the 2 cells.
+    """
+    started = time.perf_counter() if stats is not None else 0
+    grid = map.grid
+    weights = grid.weights
+    size_x = grid.size_x
+    buffers = get_search_buffers(map)
+    distances = buffers.distances
+    previous = buffers.previous
+    stamps = buffers.stamps
+    generation = buffers.next_generation()
+
+    start = grid.index(start_cell.coords)
+    end = grid.index(end_cell.coords)
+    end_x, end_y = end_cell.coords
+    last_row = len(weights) - size_x
+    step = round(PATH_WEIGHT * COST_SCALE)
+
+    stamps[start] = generation
+    distances[start] = 0
+    previous[start] = -1
+
+    ring_size = BUCKET_RING_SIZE
+    buckets = [[] for _ in range(ring_size)]
+    current = (abs(start % size_x - end_x) + abs(start // size_x - end_y)) * step
+    buckets[current % ring_size].append(start)
+    waiting = 1
+    pushed = 1
     visited = set()
-    while queue:
-        cell1 = heapq.heappop(queue)[1]
-        if cell1 is end_cell:
+    while waiting:
+        bucket = buckets[current % ring_size]
+        if not bucket:
+            current += 1
+            continue
+        index1 = bucket.pop()
+        waiting -= 1
+        if index1 == end:
             break
-        if cell1 in visited:
+        if index1 in visited:
             continue
-        visited.add(cell1)
-
-        neighbor1 = map.get_cell((cell1.coords[0], cell1.coords[1] + 1))
-        neighbor2 = map.get_cell(
-            (cell1.coords[0], cell1.coords[1] - 1))
-        neighbor3 = map.get_cell(
-            (cell1.coords[0] + 1, cell1.coords[1]))
-        neighbor4 = map.get_cell(
-            (cell1.coords[0] - 1, cell1.coords[1]))
-        neighbors = [neighbor1, neighbor2, neighbor3, neighbor4]
+        visited.add(index1)
+
+        x = index1 % size_x
+        neighbors = [index1 + size_x if index1 < last_row else -1,
+                     index1 - size_x if index1 >= size_x else -1,
+                     index1 + 1 if x < size_x - 1 else -1,
+                     index1 - 1 if x > 0 else -1]
         # possibly makes hallway generation more natural
-        random.shuffle(neighbors)
+        map.rng.shuffle(neighbors)
 
-        for cell2 in neighbors:
-            if cell2 is None:
+        # the dense buffers store the distances as floats
+        distance1 = int(distances[index1])
+        for index2 in neighbors:
+            if index2 == -1:
                 continue
-            weight = cell2.weight
-            new_distance = distances[cell1] + weight
-            if new_distance < distances[cell2]:
-                distances[cell2] = new_distance
-                previous[cell2] = cell1
-                new_pair = (new_distance + heuristic(cell2, end_cell), cell2)
-                heapq.heappush(queue, new_pair)
-
-    if distances[end_cell] == float("inf"):
+            new_distance = distance1 + int(weights[index2] * COST_SCALE + 0.5)
+            if stamps[index2] != generation or new_distance < distances[index2]:
+                stamps[index2] = generation
+                distances[index2] = new_distance
+                previous[index2] = index1
+                priority = new_distance + (abs(index2 % size_x - end_x) +
+                                           abs(index2 // size_x - end_y)) * step
+                if priority - current >= ring_size:
+                    buckets, ring_size = _grow_ring(buckets, priority - current + 1,
+                                                    distances, size_x, end_x, end_y, step)
+                buckets[priority % ring_size].append(index2)
+                waiting += 1
+                pushed += 1
+
+    if stamps[end] != generation:
+        if stats is not None:
+            stats.record_search(len(visited), pushed, 0,
+                                time.perf_counter() - started)
         return None
 
     path = []
-    cell = end_cell
-    while cell:
-        path.append(cell.coords)
-        cell = previous[cell]
+    index = end
+    while index != -1:
+        path.append(grid.coords(index))
+        index = previous[index]
 
     path.reverse()
+    if stats is not None:
+        stats.record_search(len(visited), pushed, len(path),
+                            time.perf_counter() - started)
     return path
+
+
+def _grow_ring(buckets: list, needed: int, distances, size_x: int, end_x: int, end_y: int,
+               step: int) -> tuple:
+    """Moves the cells of a bucket ring into a larger ring, when a cell's priority is
+    too far ahead of the current priority for the old ring. Happens only when a cell
+    is heavier than the cells seen so far.
+
+    Returns:
+        tuple: (the new buckets, the new amount of buckets).
+    """
+    ring_size = max(needed, 2 * len(buckets))
+    grown = [[] for _ in range(ring_size)]
+    for bucket in buckets:
+        for index in bucket:
+            priority = distances[index] + \
+                (abs(index % size_x - end_x) + abs(index // size_x - end_y)) * step
+            grown[int(priority) % ring_size].append(index)
+    return grown, ring_size
@@ -0,0 +1,181 @@
+"""Generates many dungeons without the user interface, using every processor core.
+
+Every finished dungeon is written to its own JSON file as soon as it is ready,
+and a summary of the run is printed at the end.
+
+Usage:
+    python src/batch.py --size 100x100 --amount 20 --seeds 0:1000 --output dungeons
+    python src/batch.py --params params.json --seeds 0:100 --workers 4 --output dungeons
+
+A parameter file contains a list of objects with the keys map_size_x, map_size_y, amount,
+and optionally room_min_size, room_max_size, room_exact_size, extra_edges, placement, storage and routing.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from core import GENERATION_ERRORS, generate_dungeon, map_to_dict
+from entities.map import DENSE_STORAGE, PLACEMENT_METHODS, RANDOM_PLACEMENT, STORAGE_TYPES
+from services.generate import A_STAR_ROUTING, ROUTING_METHODS
+from services.pool import MapPool
+from values import DEFAULT_ARGS
+
+# every worker process reuses the map of its previous dungeon if the size is the same
+_maps = MapPool(maxsize=1)
+
+
+def parse_seeds(text: str) -> list:
+    """Parses a seed specification, either a range "start:stop" or a list "1,2,5".
+
+    Args:
+        text (str): The specification.
+
+    Raises:
+        ValueError: Raised if the specification is not valid.
+
+    Returns:
+        list: The seeds.
+    """
+    if ":" in text:
+        start, stop = text.split(":", 1)
+        return list(range(int(start), int(stop)))
+    return [int(seed) for seed in text.split(",") if seed.strip()]
+
+
+def parse_size(text: str) -> tuple:
+    """Parses a map size given in "WIDTHxHEIGHT" format."""
+    width, height = text.lower().split("x", 1)
+    return int(width), int(height)
+
+
+def job_name(params: dict, seed: int) -> str:
+    """Returns the file name of a dungeon without the extension. The name starts with
+    the most important parameters, and ends with a short hash of the whole parameter set,
+    so that parameter sets that differ in any parameter do not overwrite each other.
+    """
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+    return (f'{params["map_size_x"]}x{params["map_size_y"]}_{params["amount"]}rooms_'
+            f'{params.get("room_min_size", -1)}-{params.get("room_max_size", -1)}_'
+            f'{digest[:8]}_seed{seed}')
+
+
+def generate_one(job: tuple) -> dict:
+    """Generates one dungeon and writes it to the output directory.
+    Runs in a worker process.
+
+    Args:
+        job (tuple): (parameters, seed, output directory).
+
+    Returns:
+        dict: Name of the dungeon, whether it succeeded, the error if it did not,
+        and the time it took.
+    """
+    params, seed, output = job
+    name = job_name(params, seed)
+    start = time.perf_counter()
+    map = None
+    try:
+        map = _maps.acquire(params["map_size_x"], params["map_size_y"], params["amount"],
+                            room_min_size=params.get("room_min_size", -1),
+                            room_max_size=params.get("room_max_size", -1),
+                            room_exact_size=params.get("room_exact_size", -1), seed=seed,
+                            placement=params.get("placement", RANDOM_PLACEMENT),
+                            storage=params.get("storage", DENSE_STORAGE))
+        generate_dungeon(map, extra_edges=params.get("extra_edges", True),
+                         routing=params.get("routing", A_STAR_ROUTING))
+    except (*GENERATION_ERRORS, ValueError) as exception:
+        # ValueError comes from an unknown placement, storage or routing in the parameters
+        if map is not None:
+            _maps.release(map)
+        return {"name": name, "ok": False, "error": type(exception).__name__,
+                "seconds": time.perf_counter() - start}
+
+    data = map_to_dict(map)
+    _maps.release(map)
+    path = os.path.join(output, name + ".json")
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    return {"name": name, "ok": True, "error": None, "seconds": time.perf_counter() - start}
+
+
+def run_batch(param_sets: list, seeds: list, output: str, workers: int = None) -> dict:
+    """Generates a dungeon for every combination of parameter set and seed in a process pool.
+
+    Args:
+        param_sets (list): Parameter dictionaries.
+        seeds (list): Seeds that every parameter set is generated with.
+        output (str): Directory that the dungeons are written to.
+        workers (int, optional): Amount of worker processes. Defaults to the amount of cores.
+
+    Returns:
+        dict: The amount of generated and failed dungeons, failures by error type,
+        elapsed time and dungeons generated per second.
+    """
+    os.makedirs(output, exist_ok=True)
+    jobs = ((params, seed, output) for params in param_sets for seed in seeds)
+    total = len(param_sets) * len(seeds)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(32, total // (workers * 8)))
+
+    generated = 0
+    failures = {}
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(generate_one, jobs, chunksize=chunksize):
+            if result["ok"]:
+                generated += 1
+            else:
+                failures[result["error"]] = failures.get(result["error"], 0) + 1
+    elapsed = time.perf_counter() - start
+    return {"generated": generated, "failed": sum(failures.values()), "failures": failures,
+            "seconds": elapsed, "per_second": total / elapsed if elapsed > 0 else 0.0}
+
+
+def main(arguments: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Generates dungeons without the user interface.")
+    parser.add_argument("--params", help="JSON file containing a list of parameter sets")
+    parser.add_argument("--size", default=f'{DEFAULT_ARGS["map_size_x"]}x'
+                        f'{DEFAULT_ARGS["map_size_y"]}', help="map size, for example 100x100")
+    parser.add_argument("--amount", type=int, default=10, help="amount of rooms")
+    parser.add_argument("--room-min-size", type=int, default=-1)
+    parser.add_argument("--room-max-size", type=int, default=-1)
+    parser.add_argument("--room-exact-size", type=int, default=-1)
+    parser.add_argument("--no-extra-edges", action="store_true")
+    parser.add_argument("--placement", choices=PLACEMENT_METHODS, default=RANDOM_PLACEMENT,
+                        help="how rooms are placed (free_space works better on dense maps)")
+    parser.add_argument("--storage", choices=STORAGE_TYPES, default=DENSE_STORAGE,
+                        help="how cells are stored (chunked for very large, mostly empty maps)")
+    parser.add_argument("--routing", choices=ROUTING_METHODS, default=A_STAR_ROUTING,
+                        help="how hallways are searched (hierarchical is faster on large maps)")
+    parser.add_argument("--seeds", default="0:10", help='"start:stop" or "1,2,3"')
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--output", default="dungeons", help="output directory")
+    args = parser.parse_args(arguments)
+
+    if args.params:
+        with open(args.params, encoding="utf-8") as file:
+            param_sets = json.load(file)
+    else:
+        map_size_x, map_size_y = parse_size(args.size)
+        param_sets = [{"map_size_x": map_size_x, "map_size_y": map_size_y,
+                       "amount": args.amount, "room_min_size": args.room_min_size,
+                       "room_max_size": args.room_max_size,
+                       "room_exact_size": args.room_exact_size,
+                       "extra_edges": not args.no_extra_edges,
+                       "placement": args.placement, "storage": args.storage,
+                       "routing": args.routing}]
+
+    summary = run_batch(param_sets, parse_seeds(args.seeds), args.output, args.workers)
+    print(f'Generated {summary["generated"]} dungeons, {summary["failed"]} failed, '
+          f'in {summary["seconds"]:.2f} s ({summary["per_second"]:.1f} dungeons/s)')
+    for error, count in sorted(summary["failures"].items()):
+        print(f"  {error}: {count}")
+    return 0 if summary["generated"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
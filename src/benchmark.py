@@ -0,0 +1,254 @@
+"""Benchmarks for the stages of generate_dungeon.
+
+Runs the generation pipeline for a sweep of map sizes, room amounts and room sizes
+with fixed seeds, times every stage separately and writes the results as JSON.
+The time it takes to import the headless generation core (core.py)
+in a new interpreter is measured too. If a baseline file is given,
+the results are compared against it.
+
+Usage: python src/benchmark.py [--quick] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from entities.map import Map
+from services.generate import GENERATION_ERRORS, generate_dungeon
+from services.stats import GenerationStats
+from values import MAX_MAP_SIZE_X, MAX_MAP_SIZE_Y
+
+STAGES = ["place_rooms", "triangulation", "kruskal", "a_star"]
+
+MAP_SIZES = [50, 100, 250, MAX_MAP_SIZE_X, 2 * MAX_MAP_SIZE_X]
+ROOM_AMOUNTS = [10, 50, 200]
+ROOM_SIZES = [(2, 4), (5, 10)]
+QUICK_MAP_SIZES = [50, 100]
+QUICK_ROOM_AMOUNTS = [10, 30]
+QUICK_ROOM_SIZES = [(2, 4)]
+
+# the module whose cold import time is measured
+CORE_MODULE = "core"
+
+# a stage is reported if it is this many times slower or faster than in the baseline
+REGRESSION_THRESHOLD = 1.25
+IMPROVEMENT_THRESHOLD = 0.8
+
+
+def make_cases(quick: bool = False) -> list:
+    """Returns the parameter sets that are benchmarked. Combinations where
+    the rooms would cover more than a fifth of the map are left out,
+    because placing them fails too often to give stable timings.
+
+    Args:
+        quick (bool, optional): Use a smaller sweep. Defaults to False.
+
+    Returns:
+        list: A list of parameter dictionaries.
+    """
+    sizes = QUICK_MAP_SIZES if quick else MAP_SIZES
+    amounts = QUICK_ROOM_AMOUNTS if quick else ROOM_AMOUNTS
+    room_sizes = QUICK_ROOM_SIZES if quick else ROOM_SIZES
+    cases = []
+    for size in sizes:
+        size_y = size * MAX_MAP_SIZE_Y // MAX_MAP_SIZE_X
+        for amount in amounts:
+            for room_min_size, room_max_size in room_sizes:
+                if amount * room_max_size ** 2 > size * size_y / 5:
+                    continue
+                cases.append({"map_size_x": size, "map_size_y": size_y, "amount": amount,
+                              "room_min_size": room_min_size, "room_max_size": room_max_size})
+    return cases
+
+
+def case_name(params: dict) -> str:
+    return (f'{params["map_size_x"]}x{params["map_size_y"]}_{params["amount"]}rooms_'
+            f'{params["room_min_size"]}-{params["room_max_size"]}')
+
+
+def run_case(params: dict, seed: int) -> dict:
+    """Runs generate_dungeon once and times each stage with GenerationStats.
+
+    Args:
+        params (dict): Parameters of the map.
+        seed (int): Seed for the random number generator.
+
+    Returns:
+        dict: Seconds spent in each stage, the amount of hallways
+        and the counters collected by GenerationStats.
+    """
+    map = Map(params["map_size_x"], params["map_size_y"], params["amount"],
+              room_min_size=params["room_min_size"], room_max_size=params["room_max_size"],
+              seed=seed)
+    stats = GenerationStats()
+    hallways = generate_dungeon(map, stats=stats)
+    timings = {stage: stats.stage_times.get(stage, 0.0) for stage in STAGES}
+    return {"stages": timings, "hallways": len(hallways),
+            "a_star_slowest_hallway": max(hallway["seconds"] for hallway in stats.hallways),
+            "counters": {key: value for key, value in stats.as_dict().items()
+                         if key not in ("stage_times", "hallways", "stage_memory")}}
+
+
+def run_benchmarks(cases: list, seeds: list, repeat: int = 1) -> list:
+    """Runs every case with every seed. The fastest time of the repeats is kept for each stage.
+
+    Args:
+        cases (list): Parameter sets from make_cases.
+        seeds (list): Seeds that every case is run with.
+        repeat (int, optional): How many times each run is repeated. Defaults to 1.
+
+    Returns:
+        list: One result dictionary per case.
+    """
+    results = []
+    for params in cases:
+        stages = dict.fromkeys(STAGES, 0.0)
+        failures = 0
+        hallways = 0
+        slowest_hallway = 0.0
+        counters = {}
+        for seed in seeds:
+            best = None
+            for _ in range(repeat):
+                try:
+                    run = run_case(params, seed)
+                except GENERATION_ERRORS:
+                    failures += 1
+                    break
+                if best is None or sum(run["stages"].values()) < sum(best["stages"].values()):
+                    best = run
+            if best is not None:
+                hallways += best["hallways"]
+                slowest_hallway = max(slowest_hallway, best["a_star_slowest_hallway"])
+                for key, value in best["counters"].items():
+                    counters[key] = counters.get(key, 0) + value
+                for stage in STAGES:
+                    stages[stage] += best["stages"][stage]
+        result = {"name": case_name(params), "params": params, "seeds": seeds,
+                  "stages": stages, "total": sum(stages.values()),
+                  "hallways": hallways, "failures": failures,
+                  "a_star_slowest_hallway": slowest_hallway, "counters": counters}
+        results.append(result)
+        print(f'{result["name"]:<32} total {result["total"]:8.3f} s  ' +
+              "  ".join(f"{stage} {stages[stage]:.3f}" for stage in STAGES), flush=True)
+    return results
+
+
+def compare_to_baseline(results: list, baseline: dict) -> list:
+    """Compares the results to a baseline and prints the stages that changed noticeably.
+
+    Args:
+        results (list): Results from run_benchmarks.
+        baseline (dict): The contents of an earlier results file.
+
+    Returns:
+        list: (case name, stage, ratio) for every stage that got slower than the threshold.
+    """
+    baseline_cases = {case["name"]: case for case in baseline["cases"]}
+    regressions = []
+    for result in results:
+        old = baseline_cases.get(result["name"])
+        if old is None:
+            continue
+        for stage in STAGES + ["total"]:
+            new_time = result["total"] if stage == "total" else result["stages"][stage]
+            old_time = old["total"] if stage == "total" else old["stages"].get(stage, 0)
+            if old_time <= 0.001 and new_time <= 0.001:
+                continue
+            ratio = new_time / old_time if old_time > 0 else float("inf")
+            if ratio >= REGRESSION_THRESHOLD:
+                regressions.append((result["name"], stage, ratio))
+                print(f'SLOWER  {result["name"]:<32} {stage:<14} {old_time:.3f} -> '
+                      f'{new_time:.3f} s ({ratio:.2f}x)')
+            elif ratio <= IMPROVEMENT_THRESHOLD:
+                print(f'FASTER  {result["name"]:<32} {stage:<14} {old_time:.3f} -> '
+                      f'{new_time:.3f} s ({ratio:.2f}x)')
+    return regressions
+
+
+def measure_import_time(module: str = CORE_MODULE, repeat: int = 5) -> float:
+    """Measures how long importing a module takes in a new interpreter,
+    using the timings printed by python -X importtime.
+
+    Args:
+        module (str, optional): The module to import. Defaults to CORE_MODULE.
+        repeat (int, optional): How many interpreters are started. Defaults to 5.
+
+    Raises:
+        RuntimeError: Raised if the module could not be imported.
+
+    Returns:
+        float: The fastest import in seconds, including the modules it imports.
+    """
+    fastest = float("inf")
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                 cwd=os.path.dirname(os.path.abspath(__file__)),
+                                 capture_output=True, text=True, check=False)
+        if process.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{process.stderr}")
+        for line in process.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() == module:
+                fastest = min(fastest, int(parts[1]) / 1_000_000)
+    return fastest
+
+
+def compare_import_time(seconds: float, baseline: dict) -> list:
+    """Compares the import time of the core to a baseline and prints it if it changed noticeably.
+
+    Args:
+        seconds (float): Import time from measure_import_time.
+        baseline (dict): The contents of an earlier results file.
+
+    Returns:
+        list: ("import", module, ratio) if the import got slower than the threshold.
+    """
+    old_time = baseline.get("import_time")
+    if not old_time:
+        return []
+    ratio = seconds / old_time
+    if ratio >= REGRESSION_THRESHOLD:
+        print(f"SLOWER  import {CORE_MODULE:<25} {old_time:.3f} -> {seconds:.3f} s ({ratio:.2f}x)")
+        return [("import", CORE_MODULE, ratio)]
+    if ratio <= IMPROVEMENT_THRESHOLD:
+        print(f"FASTER  import {CORE_MODULE:<25} {old_time:.3f} -> {seconds:.3f} s ({ratio:.2f}x)")
+    return []
+
+
+def main(arguments: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks the dungeon generation stages.")
+    parser.add_argument("--quick", action="store_true", help="run a smaller sweep")
+    parser.add_argument("--seeds", type=int, default=3, help="amount of seeds per case")
+    parser.add_argument("--repeat", type=int, default=1, help="repeats per seed")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="file that the results are written to")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit with status 1 if a stage got slower than the baseline")
+    args = parser.parse_args(arguments)
+
+    import_time = measure_import_time()
+    print(f"import {CORE_MODULE:<25} {import_time:8.3f} s", flush=True)
+    results = run_benchmarks(make_cases(args.quick), list(range(args.seeds)), args.repeat)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                   "import_time": import_time, "cases": results}, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare_import_time(import_time, baseline) + \
+            compare_to_baseline(results, baseline)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
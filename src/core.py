@@ -0,0 +1,25 @@
+"""The dungeon generator without the user interface.
+
+Importing this module only loads the standard library and the generation code,
+never tkinter, matplotlib or numpy, so scripts and worker processes that only
+generate dungeons start quickly. benchmark.py measures how long the import takes.
+
+Example:
+    from core import Map, generate_dungeon
+
+    map = Map(100, 100, 20, seed=1)
+    generate_dungeon(map)
+"""
+from entities.hallway import Hallway
+from entities.map import Map, RoomAmountError, RoomPlacementError, RoomSizeError
+from entities.room import Room
+from services.editing import DungeonEditor
+from services.export import load_map, map_from_dict, map_to_dict, save_map
+from services.generate import (GENERATION_ERRORS, GenerationCancelled, NoTrianglesError,
+                               generate_dungeon, iter_generate_dungeon)
+from services.pool import MapPool
+from services.stats import GenerationStats
+
+__all__ = ["GENERATION_ERRORS", "DungeonEditor", "GenerationCancelled", "GenerationStats",
+           "Hallway", "Map", "MapPool", "NoTrianglesError", "Room", "RoomAmountError", "RoomPlacementError", "RoomSizeError",
+           "generate_dungeon", "iter_generate_dungeon", "load_map", "map_from_dict", "map_to_dict", "save_map"]
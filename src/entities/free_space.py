@@ -0,0 +1,111 @@
+"""Keeps track of the free space on the map, so that rooms can be placed without guessing."""
+import random
+from bisect import bisect_right
+
+
+class FreeSpace:
+    """Stores the free area of the map as a list of maximal free rectangles.
+
+    Every free cell is inside at least one of the rectangles, and no rectangle is
+    inside another one. A room fits at a position exactly when it is completely
+    inside one of the rectangles, so all valid positions for a room can be counted
+    and one of them chosen at random, instead of trying random positions until one is free.
+
+    Attributes:
+        size_x (int): Width of the map.
+        size_y (int): Height of the map.
+        rectangles (list): The free rectangles in (x, y, size_x, size_y) format.
+    """
+
+    def __init__(self, size_x: int, size_y: int) -> None:
+        """
+        Args:
+            size_x (int): Width of the map.
+            size_y (int): Height of the map.
+        """
+        self.size_x = size_x
+        self.size_y = size_y
+        self.rectangles = []
+        self.clear()
+
+    def clear(self) -> None:
+        """Makes the whole map free again."""
+        self.rectangles = [(0, 0, self.size_x, self.size_y)]
+
+    def choose_position(self, size_x: int, size_y: int, rng: random.Random) -> tuple | None:
+        """Chooses a random position where a room of the given size fits.
+
+        Args:
+            size_x (int): Width of the room.
+            size_y (int): Height of the room.
+            rng (random.Random): The random number generator that chooses the position.
+
+        Returns:
+            tuple | None: Bottom left corner of the room in (x, y) format,
+            or None if the room does not fit anywhere.
+        """
+        fitting = []
+        totals = []
+        total = 0
+        for rectangle in self.rectangles:
+            width, height = rectangle[2], rectangle[3]
+            if width >= size_x and height >= size_y:
+                total += (width - size_x + 1) * (height - size_y + 1)
+                fitting.append(rectangle)
+                totals.append(total)
+        if total == 0:
+            return None
+
+        choice = rng.randrange(total)
+        position = bisect_right(totals, choice)
+        x, y, width, _ = fitting[position]
+        offset = choice - (totals[position - 1] if position > 0 else 0)
+        columns = width - size_x + 1
+        return (x + offset % columns, y + offset // columns)
+
+    def occupy(self, bottom_left_coords: tuple, size_x: int, size_y: int) -> None:
+        """Marks a rectangle as used. Every free rectangle that overlaps it is split into
+        the maximal free rectangles on its left, right, lower and upper side.
+
+        Args:
+            bottom_left_coords (tuple): Bottom left corner of the used area in (x, y) format.
+            size_x (int): Width of the used area.
+            size_y (int): Height of the used area.
+        """
+        x, y = bottom_left_coords
+        end_x = x + size_x
+        end_y = y + size_y
+        kept = []
+        pieces = []
+        for rectangle in self.rectangles:
+            free_x, free_y, width, height = rectangle
+            free_end_x = free_x + width
+            free_end_y = free_y + height
+            if x >= free_end_x or end_x <= free_x or y >= free_end_y or end_y <= free_y:
+                kept.append(rectangle)
+                continue
+            if x > free_x:
+                pieces.append((free_x, free_y, x - free_x, height))
+            if end_x < free_end_x:
+                pieces.append((end_x, free_y, free_end_x - end_x, height))
+            if y > free_y:
+                pieces.append((free_x, free_y, width, y - free_y))
+            if end_y < free_end_y:
+                pieces.append((free_x, end_y, width, free_end_y - end_y))
+
+        # the kept rectangles were maximal before and cannot be inside a piece,
+        # so only the pieces have to be checked
+        for index, piece in enumerate(pieces):
+            if any(_contains(rectangle, piece) for rectangle in kept):
+                continue
+            if any(_contains(other, piece) and (other != piece or other_index < index)
+                   for other_index, other in enumerate(pieces) if other_index != index):
+                continue
+            kept.append(piece)
+        self.rectangles = kept
+
+
+def _contains(outer: tuple, inner: tuple) -> bool:
+    """Checks if the rectangle inner is completely inside the rectangle outer."""
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and \
+        inner[0] + inner[2] <= outer[0] + outer[2] and inner[1] + inner[3] <= outer[1] + outer[3]
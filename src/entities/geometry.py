@@ -1,6 +1,5 @@
 """Shapes used by algorithms in algorithms.py."""
 import math
-import uuid
 
 
 class BadTriangleError(Exception):
@@ -8,7 +7,11 @@ class BadTriangleError(Exception):
 
 
 class Vertex:
-    """Represents a node in the network."""
+    """Represents a node in the network.
+    Two vertices are equal if they have the same coordinates.
+    """
+
+    __slots__ = ("x", "y")
 
     def __init__(self, x: int, y: int) -> None:
         """Represents a node in the network.
@@ -19,13 +22,12 @@ class Vertex:
         """
         self.x = x
         self.y = y
-        self.id = uuid.uuid4()
 
     def __eq__(self, other) -> bool:
         return self.x == other.x and self.y == other.y
 
     def __hash__(self) -> int:
-        return int(self.id)
+        return hash((self.x, self.y))
 
     def __str__(self) -> str:
         return f"Vertex ({self.x}, {self.y})"
@@ -41,9 +43,11 @@ class Edge:
         Attributes:
             v0 (Vertex): First vertex.
             v1 (Vertex): Second vertex.
-            length (float): Length of the edge.
+            length (float): Length of the edge. Calculated when it is first needed.
     """
 
+    __slots__ = ("v0", "v1", "_length")
+
     def __init__(self, v0: Vertex, v1: Vertex) -> None:
         """
         Args:
@@ -52,22 +56,45 @@ class Edge:
         """
         self.v0 = v0
         self.v1 = v1
-        self.length = math.sqrt(
-            ((self.v0.x - self.v1.x)**2 + (self.v0.y - self.v1.y)**2))
-        self.id = uuid.uuid4()
+        self._length = None
+
+    @property
+    def length(self) -> float:
+        if self._length is None:
+            self._length = math.sqrt(
+                ((self.v0.x - self.v1.x)**2 + (self.v0.y - self.v1.y)**2))
+        return self._length
+
+    def key(self) -> tuple:
+        """Returns the coordinates of the vertices with the smaller one first,
+        so that the key does not depend on the direction of the edge.
+
+        Returns:
+            tuple: The key in ((x, y), (x, y)) format.
+        """
+        coords0 = (self.v0.x, self.v0.y)
+        coords1 = (self.v1.x, self.v1.y)
+        return (coords0, coords1) if coords0 <= coords1 else (coords1, coords0)
 
     def __eq__(self, other) -> bool:
         return (self.v0 == other.v0 and self.v1 == other.v1) or \
             (self.v0 == other.v1 and self.v1 == other.v0)
 
+    def __hash__(self) -> int:
+        return hash(self.key())
+
     def __str__(self) -> str:
         return f"length: {self.length} vertex 0: ({self.v0}) vertex 1: ({self.v1})"
 
 
 class Triangle:
     """A triangle connecting three vertices together.
+    The edges, the circumcenter and the circumcircle radius
+    are calculated when they are first needed.
     """
 
+    __slots__ = ("v0", "v1", "v2", "_edges", "_circumcenter", "_radius")
+
     def __init__(self, v0: Vertex, v1: Vertex, v2: Vertex) -> None:
         """A triangle connecting three vertices together.
 
@@ -89,13 +116,58 @@ class Triangle:
                 f"The vertices ({v0}), ({v1}), ({v2}) \
                 cannot be made into a triangle, \
                 because they all have the same x - or y-coordinates.")
-        self.edge0 = Edge(v0, v1)
-        self.edge1 = Edge(v1, v2)
-        self.edge2 = Edge(v2, v0)
+        self._edges = None
+        self._circumcenter = None
+        self._radius = None
 
-        self.circumcircle_radius = self.calculate_circumcircle_radius(
-            self.edge0, self.edge1, self.edge2)
-        self.circumcenter = self.calculate_circumcenter(v0, v1, v2)
+    def get_edges(self) -> tuple:
+        """Returns the 3 edges of the triangle.
+
+        Returns:
+            tuple: The edges v0-v1, v1-v2 and v2-v0.
+        """
+        if self._edges is None:
+            self._edges = (Edge(self.v0, self.v1), Edge(
+                self.v1, self.v2), Edge(self.v2, self.v0))
+        return self._edges
+
+    @property
+    def edge0(self) -> Edge:
+        return self.get_edges()[0]
+
+    @property
+    def edge1(self) -> Edge:
+        return self.get_edges()[1]
+
+    @property
+    def edge2(self) -> Edge:
+        return self.get_edges()[2]
+
+    @property
+    def circumcenter(self) -> tuple:
+        if self._circumcenter is None:
+            self._circumcenter = self.calculate_circumcenter(
+                self.v0, self.v1, self.v2)
+        return self._circumcenter
+
+    @property
+    def circumcircle_radius(self) -> float:
+        if self._radius is None:
+            if self._edges is not None:
+                self._radius = self.calculate_circumcircle_radius(
+                    self.edge0, self.edge1, self.edge2)
+            else:
+                # same calculation without creating the Edge objects
+                v0, v1, v2 = self.v0, self.v1, self.v2
+                length0 = math.sqrt((v0.x - v1.x)**2 + (v0.y - v1.y)**2)
+                length1 = math.sqrt((v1.x - v2.x)**2 + (v1.y - v2.y)**2)
+                length2 = math.sqrt((v2.x - v0.x)**2 + (v2.y - v0.y)**2)
+                self._radius = (length0 * length1 * length2) / math.sqrt(
+                    (length0 + length1 + length2) *
+                    (length1 + length2 - length0) *
+                    (length2 + length0 - length1) *
+                    (length0 + length1 - length2))
+        return self._radius
 
     def calculate_circumcircle_radius(self, edge0: Edge, edge1: Edge, edge2: Edge) -> float:
         """Calculates the radius of the circumcircle of the triangle. 
@@ -150,8 +222,9 @@ class Triangle:
         Returns:
             bool: True if vertex is inside the circumcircle, and False otherwise.
         """
-        dx = self.circumcenter[0] - vertex.x
-        dy = self.circumcenter[1] - vertex.y
+        center_x, center_y = self.circumcenter
+        dx = center_x - vertex.x
+        dy = center_y - vertex.y
         return math.sqrt(dx * dx + dy * dy) <= self.circumcircle_radius
 
     def __str__(self) -> str:
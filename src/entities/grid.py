@@ -0,0 +1,302 @@
+"""Storage for the weights of the cells on the map."""
+from array import array
+from collections.abc import Mapping
+
+from entities.cell import Cell
+
+# WeightGrid.fill writes this many weights at a time, so it never allocates a whole grid
+FILL_BLOCK = 4096
+
+
+class WeightGrid:
+    """Stores the weight of every cell on the map in one contiguous array.
+
+    The cells are stored row by row, so the weight of the cell at (x, y)
+    is found at index y * size_x + x.
+
+    Attributes:
+        size_x (int): Width of the grid.
+        size_y (int): Height of the grid.
+        weights (array | memoryview): The weights of all cells.
+    """
+
+    def __init__(self, size_x: int, size_y: int, weight: float = 1,
+                 weights: array | memoryview = None) -> None:
+        """
+        Args:
+            size_x (int): Width of the grid.
+            size_y (int): Height of the grid.
+            weight (float, optional): Initial weight of every cell. Defaults to 1.
+            weights (array | memoryview, optional): Existing weights that the grid uses
+            as its storage instead of allocating a new array, for example a memoryview
+            of a memory-mapped file cast to "d". weight is ignored if this is given.
+            Defaults to None.
+
+        Raises:
+            ValueError: Raised if weights does not have exactly size_x * size_y values.
+        """
+        self.size_x = size_x
+        self.size_y = size_y
+        if weights is None:
+            weights = array("d", [weight]) * (size_x * size_y)
+        elif len(weights) != size_x * size_y:
+            raise ValueError(
+                f"Expected {size_x * size_y} weights, got {len(weights)}")
+        self.weights = weights
+
+    def contains(self, coords: tuple) -> bool:
+        """Checks if the given coordinates are inside the grid.
+
+        Args:
+            coords (tuple): Coordinates in (x, y) format.
+
+        Returns:
+            bool: True if the coordinates are inside the grid, and False otherwise.
+        """
+        return 0 <= coords[0] < self.size_x and 0 <= coords[1] < self.size_y
+
+    def index(self, coords: tuple) -> int:
+        """Converts (x, y) coordinates into an index of the weight array.
+
+        Args:
+            coords (tuple): Coordinates in (x, y) format.
+
+        Returns:
+            int: The index of the cell.
+        """
+        return coords[1] * self.size_x + coords[0]
+
+    def coords(self, index: int) -> tuple:
+        """Converts an index of the weight array into (x, y) coordinates.
+
+        Args:
+            index (int): The index of the cell.
+
+        Returns:
+            tuple: Coordinates in (x, y) format.
+        """
+        return (index % self.size_x, index // self.size_x)
+
+    def get_weight(self, coords: tuple) -> float:
+        """Returns the weight of the cell at the given coordinates."""
+        return self.weights[coords[1] * self.size_x + coords[0]]
+
+    def set_weight(self, coords: tuple, weight: float) -> None:
+        """Changes the weight of the cell at the given coordinates."""
+        self.weights[coords[1] * self.size_x + coords[0]] = weight
+
+    def fill(self, weight: float) -> None:
+        """Gives every cell in the grid the same weight.
+
+        Args:
+            weight (float): The new weight.
+        """
+        size = len(self.weights)
+        block = array("d", [weight]) * min(size, FILL_BLOCK)
+        for start in range(0, size, FILL_BLOCK):
+            end = min(start + FILL_BLOCK, size)
+            self.weights[start:end] = block if end - start == len(block) else block[:end - start]
+
+    def fill_rect(self, bottom_left_coords: tuple, size_x: int, size_y: int,
+                  weight: float) -> None:
+        """Gives every cell inside a rectangle the same weight.
+
+        Args:
+            bottom_left_coords (tuple): Bottom left corner of the rectangle in (x, y) format.
+            size_x (int): Width of the rectangle.
+            size_y (int): Height of the rectangle.
+            weight (float): The new weight.
+        """
+        row = array("d", [weight]) * size_x
+        x, y = bottom_left_coords
+        for row_y in range(y, y + size_y):
+            start = row_y * self.size_x + x
+            self.weights[start:start + size_x] = row
+
+
+# tiles of a ChunkedWeightGrid are TILE_SIZE x TILE_SIZE cells
+TILE_BITS = 6
+TILE_SIZE = 1 << TILE_BITS
+TILE_MASK = TILE_SIZE - 1
+
+
+class ChunkedWeights:
+    """The weights of a ChunkedWeightGrid, indexed like WeightGrid.weights.
+    Reading a cell of a tile that has not been allocated returns the default weight.
+    Slices are not supported.
+    """
+
+    __slots__ = ("_grid",)
+
+    def __init__(self, grid: "ChunkedWeightGrid") -> None:
+        self._grid = grid
+
+    def __len__(self) -> int:
+        return self._grid.size_x * self._grid.size_y
+
+    def __getitem__(self, index: int) -> float:
+        grid = self._grid
+        y, x = divmod(index, grid.size_x)
+        tile = grid.tiles.get((y >> TILE_BITS) * grid.tiles_x + (x >> TILE_BITS))
+        if tile is None:
+            return grid.default
+        return tile[((y & TILE_MASK) << TILE_BITS) | (x & TILE_MASK)]
+
+    def __setitem__(self, index: int, weight: float) -> None:
+        grid = self._grid
+        grid.set_weight(grid.coords(index), weight)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+class ChunkedWeightGrid(WeightGrid):
+    """A WeightGrid for very large, mostly empty maps. The map is divided into
+    TILE_SIZE x TILE_SIZE tiles, and a tile is allocated only when one of its cells
+    gets a weight other than the default, so memory grows with the rooms and hallways
+    instead of with the area of the map. Cells are indexed like in WeightGrid.
+
+    Attributes:
+        size_x (int): Width of the grid.
+        size_y (int): Height of the grid.
+        default (float): Weight of every cell in a tile that has not been allocated.
+        tiles (dict): The allocated tiles by tile number, each an array of weights row by row.
+        tiles_x (int): Amount of tiles in each row of tiles.
+        weights (ChunkedWeights): The weights of all cells by index.
+    """
+
+    def __init__(self, size_x: int, size_y: int, weight: float = 1) -> None:
+        """
+        Args:
+            size_x (int): Width of the grid.
+            size_y (int): Height of the grid.
+            weight (float, optional): Initial weight of every cell. Defaults to 1.
+        """
+        # the base constructor is not called, because it would allocate every cell
+        self.size_x = size_x
+        self.size_y = size_y
+        self.default = weight
+        self.tiles = {}
+        self.tiles_x = (size_x + TILE_MASK) >> TILE_BITS
+        self.weights = ChunkedWeights(self)
+
+    def _tile(self, x: int, y: int) -> array:
+        """Returns the tile that contains the cell at (x, y), allocating it if needed."""
+        key = (y >> TILE_BITS) * self.tiles_x + (x >> TILE_BITS)
+        tile = self.tiles.get(key)
+        if tile is None:
+            tile = self.tiles[key] = array("d", [self.default]) * (TILE_SIZE * TILE_SIZE)
+        return tile
+
+    def get_weight(self, coords: tuple) -> float:
+        """Returns the weight of the cell at the given coordinates."""
+        x, y = coords
+        tile = self.tiles.get((y >> TILE_BITS) * self.tiles_x + (x >> TILE_BITS))
+        if tile is None:
+            return self.default
+        return tile[((y & TILE_MASK) << TILE_BITS) | (x & TILE_MASK)]
+
+    def set_weight(self, coords: tuple, weight: float) -> None:
+        """Changes the weight of the cell at the given coordinates."""
+        x, y = coords
+        if weight == self.default and \
+                (y >> TILE_BITS) * self.tiles_x + (x >> TILE_BITS) not in self.tiles:
+            return
+        self._tile(x, y)[((y & TILE_MASK) << TILE_BITS) | (x & TILE_MASK)] = weight
+
+    def fill(self, weight: float) -> None:
+        """Gives every cell in the grid the same weight, releasing every tile.
+
+        Args:
+            weight (float): The new weight.
+        """
+        self.tiles.clear()
+        self.default = weight
+
+    def fill_rect(self, bottom_left_coords: tuple, size_x: int, size_y: int,
+                  weight: float) -> None:
+        """Gives every cell inside a rectangle the same weight.
+
+        Args:
+            bottom_left_coords (tuple): Bottom left corner of the rectangle in (x, y) format.
+            size_x (int): Width of the rectangle.
+            size_y (int): Height of the rectangle.
+            weight (float): The new weight.
+        """
+        x, y = bottom_left_coords
+        for row_y in range(y, y + size_y):
+            start_x = x
+            while start_x < x + size_x:
+                # the part of the row that is inside one tile
+                end_x = min(x + size_x, (start_x | TILE_MASK) + 1)
+                start = ((row_y & TILE_MASK) << TILE_BITS) | (start_x & TILE_MASK)
+                self._tile(start_x, row_y)[start:start + end_x - start_x] = \
+                    array("d", [weight]) * (end_x - start_x)
+                start_x = end_x
+
+    def allocated_cells(self) -> int:
+        """Returns how many cells have memory allocated for their weight."""
+        return len(self.tiles) * TILE_SIZE * TILE_SIZE
+
+
+class GridCell(Cell):
+    """A Cell that reads and writes its weight directly from a WeightGrid.
+    Two GridCells are equal if they have the same coordinates.
+    """
+
+    def __init__(self, grid: WeightGrid, x: int, y: int) -> None:
+        """
+        Args:
+            grid (WeightGrid): The grid that holds the weight of the cell.
+            x (int): x-coordinate of the cell.
+            y (int): y-coordinate of the cell.
+        """
+        # the base constructor is not called, because it would write the weight back to the grid
+        self.coords = (x, y)
+        self._grid = grid
+        self._index = grid.index((x, y))
+
+    @property
+    def weight(self) -> float:
+        return self._grid.weights[self._index]
+
+    @weight.setter
+    def weight(self, weight: float) -> None:
+        self._grid.weights[self._index] = weight
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Cell) and self.coords == other.coords
+
+    def __hash__(self) -> int:
+        return hash(self.coords)
+
+
+class CellView(Mapping):
+    """A dictionary-like view of a WeightGrid that maps (x, y) coordinates to Cell objects.
+    The Cell objects are created only when they are asked for. Cells cannot be added
+    or removed, but changing the weight of a Cell changes the weight in the grid.
+    """
+
+    def __init__(self, grid: WeightGrid) -> None:
+        """
+        Args:
+            grid (WeightGrid): The grid that is viewed.
+        """
+        self._grid = grid
+
+    def __getitem__(self, coords: tuple) -> GridCell:
+        if not self._grid.contains(coords):
+            raise KeyError(coords)
+        return GridCell(self._grid, coords[0], coords[1])
+
+    def __contains__(self, coords: object) -> bool:
+        return isinstance(coords, tuple) and len(coords) == 2 and self._grid.contains(coords)
+
+    def __iter__(self):
+        for x in range(self._grid.size_x):
+            for y in range(self._grid.size_y):
+                yield (x, y)
+
+    def __len__(self) -> int:
+        return self._grid.size_x * self._grid.size_y
@@ -1,10 +1,93 @@
+from array import array
+
+# a run is stored as these five integers: x, y, step x, step y, amount of cells
+RUN_LENGTH = 5
+
+
 class Hallway:
-    """Connects rooms together."""
+    """Connects rooms together.
+
+    The cells are kept in the order of the path, from the first room to the second one,
+    as runs of cells where every cell is one step in the same direction from the previous
+    one. A straight part of a hallway is a single run, so a hallway takes a few integers
+    per turn instead of a tuple per cell.
 
-    def __init__(self, coords: list) -> None:
+    Attributes:
+        runs (array): The runs as RUN_LENGTH integers each, see RUN_LENGTH.
+        length (int): Amount of cells in the hallway.
+        ends (tuple): Bottom left corners of the two rooms that the hallway connects,
+        or None if they are not known.
+    """
+
+    def __init__(self, coords: list, ends: tuple = None) -> None:
         """Connects rooms together.
 
         Args:
-            coords (list): List of coordinates in (x, y) format that make up the hallway.
+            coords (list): List of coordinates in (x, y) format that make up the hallway,
+            in the order of the path.
+            ends (tuple, optional): Bottom left corners of the two rooms that the hallway
+            connects, in ((x, y), (x, y)) format with the smaller coordinates first.
+            Defaults to None, if they are not known.
+        """
+        runs = array("i")
+        length = 0
+        start_x = start_y = last_x = last_y = step_x = step_y = count = 0
+        for x, y in coords:
+            if count > 1 and x - last_x == step_x and y - last_y == step_y:
+                count += 1
+            elif count == 1:
+                step_x, step_y = x - last_x, y - last_y
+                count = 2
+            else:
+                if count:
+                    runs.extend((start_x, start_y, step_x, step_y, count))
+                start_x, start_y = x, y
+                step_x = step_y = 0
+                count = 1
+            last_x, last_y = x, y
+            length += 1
+        if count:
+            runs.extend((start_x, start_y, step_x, step_y, count))
+        self.runs = runs
+        self.length = length
+        self.ends = ends
+
+    @classmethod
+    def from_runs(cls, runs: array, ends: tuple = None) -> "Hallway":
+        """Creates a hallway from runs made by another hallway, without going
+        through the cells one by one.
+
+        Args:
+            runs (array): The runs as RUN_LENGTH integers each.
+            ends (tuple, optional): Same as in the constructor. Defaults to None.
+
+        Returns:
+            Hallway: The hallway.
         """
-        self.coords = sorted(coords)
+        hallway = cls([], ends)
+        hallway.runs = array("i", runs)
+        hallway.length = sum(runs[RUN_LENGTH - 1::RUN_LENGTH])
+        return hallway
+
+    def __iter__(self):
+        """Yields the coordinates of the cells in the order of the path."""
+        runs = self.runs
+        for i in range(0, len(runs), RUN_LENGTH):
+            x, y, step_x, step_y, count = runs[i:i + RUN_LENGTH]
+            for _ in range(count):
+                yield (x, y)
+                x += step_x
+                y += step_y
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def path(self) -> list:
+        """The coordinates of the cells in the order of the path."""
+        return list(self)
+
+    @property
+    def coords(self) -> list:
+        """The coordinates of the cells in sorted order."""
+        return sorted(self)
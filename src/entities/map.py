@@ -1,14 +1,29 @@
 import random
 
 from entities.cell import Cell
+from entities.free_space import FreeSpace
 from entities.geometry import Vertex
+from entities.grid import CellView, ChunkedWeightGrid, WeightGrid
 from entities.hallway import Hallway
 from values import DEFAULT_ARGS, EMPTY_WEIGHT, PATH_WEIGHT, ROOM_WEIGHT
 
 from .room import Room
+from .room_index import RoomIndex
 
 ROOM_PLACEMENT_TRIES = 700
 ROOM_PLACEMENT_STRIKES = 10
+# random positions that are tried for a room before the free space is searched
+FREE_SPACE_RANDOM_TRIES = 20
+
+# ways to place the rooms, see Map.place_rooms
+RANDOM_PLACEMENT = "random"
+FREE_SPACE_PLACEMENT = "free_space"
+PLACEMENT_METHODS = (RANDOM_PLACEMENT, FREE_SPACE_PLACEMENT)
+
+# ways to store the cell weights, see Map
+DENSE_STORAGE = "dense"
+CHUNKED_STORAGE = "chunked"
+STORAGE_TYPES = (DENSE_STORAGE, CHUNKED_STORAGE)
 
 
 class RoomSizeError(Exception):
@@ -49,7 +64,9 @@ class Map:
 
     def __init__(self, size_x: int, size_y: int, amount: int,
                  room_min_size: int = -1, room_max_size: int = -1,
-                 room_exact_size: int = -1) -> None:
+                 room_exact_size: int = -1, seed: int = None,
+                 rng: random.Random = None, grid: WeightGrid = None,
+                 placement: str = RANDOM_PLACEMENT, storage: str = DENSE_STORAGE) -> None:
         """Holds all placed rooms and hallways.
 
         Args:
@@ -60,14 +77,46 @@ class Map:
             room_max_size (int, optional): Maximum size of rooms
             room_exact_size (int, optional): Exact size of rooms. 
             If used, room_min_size and room_max_size do nothing.
+            seed (int, optional): Seed for the map's random number generator.
+            The same seed and parameters always produce the same dungeon. Defaults to None.
+            rng (random.Random, optional): The random number generator that is used
+            for everything that is generated on this map. If given, seed is ignored.
+            Defaults to a new random.Random(seed).
+            grid (WeightGrid, optional): Grid that holds the cell weights, for example
+            one that is backed by a loaded file. Its contents are used as they are.
+            Defaults to a new grid of empty cells.
+            placement (str, optional): How rooms are placed, RANDOM_PLACEMENT or
+            FREE_SPACE_PLACEMENT. See place_rooms. Defaults to RANDOM_PLACEMENT.
+            storage (str, optional): DENSE_STORAGE stores the weight of every cell in one array.
+            CHUNKED_STORAGE stores them in tiles that are allocated only where rooms and
+            hallways are, for very large maps. Ignored if grid is given. Defaults to DENSE_STORAGE.
+
+        Raises:
+            ValueError: Raised if placement is not one of PLACEMENT_METHODS,
+            or storage is not one of STORAGE_TYPES.
         """
+        if placement not in PLACEMENT_METHODS:
+            raise ValueError(f"Unknown placement method {placement!r}")
+        if storage not in STORAGE_TYPES:
+            raise ValueError(f"Unknown storage type {storage!r}")
+        self.placement = placement
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
         self.size_x = size_x
         self.size_y = size_y
-        self.cells = {(x, y): Cell(x, y, EMPTY_WEIGHT)
-                      for x in range(size_x) for y in range(size_y)}
+        if grid is None:
+            grid_type = ChunkedWeightGrid if storage == CHUNKED_STORAGE else WeightGrid
+            grid = grid_type(size_x, size_y, EMPTY_WEIGHT)
+        self.grid = grid
+        self.storage = CHUNKED_STORAGE if isinstance(grid, ChunkedWeightGrid) else DENSE_STORAGE
+        self.cells = CellView(self.grid)
+        # reused by shortest_path_a_star, created when it is first needed
+        self.search_buffers = None
         self.created_rooms = []
         self.placed_rooms = []
         self.added_hallways = []
+        # how many added hallways go through each cell, by coordinates
+        self.corridor_cells = {}
 
         try:
             self.check_args(amount,
@@ -77,14 +126,56 @@ class Map:
         except (RoomSizeError, RoomAmountError) as exception:
             raise exception
 
+        self.room_index = RoomIndex(
+            max(self.room_max_size, self.room_exact_size))
+        # built by place_rooms_in_free_space only when it is needed
+        self.free_space = None
+        self.create_rooms()
+
+    def reset(self, amount: int, room_min_size: int = -1, room_max_size: int = -1,
+              room_exact_size: int = -1, seed: int = None, rng: random.Random = None,
+              placement: str = RANDOM_PLACEMENT) -> None:
+        """Prepares the map for generating a new dungeon of the same size, as if it was
+        created again with these arguments. The weight grid, the search buffers of
+        shortest_path_a_star and the other containers are cleared and reused
+        instead of allocated again, so generating many dungeons one after another
+        does not allocate a new grid for each of them.
+
+        Args:
+            amount (int): Amount of rooms.
+            room_min_size (int, optional): Minimum size of rooms.
+            room_max_size (int, optional): Maximum size of rooms.
+            room_exact_size (int, optional): Exact size of rooms.
+            seed (int, optional): Seed for a new random number generator. Defaults to None.
+            rng (random.Random, optional): The random number generator to use.
+            If given, seed is ignored. Defaults to a new random.Random(seed).
+            placement (str, optional): How rooms are placed. Defaults to RANDOM_PLACEMENT.
+
+        Raises:
+            ValueError: Raised if placement is not one of PLACEMENT_METHODS.
+            RoomSizeError: Raised if a room size argument is invalid.
+            RoomAmountError: Raised if amount of rooms is invalid.
+        """
+        if placement not in PLACEMENT_METHODS:
+            raise ValueError(f"Unknown placement method {placement!r}")
+        self.check_args(amount, room_min_size, room_max_size, room_exact_size)
+        self.placement = placement
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.added_hallways.clear()
+        self.corridor_cells.clear()
+        bucket_size = max(self.room_max_size, self.room_exact_size)
+        if self.room_index.bucket_size != max(1, bucket_size):
+            self.room_index = RoomIndex(bucket_size)
+        self.reset_placement()
         self.create_rooms()
 
     def reset_placement(self) -> None:
         """Resets map state."""
         self.placed_rooms.clear()
-        self.cells = {(x, y): Cell(x, y, EMPTY_WEIGHT)
-                      for x in range(self.size_x)
-                      for y in range(self.size_y)}
+        self.room_index.clear()
+        self.free_space = None
+        self.grid.fill(EMPTY_WEIGHT)
 
     def check_args(self, amount: int, room_min_size: int, room_max_size: int,
                    room_exact_size: int) -> None:
@@ -175,9 +266,9 @@ class Map:
                 room_size_x = self.room_exact_size
                 room_size_y = self.room_exact_size
             else:
-                room_size_x = random.randint(
+                room_size_x = self.rng.randint(
                     self.room_min_size, self.room_max_size)
-                room_size_y = random.randint(
+                room_size_y = self.rng.randint(
                     self.room_min_size, self.room_max_size)
             new_room = Room(room_size_x, room_size_y)
             rooms.append(new_room)
@@ -192,22 +283,69 @@ class Map:
         Returns:
             Room | bool: Returns the placed room if there was room for it, otherwise False.
         """
-        x_coord = random.randint(0, self.size_x - room.size_x)
-        y_coord = random.randint(0, self.size_y - room.size_y)
+        x_coord = self.rng.randint(0, self.size_x - room.size_x)
+        y_coord = self.rng.randint(0, self.size_y - room.size_y)
         room.bottom_left_coords = (x_coord, y_coord)
+        return self.add_room(room)
 
-        for coord in room.get_all_coords():
-            placed_room: Room
-            for placed_room in self.placed_rooms:
-                if placed_room.covers(coord):  # if rooms overlap
-                    return False
+    def add_room(self, room: Room) -> Room | bool:
+        """Places a room at its bottom_left_coords, if it does not overlap other rooms.
+
+        Args:
+            room (Room): The room to be placed. Its bottom_left_coords must be set.
+
+        Returns:
+            Room | bool: Returns the placed room if there was room for it, otherwise False.
+        """
+        if not self.room_index.is_free(room.bottom_left_coords, room.size_x, room.size_y):
+            return False
 
         self.placed_rooms.append(room)
-        for coord in room.get_all_coords():
-            self.cells[coord] = Cell(coord[0], coord[1], ROOM_WEIGHT)
+        self.room_index.add(room)
+        if self.free_space is not None:
+            self.free_space.occupy(room.bottom_left_coords, room.size_x, room.size_y)
+        self.grid.fill_rect(room.bottom_left_coords,
+                            room.size_x, room.size_y, ROOM_WEIGHT)
+        if self.corridor_cells:
+            # hallways that already go through the room keep their weight
+            for coord in room.get_all_coords():
+                if coord in self.corridor_cells:
+                    self.grid.set_weight(coord, PATH_WEIGHT)
 
         return room
 
+    def remove_room(self, room: Room) -> None:
+        """Removes a placed room from the map. Its cells become empty,
+        except the ones that hallways go through.
+
+        Args:
+            room (Room): The room to remove.
+
+        Raises:
+            ValueError: Raised if the room has not been placed on this map.
+        """
+        self.placed_rooms.remove(room)
+        self.room_index.remove(room)
+        # the free rectangles cannot grow, so they are collected again when needed
+        self.free_space = None
+        for coord in room.get_all_coords():
+            self.update_weight(coord)
+
+    def update_weight(self, coord: tuple) -> None:
+        """Gives a cell the weight of what is on it. Hallways are stronger than rooms,
+        and rooms are stronger than empty space.
+
+        Args:
+            coord (tuple): Coordinates of the cell in (x, y) format.
+        """
+        if coord in self.corridor_cells:
+            weight = PATH_WEIGHT
+        elif not self.room_index.is_free(coord, 1, 1):
+            weight = ROOM_WEIGHT
+        else:
+            weight = EMPTY_WEIGHT
+        self.grid.set_weight(coord, weight)
+
     def add_hallway(self, hallway: Hallway):
         """Adds a hallway to the map.
 
@@ -215,51 +353,155 @@ class Map:
             hallway (Hallway): The hallway that will be added.
         """
         self.added_hallways.append(hallway)
-        for coord in hallway.coords:
-            self.cells[coord] = Cell(coord[0], coord[1], PATH_WEIGHT)
+        corridor_cells = self.corridor_cells
+        for coord in hallway:
+            corridor_cells[coord] = corridor_cells.get(coord, 0) + 1
+            self.grid.set_weight(coord, PATH_WEIGHT)
 
-    def place_rooms(self) -> None:
+    def remove_hallway(self, hallway: Hallway) -> None:
+        """Removes an added hallway from the map. Its cells get back the weight
+        of what is under them, unless another hallway goes through them.
+
+        Args:
+            hallway (Hallway): The hallway to remove.
+
+        Raises:
+            ValueError: Raised if the hallway has not been added to this map.
+        """
+        self.added_hallways.remove(hallway)
+        corridor_cells = self.corridor_cells
+        for coord in hallway:
+            if corridor_cells[coord] == 1:
+                del corridor_cells[coord]
+                self.update_weight(coord)
+            else:
+                corridor_cells[coord] -= 1
+
+    def place_rooms(self, stats=None) -> None:
         """Places rooms on the map.
 
+        With RANDOM_PLACEMENT, every room is tried at random positions until it fits.
+        After ROOM_PLACEMENT_TRIES failed tries all rooms are removed and created again,
+        and after ROOM_PLACEMENT_STRIKES such restarts placement fails.
+        With FREE_SPACE_PLACEMENT, see place_rooms_in_free_space.
+
+        Args:
+            stats (GenerationStats, optional): If given, the amount of placement tries
+            and strikes is added to it. Defaults to None.
+
         Raises:
             RoomSizeError: Raised if room size parameters are invalid.
             RoomAmountError: Raised if room amount parameter is invalid.
             RoomPlacementError: Raised if rooms cannot be placed on the map in reasonable time.
         """
+        if self.placement == FREE_SPACE_PLACEMENT:
+            self.place_rooms_in_free_space(stats)
+            return
 
         self.reset_placement()
         tries = 0
+        total_tries = 0
         strikes = 0
         index = 0
-        while True:
-            tries += 1
-            if tries >= ROOM_PLACEMENT_TRIES:
+        try:
+            while True:
+                tries += 1
+                total_tries += 1
+                if tries >= ROOM_PLACEMENT_TRIES:
+                    self.reset_placement()
+                    self.create_rooms()
+                    tries = 0
+                    strikes += 1
+                    if strikes == ROOM_PLACEMENT_STRIKES:
+                        raise RoomPlacementError(
+                            "Rooms cannot be placed in reasonable time, " +
+                            "try adjusting room amount or room size.")
+                    index = 0
+                    continue
+                placed = self.place_new_room(self.created_rooms[index])
+                if placed:
+                    index += 1
+                    if index == len(self.created_rooms):
+                        if len(self.created_rooms) == 3:
+                            vertex1, vertex2, vertex3 = convert_rooms_to_vertices(
+                                self.placed_rooms)
+                            parallel = self.check_parallel(
+                                vertex1, vertex2, vertex3)
+                            if parallel:
+                                self.reset_placement()
+                                strikes += 1
+                                if strikes == ROOM_PLACEMENT_STRIKES:
+                                    raise RoomPlacementError(
+                                        "Rooms cannot be placed in reasonable time, " +
+                                        "try adjusting room amount or room size.")
+                                index = 0
+                                continue
+                        break
+        finally:
+            if stats is not None:
+                stats.placement_tries += total_tries
+                stats.placement_strikes += strikes
+
+    def place_rooms_in_free_space(self, stats=None) -> None:
+        """Places rooms on the map, largest rooms first, so that every room
+        takes a bounded amount of work.
+
+        A room is first tried at FREE_SPACE_RANDOM_TRIES random positions, which is fast
+        while the map is mostly empty. If none of them is free, the free rectangles
+        of the map are collected into self.free_space, and the room is placed at a random
+        position chosen among all positions where it fits. After that the free space is kept
+        up to date for the rest of the rooms. Only if a room does not fit anywhere,
+        the rooms are created again, at most ROOM_PLACEMENT_STRIKES times.
+
+        Args:
+            stats (GenerationStats, optional): If given, the amount of placement tries
+            and strikes is added to it. Defaults to None.
+
+        Raises:
+            RoomPlacementError: Raised immediately if the rooms cover more cells than
+            the map has, or if they could not be placed after ROOM_PLACEMENT_STRIKES restarts.
+        """
+        tries = 0
+        strikes = 0
+        try:
+            while True:
                 self.reset_placement()
-                self.create_rooms()
-                tries = 0
+                if sum(room.area for room in self.created_rooms) > self.size_x * self.size_y:
+                    raise RoomPlacementError(
+                        "Rooms cannot fit on the map, " +
+                        "try adjusting room amount or room size.")
+                rooms = sorted(self.created_rooms, key=lambda room: room.area, reverse=True)
+                for room in rooms:
+                    if self.free_space is None:
+                        for _ in range(FREE_SPACE_RANDOM_TRIES):
+                            tries += 1
+                            if self.place_new_room(room):
+                                break
+                        else:
+                            self.free_space = FreeSpace(self.size_x, self.size_y)
+                            for placed_room in self.placed_rooms:
+                                self.free_space.occupy(placed_room.bottom_left_coords,
+                                                       placed_room.size_x, placed_room.size_y)
+                    if self.free_space is not None:
+                        tries += 1
+                        coords = self.free_space.choose_position(
+                            room.size_x, room.size_y, self.rng)
+                        if coords is None:
+                            break
+                        room.bottom_left_coords = coords
+                        self.add_room(room)
+                else:
+                    if len(self.placed_rooms) != 3 or not self.check_parallel(
+                            *convert_rooms_to_vertices(self.placed_rooms)):
+                        return
                 strikes += 1
                 if strikes == ROOM_PLACEMENT_STRIKES:
+                    self.reset_placement()
                     raise RoomPlacementError(
-                        "Rooms cannot be placed in reasonable time, " +
+                        "Rooms cannot be placed on the map, " +
                         "try adjusting room amount or room size.")
-                index = 0
-                continue
-            placed = self.place_new_room(self.created_rooms[index])
-            if placed:
-                index += 1
-                if index == len(self.created_rooms):
-                    if len(self.created_rooms) == 3:
-                        vertex1, vertex2, vertex3 = convert_rooms_to_vertices(
-                            self.placed_rooms)
-                        parallel = self.check_parallel(
-                            vertex1, vertex2, vertex3)
-                        if parallel:
-                            self.reset_placement()
-                            strikes += 1
-                            if strikes == ROOM_PLACEMENT_STRIKES:
-                                raise RoomPlacementError(
-                                    "Rooms cannot be placed in reasonable time, " +
-                                    "try adjusting room amount or room size.")
-                            index = 0
-                            continue
-                    break
+                self.create_rooms()
+        finally:
+            if stats is not None:
+                stats.placement_tries += tries
+                stats.placement_strikes += strikes
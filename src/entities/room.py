@@ -31,8 +31,24 @@ class Room:
         Returns:
             bool: True if coordinate is part of the room, and False otherwise.
         """
-        coords = self.get_all_coords()
-        return coord in coords
+        x, y = self.bottom_left_coords
+        return x <= coord[0] < x + self.size_x and y <= coord[1] < y + self.size_y
+
+    def overlaps(self, bottom_left_coords: tuple, size_x: int, size_y: int) -> bool:
+        """Checks if the room shares any cells with the given rectangle.
+
+        Args:
+            bottom_left_coords (tuple): Bottom left corner of the rectangle in (x, y) format.
+            size_x (int): Width of the rectangle.
+            size_y (int): Height of the rectangle.
+
+        Returns:
+            bool: True if the room and the rectangle overlap, and False otherwise.
+        """
+        x, y = self.bottom_left_coords
+        other_x, other_y = bottom_left_coords
+        return x < other_x + size_x and other_x < x + self.size_x and \
+            y < other_y + size_y and other_y < y + self.size_y
 
     def __str__(self) -> str:
         return f"coords: {self.bottom_left_coords}, size x: {self.size_x}, size y: {self.size_y}"
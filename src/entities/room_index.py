@@ -0,0 +1,78 @@
+"""A spatial index that is used to check quickly if rooms overlap."""
+from entities.room import Room
+
+
+class RoomIndex:
+    """Divides the map into square buckets and remembers which placed rooms touch each bucket.
+    When the buckets are at least as large as the largest room, a rectangle of that size
+    touches at most 4 buckets, so checking for overlaps does not depend on the size of the rooms
+    or on how many rooms have been placed.
+
+    The bucket size is fixed when the index is created. Rooms that are larger than a bucket
+    are still handled correctly, but they are stored in, and checked against, more buckets,
+    so overlap checks for them are no longer bounded by 4 buckets.
+    """
+
+    def __init__(self, bucket_size: int) -> None:
+        """
+        Args:
+            bucket_size (int): Width and height of a bucket.
+            Should be at least as large as the largest room.
+        """
+        self.bucket_size = max(1, bucket_size)
+        self.buckets = {}
+
+    def _bucket_keys(self, bottom_left_coords: tuple, size_x: int, size_y: int):
+        """Yields the keys of all buckets that a rectangle touches."""
+        x, y = bottom_left_coords
+        first_x = x // self.bucket_size
+        first_y = y // self.bucket_size
+        last_x = (x + max(size_x, 1) - 1) // self.bucket_size
+        last_y = (y + max(size_y, 1) - 1) // self.bucket_size
+        for bucket_x in range(first_x, last_x + 1):
+            for bucket_y in range(first_y, last_y + 1):
+                yield (bucket_x, bucket_y)
+
+    def add(self, room: Room) -> None:
+        """Adds a placed room to the index.
+
+        Args:
+            room (Room): The room to add. Its bottom_left_coords must be set.
+        """
+        for key in self._bucket_keys(room.bottom_left_coords, room.size_x, room.size_y):
+            self.buckets.setdefault(key, []).append(room)
+
+    def remove(self, room: Room) -> None:
+        """Removes a room from the index.
+
+        Args:
+            room (Room): The room to remove.
+        """
+        for key in self._bucket_keys(room.bottom_left_coords, room.size_x, room.size_y):
+            bucket = self.buckets.get(key)
+            if bucket and room in bucket:
+                bucket.remove(room)
+                if not bucket:
+                    del self.buckets[key]
+
+    def clear(self) -> None:
+        """Removes all rooms from the index."""
+        self.buckets.clear()
+
+    def is_free(self, bottom_left_coords: tuple, size_x: int, size_y: int) -> bool:
+        """Checks that a rectangle does not overlap any room in the index.
+
+        Args:
+            bottom_left_coords (tuple): Bottom left corner of the rectangle in (x, y) format.
+            size_x (int): Width of the rectangle.
+            size_y (int): Height of the rectangle.
+
+        Returns:
+            bool: True if no room overlaps the rectangle, and False otherwise.
+        """
+        for key in self._bucket_keys(bottom_left_coords, size_x, size_y):
+            room: Room
+            for room in self.buckets.get(key, ()):
+                if room.overlaps(bottom_left_coords, size_x, size_y):
+                    return False
+        return True
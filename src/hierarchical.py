@@ -0,0 +1,374 @@
+"""Hierarchical pathfinding for hallways on large maps, in the style of HPA*.
+
+shortest_path_a_star searches the whole grid cell by cell, and its heuristic
+abs(dx + dy) is not the Manhattan distance, so on large maps it expands a large part
+of the map for every hallway. HierarchicalRouter divides the map into square clusters.
+On every border between two clusters, the cells where a hallway can cross the border
+are chosen as entrances, and the cheapest paths between the entrances of a cluster
+are found once and remembered. A hallway is found by first searching a route through
+the entrances, and then finding the cells of the route inside one cluster at a time.
+
+Costs are counted like in shortest_path_a_star: moving into a cell costs its weight.
+The heuristic is the Manhattan distance multiplied by PATH_WEIGHT, the smallest weight
+on the map, so it never overestimates the cost. The routes are not always the shortest
+possible, because a route can only cross a border at an entrance.
+"""
+import heapq
+import time
+
+from entities.cell import Cell
+from entities.map import Map
+from values import PATH_WEIGHT
+
+# width and height of a cluster in cells
+CLUSTER_SIZE = 16
+
+# used in the route search as the node of the end cell
+_GOAL = -1
+
+
+class HierarchicalRouter:
+    """Finds hallways on a map through a graph of cluster entrances.
+
+    Clusters and borders are built when a search first needs them, so only the parts
+    of the map that hallways go through are handled. When weights change, update
+    forgets the clusters and borders that contain the changed cells, and they are
+    built again when they are needed.
+
+    Attributes:
+        map (Map): The map whose hallways are searched.
+        cluster_size (int): Width and height of a cluster in cells.
+        clusters_x (int): Amount of clusters in each row of clusters.
+        clusters_y (int): Amount of clusters in each column of clusters.
+        borders (dict): The entrances of each built border by (cluster, cluster),
+        as (cell, cell) pairs of cell indices, the cell of the first cluster first.
+        crossings (dict): For each entrance cell, the entrance cells
+        on the other side of a border.
+        intra (dict): For each built cluster, the cheapest cost from each of its
+        entrances to the others, as {entrance: {entrance: cost}}.
+    """
+
+    def __init__(self, map: Map, cluster_size: int = CLUSTER_SIZE) -> None:
+        """
+        Args:
+            map (Map): The map whose hallways are searched.
+            cluster_size (int, optional): Width and height of a cluster in cells.
+            Defaults to CLUSTER_SIZE.
+        """
+        self.map = map
+        self.cluster_size = cluster_size
+        self.clusters_x = (map.size_x + cluster_size - 1) // cluster_size
+        self.clusters_y = (map.size_y + cluster_size - 1) // cluster_size
+        self.borders = {}
+        self.crossings = {}
+        self.intra = {}
+
+    def cluster_of(self, index: int) -> int:
+        """Returns the number of the cluster that contains the cell with the given index."""
+        size_x = self.map.grid.size_x
+        return (index // size_x // self.cluster_size) * self.clusters_x + \
+            index % size_x // self.cluster_size
+
+    def _bounds(self, cluster: int) -> tuple:
+        """Returns the cells of a cluster as (start x, start y, end x, end y),
+        the ends not included."""
+        cluster_y, cluster_x = divmod(cluster, self.clusters_x)
+        start_x = cluster_x * self.cluster_size
+        start_y = cluster_y * self.cluster_size
+        return (start_x, start_y, min(start_x + self.cluster_size, self.map.size_x),
+                min(start_y + self.cluster_size, self.map.size_y))
+
+    def _neighbor_clusters(self, cluster: int) -> list:
+        cluster_y, cluster_x = divmod(cluster, self.clusters_x)
+        neighbors = []
+        if cluster_x > 0:
+            neighbors.append(cluster - 1)
+        if cluster_x < self.clusters_x - 1:
+            neighbors.append(cluster + 1)
+        if cluster_y > 0:
+            neighbors.append(cluster - self.clusters_x)
+        if cluster_y < self.clusters_y - 1:
+            neighbors.append(cluster + self.clusters_x)
+        return neighbors
+
+    def _border(self, first: int, second: int) -> list:
+        """Returns the entrances of the border between two neighboring clusters,
+        finding them if the border has not been built.
+
+        The border is divided into runs of cell pairs that have the same weights,
+        for example the cells where an existing hallway crosses the border,
+        and the middle pair of each run is an entrance.
+        """
+        key = (first, second) if first < second else (second, first)
+        entrances = self.borders.get(key)
+        if entrances is not None:
+            return entrances
+
+        low, high = key
+        start_x, start_y, end_x, end_y = self._bounds(low)
+        size_x = self.map.grid.size_x
+        if high == low + 1:
+            # high is on the right side of low
+            pairs = [(y * size_x + end_x - 1, y * size_x + end_x) for y in range(start_y, end_y)]
+        else:
+            # high is above low
+            pairs = [((end_y - 1) * size_x + x, end_y * size_x + x)
+                     for x in range(start_x, end_x)]
+
+        weights = self.map.grid.weights
+        entrances = []
+        run_start = 0
+        for position in range(1, len(pairs) + 1):
+            if position < len(pairs) and \
+                    weights[pairs[position][0]] == weights[pairs[run_start][0]] and \
+                    weights[pairs[position][1]] == weights[pairs[run_start][1]]:
+                continue
+            entrances.append(pairs[(run_start + position - 1) // 2])
+            run_start = position
+
+        for cell, other in entrances:
+            self.crossings.setdefault(cell, []).append(other)
+            self.crossings.setdefault(other, []).append(cell)
+        self.borders[key] = entrances
+        return entrances
+
+    def _forget_border(self, key: tuple) -> None:
+        for cell, other in self.borders.pop(key, ()):
+            for start, end in ((cell, other), (other, cell)):
+                self.crossings[start].remove(end)
+                if not self.crossings[start]:
+                    del self.crossings[start]
+
+    def _cluster(self, cluster: int) -> dict:
+        """Returns the costs between the entrances of a cluster, building it if needed."""
+        costs = self.intra.get(cluster)
+        if costs is not None:
+            return costs
+
+        entrances = set()
+        for neighbor in self._neighbor_clusters(cluster):
+            for cell, other in self._border(cluster, neighbor):
+                entrances.add(cell if self.cluster_of(cell) == cluster else other)
+        costs = {}
+        weight = self._uniform_weight(cluster)
+        size_x = self.map.grid.size_x
+        for entrance in entrances:
+            if weight is not None:
+                # without cheaper or more expensive cells, the cheapest path is
+                # any path that only moves towards the other entrance
+                y, x = divmod(entrance, size_x)
+                costs[entrance] = {other: (abs(other % size_x - x) + abs(other // size_x - y))
+                                   * weight for other in entrances if other != entrance}
+                continue
+            reached = self._local_costs(cluster, entrance, entrances)
+            costs[entrance] = {other: reached[other] for other in entrances
+                               if other != entrance and other in reached}
+        self.intra[cluster] = costs
+        return costs
+
+    def _uniform_weight(self, cluster: int) -> float | None:
+        """Returns the weight of every cell in the cluster if they all have the same weight,
+        and None otherwise."""
+        start_x, start_y, end_x, end_y = self._bounds(cluster)
+        size_x = self.map.grid.size_x
+        weights = self.map.grid.weights
+        weight = weights[start_y * size_x + start_x]
+        for y in range(start_y, end_y):
+            for index in range(y * size_x + start_x, y * size_x + end_x):
+                if weights[index] != weight:
+                    return None
+        return weight
+
+    def update(self, coords: list) -> None:
+        """Forgets the clusters and borders that contain the given cells,
+        so that they are built again with the new weights when they are needed.
+        Called after the weights of the cells have changed, for example
+        when a hallway or a room has been added to the map.
+
+        Args:
+            coords (list): The (x, y) coordinates of the cells whose weights changed.
+        """
+        size = self.cluster_size
+        for x, y in coords:
+            cluster_x, cluster_y = x // size, y // size
+            cluster = cluster_y * self.clusters_x + cluster_x
+            self.intra.pop(cluster, None)
+            neighbors = []
+            if x % size == 0 and cluster_x > 0:
+                neighbors.append(cluster - 1)
+            if x % size == size - 1 and cluster_x < self.clusters_x - 1:
+                neighbors.append(cluster + 1)
+            if y % size == 0 and cluster_y > 0:
+                neighbors.append(cluster - self.clusters_x)
+            if y % size == size - 1 and cluster_y < self.clusters_y - 1:
+                neighbors.append(cluster + self.clusters_x)
+            for neighbor in neighbors:
+                self._forget_border((min(cluster, neighbor), max(cluster, neighbor)))
+                self.intra.pop(neighbor, None)
+
+    def _local_costs(self, cluster: int, source: int, targets: set,
+                     reverse: bool = False) -> dict:
+        """Finds the cheapest costs from source to cells of the cluster with Dijkstra's
+        algorithm, moving only inside the cluster. Stops when every target is reached.
+        If reverse is True, the costs are from the cells to source instead.
+        """
+        start_x, start_y, end_x, end_y = self._bounds(cluster)
+        size_x = self.map.grid.size_x
+        weights = self.map.grid.weights
+        costs = {source: 0}
+        remaining = len(targets) - (source in targets)
+        queue = [(0, source)]
+        done = set()
+        while queue and remaining > 0:
+            cost, index = heapq.heappop(queue)
+            if index in done:
+                continue
+            done.add(index)
+            if index != source and index in targets:
+                remaining -= 1
+            y, x = divmod(index, size_x)
+            step = weights[index] if reverse else 0
+            for neighbor, inside in ((index + 1, x + 1 < end_x), (index - 1, x > start_x),
+                                     (index + size_x, y + 1 < end_y),
+                                     (index - size_x, y > start_y)):
+                if not inside:
+                    continue
+                new_cost = cost + (step if reverse else weights[neighbor])
+                if new_cost < costs.get(neighbor, float("inf")):
+                    costs[neighbor] = new_cost
+                    heapq.heappush(queue, (new_cost, neighbor))
+        return costs
+
+    def _local_path(self, cluster: int, start: int, end: int) -> list:
+        """Finds the cheapest path from start to end inside the cluster with A*.
+
+        Returns:
+            list: Cell indices of the path, without start.
+        """
+        start_x, start_y, end_x, end_y = self._bounds(cluster)
+        size_x = self.map.grid.size_x
+        weights = self.map.grid.weights
+        goal_y, goal_x = divmod(end, size_x)
+        costs = {start: 0}
+        previous = {start: -1}
+        queue = [(0, start)]
+        done = set()
+        while queue:
+            index = heapq.heappop(queue)[1]
+            if index == end:
+                break
+            if index in done:
+                continue
+            done.add(index)
+            y, x = divmod(index, size_x)
+            cost = costs[index]
+            for neighbor, inside in ((index + 1, x + 1 < end_x), (index - 1, x > start_x),
+                                     (index + size_x, y + 1 < end_y),
+                                     (index - size_x, y > start_y)):
+                if not inside:
+                    continue
+                new_cost = cost + weights[neighbor]
+                if new_cost < costs.get(neighbor, float("inf")):
+                    costs[neighbor] = new_cost
+                    previous[neighbor] = index
+                    neighbor_y, neighbor_x = divmod(neighbor, size_x)
+                    heuristic = (abs(neighbor_x - goal_x) + abs(neighbor_y - goal_y)) \
+                        * PATH_WEIGHT
+                    heapq.heappush(queue, (new_cost + heuristic, neighbor))
+
+        path = []
+        index = end
+        while index != start:
+            path.append(index)
+            index = previous[index]
+        path.reverse()
+        return path
+
+    def find_path(self, start_cell: Cell, end_cell: Cell, stats=None) -> list:
+        """Finds a hallway between two cells. Can be used instead of shortest_path_a_star.
+
+        Args:
+            start_cell (Cell): The cell where the hallway starts.
+            end_cell (Cell): The cell where the hallway ends.
+            stats (GenerationStats, optional): If given, the amount of entrances
+            expanded and pushed by the route search is recorded in it. Defaults to None.
+
+        Returns:
+            list: A list of coordinate tuples from start_cell to end_cell.
+        """
+        started = time.perf_counter() if stats is not None else 0
+        grid = self.map.grid
+        start = grid.index(start_cell.coords)
+        end = grid.index(end_cell.coords)
+        start_cluster = self.cluster_of(start)
+        end_cluster = self.cluster_of(end)
+
+        start_entrances = set(self._cluster(start_cluster))
+        from_start = self._local_costs(start_cluster, start, start_entrances)
+        start_moves = [(other, from_start[other]) for other in start_entrances
+                       if other != start]
+        # the end is reached from the entrances of its cluster,
+        # and directly from the start if they are in the same cluster
+        end_entrances = set(self._cluster(end_cluster))
+        if start_cluster == end_cluster:
+            end_entrances.add(start)
+        to_end = self._local_costs(end_cluster, end, end_entrances, reverse=True)
+
+        size_x = grid.size_x
+        end_y, end_x = divmod(end, size_x)
+        weights = grid.weights
+
+        def heuristic(index: int) -> float:
+            if index == _GOAL:
+                return 0
+            y, x = divmod(index, size_x)
+            return (abs(x - end_x) + abs(y - end_y)) * PATH_WEIGHT
+
+        costs = {start: 0}
+        previous = {start: None}
+        queue = [(heuristic(start), start)]
+        done = set()
+        pushed = 1
+        while queue:
+            node = heapq.heappop(queue)[1]
+            if node == _GOAL:
+                break
+            if node in done:
+                continue
+            done.add(node)
+
+            if node == start:
+                moves = list(start_moves)
+            else:
+                moves = list(self._cluster(self.cluster_of(node))[node].items())
+            moves += [(other, weights[other]) for other in self.crossings.get(node, ())]
+            if node in end_entrances:
+                moves.append((_GOAL, to_end[node]))
+            for other, cost in moves:
+                new_cost = costs[node] + cost
+                if new_cost < costs.get(other, float("inf")):
+                    costs[other] = new_cost
+                    previous[other] = node
+                    heapq.heappush(queue, (new_cost + heuristic(other), other))
+                    pushed += 1
+
+        route = []
+        node = _GOAL
+        while node is not None:
+            route.append(end if node == _GOAL else node)
+            node = previous[node]
+        route.reverse()
+
+        path = [start]
+        for first, second in zip(route, route[1:]):
+            if first == second:
+                continue
+            if second in self.crossings.get(first, ()) and \
+                    self.cluster_of(first) != self.cluster_of(second):
+                path.append(second)
+            else:
+                path.extend(self._local_path(self.cluster_of(first), first, second))
+
+        if stats is not None:
+            stats.record_search(len(done), pushed, len(path), time.perf_counter() - started)
+        return [grid.coords(index) for index in path]
@@ -1,7 +1,7 @@
-from ui.ui import UI
-
-
 def main():
+    # imported here, so that importing this module does not load tkinter and matplotlib
+    from ui.ui import UI
+
     ui = UI()
     ui.start()
 
@@ -0,0 +1,97 @@
+"""Reports how much memory each stage of generate_dungeon uses.
+
+Generates dungeons with one parameter set while tracemalloc traces every allocation,
+and records for every stage the peak memory allocated during it and the memory
+it left allocated. Creating the Map is its own stage, "create_map".
+The results can be used to decide how many generation workers fit on a host,
+and to compare memory use between versions.
+
+Usage: python src/memory_report.py --size 500x500 --amount 100 [--seeds 3] [--output FILE]
+"""
+import argparse
+import json
+import sys
+import tracemalloc
+
+from batch import parse_size
+from entities.map import DENSE_STORAGE, STORAGE_TYPES, Map
+from services.generate import A_STAR_ROUTING, ROUTING_METHODS, generate_dungeon
+from services.stats import GenerationStats
+
+MEMORY_STAGES = ["create_map", "place_rooms", "triangulation", "kruskal", "a_star"]
+
+
+def measure_memory(params: dict, seed: int, routing: str = A_STAR_ROUTING) -> dict:
+    """Generates one dungeon while tracing memory.
+
+    Args:
+        params (dict): Parameters of the map, like in batch.py.
+        seed (int): Seed for the random number generator.
+        routing (str, optional): How hallways are searched. Defaults to A_STAR_ROUTING.
+
+    Returns:
+        dict: "stages" with the peak and retained bytes of every stage, "peak" with the
+        highest amount of bytes allocated during the run, and "retained" with
+        the bytes still allocated by the finished map.
+    """
+    stats = GenerationStats(track_memory=True)
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        with stats.stage("create_map"):
+            map = Map(params["map_size_x"], params["map_size_y"], params["amount"],
+                      room_min_size=params.get("room_min_size", -1),
+                      room_max_size=params.get("room_max_size", -1),
+                      room_exact_size=params.get("room_exact_size", -1), seed=seed,
+                      storage=params.get("storage", DENSE_STORAGE))
+        generate_dungeon(map, extra_edges=params.get("extra_edges", True), stats=stats,
+                         routing=routing)
+        retained = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return {"stages": stats.stage_memory, "peak": stats.peak_memory - start,
+            "retained": retained}
+
+
+def main(arguments: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Reports the memory used by each stage.")
+    parser.add_argument("--size", default="100x100", help="map size, for example 500x500")
+    parser.add_argument("--amount", type=int, default=20, help="amount of rooms")
+    parser.add_argument("--room-min-size", type=int, default=-1)
+    parser.add_argument("--room-max-size", type=int, default=-1)
+    parser.add_argument("--room-exact-size", type=int, default=-1)
+    parser.add_argument("--storage", choices=STORAGE_TYPES, default=DENSE_STORAGE)
+    parser.add_argument("--routing", choices=ROUTING_METHODS, default=A_STAR_ROUTING)
+    parser.add_argument("--seeds", type=int, default=1, help="amount of seeds")
+    parser.add_argument("--output", help="JSON file that the results are written to")
+    args = parser.parse_args(arguments)
+
+    map_size_x, map_size_y = parse_size(args.size)
+    params = {"map_size_x": map_size_x, "map_size_y": map_size_y, "amount": args.amount,
+              "room_min_size": args.room_min_size, "room_max_size": args.room_max_size,
+              "room_exact_size": args.room_exact_size, "storage": args.storage}
+    results = []
+    for seed in range(args.seeds):
+        result = measure_memory(params, seed, args.routing)
+        results.append(result)
+        print(f"seed {seed}: peak {result['peak'] / 1024:10.1f} KiB  "
+              f"retained {result['retained'] / 1024:10.1f} KiB")
+        for stage in MEMORY_STAGES:
+            memory = result["stages"].get(stage)
+            if memory is not None:
+                print(f"  {stage:<14} peak {memory['peak'] / 1024:10.1f} KiB  "
+                      f"retained {memory['retained'] / 1024:10.1f} KiB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"params": params, "routing": args.routing, "results": results},
+                      file, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""A cache for generated dungeons, so that the same dungeon is not generated twice."""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from entities.map import DENSE_STORAGE, RANDOM_PLACEMENT, Map
+from services.export import map_from_dict, map_to_dict
+from services.generate import A_STAR_ROUTING, generate_dungeon
+
+
+def cache_key(size_x: int, size_y: int, amount: int, room_min_size: int = -1,
+              room_max_size: int = -1, room_exact_size: int = -1,
+              extra_edges: bool = True, seed: int = 0, placement: str = RANDOM_PLACEMENT,
+              storage: str = DENSE_STORAGE, routing: str = A_STAR_ROUTING) -> str:
+    """Returns a key that identifies a dungeon. Generation is deterministic for a seed,
+    so dungeons with the same key are identical. Every parameter of the generation
+    is part of the key.
+
+    Returns:
+        str: A hex digest of the parameters.
+    """
+    parameters = [size_x, size_y, amount, room_min_size, room_max_size,
+                  room_exact_size, bool(extra_edges), seed, placement, storage, routing]
+    return hashlib.sha256(json.dumps(parameters).encode("utf-8")).hexdigest()
+
+
+class DungeonCache:
+    """Keeps recently generated dungeons in memory, and optionally every
+    generated dungeon on disk. The maps that are returned are shared with the cache,
+    so they should not be modified.
+    """
+
+    def __init__(self, maxsize: int = 128, directory: str = None) -> None:
+        """
+        Args:
+            maxsize (int, optional): How many maps are kept in memory. Defaults to 128.
+            directory (str, optional): Directory where generated dungeons are also saved
+            as JSON files. If None, nothing is saved to disk. Defaults to None.
+        """
+        self.maxsize = maxsize
+        self.directory = directory
+        self.maps = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def _remember(self, key: str, map: Map) -> None:
+        self.maps[key] = map
+        self.maps.move_to_end(key)
+        while len(self.maps) > self.maxsize:
+            self.maps.popitem(last=False)
+
+    def get(self, size_x: int, size_y: int, amount: int, room_min_size: int = -1,
+            room_max_size: int = -1, room_exact_size: int = -1,
+            extra_edges: bool = True, seed: int = 0, placement: str = RANDOM_PLACEMENT,
+            storage: str = DENSE_STORAGE, routing: str = A_STAR_ROUTING) -> Map:
+        """Returns the dungeon generated with the given parameters and seed.
+        It is looked up from memory, then from disk, and generated only if it is not found.
+        The arguments are the same as in Map and generate_dungeon.
+
+        Raises:
+            RoomSizeError, RoomAmountError, RoomPlacementError, NoTrianglesError:
+            Raised if the dungeon cannot be generated. Failures are not cached.
+
+        Returns:
+            Map: The generated map, with its rooms and hallways.
+        """
+        key = cache_key(size_x, size_y, amount, room_min_size, room_max_size,
+                        room_exact_size, extra_edges, seed, placement, storage, routing)
+        if key in self.maps:
+            self.hits += 1
+            self.maps.move_to_end(key)
+            return self.maps[key]
+
+        if self.directory and os.path.exists(self._path(key)):
+            with open(self._path(key), encoding="utf-8") as file:
+                map = map_from_dict(json.load(file))
+            self.disk_hits += 1
+            self._remember(key, map)
+            return map
+
+        self.misses += 1
+        map = Map(size_x, size_y, amount, room_min_size=room_min_size,
+                  room_max_size=room_max_size, room_exact_size=room_exact_size, seed=seed,
+                  placement=placement, storage=storage)
+        generate_dungeon(map, extra_edges=extra_edges, routing=routing)
+        self._remember(key, map)
+        if self.directory:
+            # written to a temporary file first, so that a crash cannot leave a broken file
+            temporary_path = self._path(key) + ".tmp"
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                json.dump(map_to_dict(map), file)
+            os.replace(temporary_path, self._path(key))
+        return map
@@ -0,0 +1,167 @@
+"""Adding rooms to and removing rooms from a generated dungeon without generating it again."""
+from algorithms import kruskal, shortest_path_a_star
+from entities.geometry import Edge, Vertex
+from entities.hallway import Hallway
+from entities.map import ROOM_PLACEMENT_TRIES, Map, RoomPlacementError
+from entities.room import Room
+from services.generate import EXTRA_EDGE_CHANCE
+from triangulation import Triangulation, spatial_order
+
+
+class DungeonEditor:
+    """Keeps the triangulation and spanning tree of a generated dungeon, so that rooms can be
+    added and removed one at a time. Each edit updates the triangulation only around the room,
+    repairs the spanning tree and finds paths only for the hallways that changed.
+
+    Edges are stored as pairs of room corners in ((x, y), (x, y)) format,
+    the smaller coordinates first, like Edge.key().
+
+    Attributes:
+        map (Map): The map that is edited.
+        triangulation (Triangulation): Delaunay triangulation of the room corners.
+        rooms (dict): The placed rooms by their bottom left corner.
+        tree (set): Edges of the minimum spanning tree.
+        extra (set): Edges that are not in the tree but have a hallway.
+        hallways (dict): The hallway of each edge in tree and extra.
+    """
+
+    def __init__(self, map: Map, extra_edges: bool = True) -> None:
+        """Starts editing a map whose rooms have been placed, usually by generate_dungeon.
+        Hallways that do not know which rooms they connect, like the hallways of a loaded
+        map, are matched to rooms by the first and last cell of their path. Hallways whose
+        ends are not both room corners are left on the map untouched.
+
+        Args:
+            map (Map): The map to edit.
+            extra_edges (bool, optional): Whether edges outside the spanning tree are
+            sometimes given a hallway, like in generate_dungeon. Defaults to True.
+        """
+        self.map = map
+        self.extra_edges = extra_edges
+        self.triangulation = Triangulation(0, 0, map.size_x - 1, map.size_y - 1)
+        self.rooms = {room.bottom_left_coords: room for room in map.placed_rooms}
+        for coords in spatial_order(list(self.rooms)):
+            self.triangulation.add_vertex(coords)
+        self.hallways = {}
+        for hallway in map.added_hallways:
+            if hallway.ends is None:
+                hallway.ends = self._path_ends(hallway)
+            if hallway.ends is not None:
+                self.hallways[hallway.ends] = hallway
+        self.tree = self._spanning_tree(self.triangulation.edges(), set(self.hallways))
+        self.extra = set(self.hallways) - self.tree
+
+    def _path_ends(self, hallway: Hallway) -> tuple:
+        """Returns the edge of a hallway from the first and last cell of its path,
+        or None if they are not the corners of two placed rooms."""
+        if not len(hallway):
+            return None
+        path = hallway.path
+        first, last = path[0], path[-1]
+        if first == last or first not in self.rooms or last not in self.rooms:
+            return None
+        return (min(first, last), max(first, last))
+
+    def _spanning_tree(self, edges: set, preferred: set) -> set:
+        """Returns the minimum spanning tree of the given edges.
+        When edges are equally long, preferred edges are chosen first,
+        so that an edit does not replace hallways with equally long ones.
+        """
+        vertices = {coords: Vertex(*coords) for coords in self.rooms}
+        # kruskal sorts the edges by length with a stable sort, so preferred edges stay first
+        ordered = sorted(edges, key=lambda edge: (edge not in preferred, edge))
+        tree = kruskal(list(vertices.values()),
+                       [Edge(vertices[start], vertices[end]) for start, end in ordered])
+        return {edge.key() for edge in tree}
+
+    def _roll_extra_edges(self, edges) -> set:
+        if not self.extra_edges:
+            return set()
+        return {edge for edge in sorted(edges)
+                if self.map.rng.randint(1, 100) <= EXTRA_EDGE_CHANCE}
+
+    def _update_hallways(self, tree: set, extra: set) -> list:
+        """Removes the hallways of edges that are no longer needed,
+        and finds paths for the edges that do not have a hallway yet.
+        """
+        wanted = tree | extra
+        for edge in [edge for edge in self.hallways if edge not in wanted]:
+            self.map.remove_hallway(self.hallways.pop(edge))
+        added = []
+        for edge in sorted(wanted - set(self.hallways)):
+            start, end = edge
+            hallway = Hallway(shortest_path_a_star(self.map, self.map.cells[start],
+                                                   self.map.cells[end]), edge)
+            self.map.add_hallway(hallway)
+            self.hallways[edge] = hallway
+            added.append(hallway)
+        self.tree = tree
+        self.extra = extra
+        return added
+
+    def add_room(self, room: Room) -> list:
+        """Adds a room to the dungeon and connects it with hallways.
+
+        A new room can only shorten the spanning tree with edges that end at the new room,
+        so the tree is repaired from the old tree and the new room's edges.
+
+        Args:
+            room (Room): The room to add. If its bottom_left_coords are set, it is placed
+            there, otherwise at a random free position.
+
+        Raises:
+            RoomPlacementError: Raised if the room does not fit at the given position,
+            or no free position was found.
+
+        Returns:
+            list: The hallways that were added. Hallways that were removed
+            are no longer in map.added_hallways.
+        """
+        if room.bottom_left_coords:
+            x, y = room.bottom_left_coords
+            if x < 0 or y < 0 or x + room.size_x > self.map.size_x or \
+                    y + room.size_y > self.map.size_y or not self.map.add_room(room):
+                raise RoomPlacementError("The room does not fit at the given position.")
+        else:
+            for _ in range(ROOM_PLACEMENT_TRIES):
+                if self.map.place_new_room(room):
+                    break
+            else:
+                raise RoomPlacementError("No free position was found for the room.")
+
+        coords = room.bottom_left_coords
+        self.rooms[coords] = room
+        self.triangulation.add_vertex(coords)
+        new_edges = {(min(coords, other), max(coords, other))
+                     for other in self.triangulation.neighbors_of(coords)}
+        tree = self._spanning_tree(self.tree | new_edges, self.tree)
+        extra = {edge for edge in self.extra if edge not in tree} | \
+            self._roll_extra_edges(new_edges - tree)
+        return self._update_hallways(tree, extra)
+
+    def remove_room(self, room: Room) -> list:
+        """Removes a room and its hallways from the dungeon, and reconnects the rooms
+        that were connected through it.
+
+        Removing a room can split the spanning tree into several parts, and the shortest
+        edges between them can be anywhere, so the tree is built again from all edges
+        of the triangulation. Only hallways of edges that changed are routed.
+
+        Args:
+            room (Room): A placed room.
+
+        Raises:
+            ValueError: Raised if the room is not on the map.
+
+        Returns:
+            list: The hallways that were added.
+        """
+        coords = room.bottom_left_coords
+        if self.rooms.get(coords) is not room:
+            raise ValueError(f"Room at {coords} is not on the map.")
+        self.map.remove_room(room)
+        del self.rooms[coords]
+        self.triangulation.remove_vertex(coords)
+        tree = self._spanning_tree(self.triangulation.edges(), self.tree)
+        extra = {edge for edge in self.extra if coords not in edge and edge not in tree}
+        return self._update_hallways(tree, extra)
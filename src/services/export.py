@@ -0,0 +1,210 @@
+"""Converting generated maps into formats that can be saved to disk, and back."""
+import mmap
+import struct
+import sys
+from array import array
+
+from entities.grid import WeightGrid
+from entities.hallway import RUN_LENGTH, Hallway
+from entities.map import DENSE_STORAGE, Map
+from entities.room import Room
+
+
+def map_to_dict(map: Map) -> dict:
+    """Converts a generated map into a dictionary that can be saved as JSON.
+
+    Args:
+        map (Map): The map to convert.
+
+    Returns:
+        dict: The map size, the parameters and seed the map was created with,
+        the rooms in [x, y, size_x, size_y] format and the hallways as lists of [x, y] coordinates
+        in the order of their paths.
+    """
+    return {
+        "size": [map.size_x, map.size_y],
+        "params": {"amount": map.amount, "room_min_size": map.room_min_size,
+                   "room_max_size": map.room_max_size,
+                   "room_exact_size": map.room_exact_size, "storage": map.storage},
+        "seed": map.seed,
+        "rooms": [[room.bottom_left_coords[0], room.bottom_left_coords[1],
+                   room.size_x, room.size_y] for room in map.placed_rooms],
+        "hallways": [[list(coord) for coord in hallway]
+                     for hallway in map.added_hallways],
+    }
+
+
+def map_from_dict(data: dict) -> Map:
+    """Creates a map from a dictionary made by map_to_dict.
+
+    Args:
+        data (dict): The dictionary.
+
+    Returns:
+        Map: A map with the same rooms, hallways and cell weights as the original.
+    """
+    params = data["params"]
+    map = Map(data["size"][0], data["size"][1], params["amount"],
+              room_min_size=params["room_min_size"], room_max_size=params["room_max_size"],
+              room_exact_size=params["room_exact_size"], seed=data.get("seed"),
+              storage=params.get("storage", DENSE_STORAGE))
+    map.reset_placement()
+    for x, y, size_x, size_y in data["rooms"]:
+        room = Room(size_x, size_y)
+        room.bottom_left_coords = (x, y)
+        map.add_room(room)
+    for coords in data["hallways"]:
+        map.add_hallway(Hallway([tuple(coord) for coord in coords]))
+    return map
+
+
+# Binary format, all values little-endian:
+#   header (64 bytes, see HEADER)
+#   cell weights as float64, row by row like in WeightGrid
+#   rooms as int32 [x, y, size_x, size_y] for every room
+#   the amount of runs in every hallway as int32
+#   the runs of every hallway as int32 [x, y, step x, step y, amount], see Hallway.runs
+# The weights start right after the header, so they are 8-byte aligned in the file
+# and can be used directly from a memory map.
+# Version 1 files stored the amount of cells in every hallway and the cells as [x, y]
+# pairs instead of runs. They can still be loaded.
+MAGIC = b"DUNGEON\x00"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sIIiiiiiiqIIQ")
+HAS_SEED = 1
+
+
+class MapFormatError(Exception):
+    """Raised if a file is not a map saved by save_map, or is damaged."""
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_array(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def save_map(map: Map, path: str) -> None:
+    """Saves a map into a compact binary file that load_map can memory-map.
+
+    Args:
+        map (Map): The map to save.
+        path (str): Path of the file.
+
+    Raises:
+        MapFormatError: Raised if the seed of the map is not None or an integer
+        that fits in 64 bits, or if the map uses chunked storage. The format stores
+        every cell, so chunked maps are saved with map_to_dict instead.
+    """
+    if map.storage != DENSE_STORAGE:
+        raise MapFormatError("Maps with chunked storage are saved with map_to_dict")
+    seed = map.seed
+    if seed is not None and not (isinstance(seed, int) and -2**63 <= seed < 2**63):
+        raise MapFormatError(f"Seed {seed!r} cannot be saved, it must be a 64-bit integer")
+
+    rooms = array("i")
+    for room in map.placed_rooms:
+        rooms.extend((*room.bottom_left_coords, room.size_x, room.size_y))
+    lengths = array("i", [len(hallway.runs) // RUN_LENGTH for hallway in map.added_hallways])
+    runs = array("i")
+    for hallway in map.added_hallways:
+        runs.extend(hallway.runs)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, HAS_SEED if seed is not None else 0,
+                         map.size_x, map.size_y, map.amount, map.room_min_size,
+                         map.room_max_size, map.room_exact_size,
+                         seed if seed is not None else 0,
+                         len(map.placed_rooms), len(lengths), len(runs) // RUN_LENGTH)
+    with open(path, "wb") as file:
+        file.write(header)
+        file.write(_little_endian(array("d", map.grid.weights)))
+        file.write(_little_endian(rooms))
+        file.write(_little_endian(lengths))
+        file.write(_little_endian(runs))
+
+
+def load_map(path: str, use_mmap: bool = True) -> Map:
+    """Loads a map saved by save_map.
+
+    With use_mmap, the cell weights are not read into memory. The grid of the map
+    uses the memory-mapped file directly, and only the pages that are used are read.
+    The file is mapped copy-on-write, so changing the map never changes the file.
+
+    Args:
+        path (str): Path of the file.
+        use_mmap (bool, optional): Whether the weights are memory-mapped.
+        Memory mapping is only used on little-endian machines. Defaults to True.
+
+    Raises:
+        MapFormatError: Raised if the file is not a map file, was saved by
+        an unknown version of the format or is too short.
+
+    Returns:
+        Map: A map with the same rooms, hallways, cell weights and seed as the saved one.
+    """
+    with open(path, "rb") as file:
+        data = file.read(HEADER.size)
+        if len(data) < HEADER.size or data[:len(MAGIC)] != MAGIC:
+            raise MapFormatError(f"{path} is not a map file")
+        (_, version, flags, size_x, size_y, amount, room_min_size, room_max_size,
+         room_exact_size, seed, room_count, hallway_count, hallway_items) = HEADER.unpack(data)
+        if version not in (1, FORMAT_VERSION):
+            raise MapFormatError(f"Unknown map format version {version} in {path}")
+        # version 1 stores every cell as 2 integers, later versions every run as RUN_LENGTH
+        item_length = 2 if version == 1 else RUN_LENGTH
+
+        weights_end = HEADER.size + size_x * size_y * 8
+        rooms_end = weights_end + room_count * 16
+        lengths_end = rooms_end + hallway_count * 4
+        file_end = lengths_end + hallway_items * item_length * 4
+
+        if use_mmap and sys.byteorder == "little":
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        else:
+            file.seek(0)
+            buffer = file.read()
+        if len(buffer) < file_end:
+            raise MapFormatError(f"{path} is too short")
+
+    if isinstance(buffer, mmap.mmap):
+        # the memoryview keeps the mapping alive as long as the grid uses it
+        weights = memoryview(buffer)[HEADER.size:weights_end].cast("d")
+    else:
+        weights = _read_array("d", buffer[HEADER.size:weights_end])
+    rooms = _read_array("i", buffer[weights_end:rooms_end])
+    lengths = _read_array("i", buffer[rooms_end:lengths_end])
+    hallway_items = _read_array("i", buffer[lengths_end:file_end])
+
+    map = Map(size_x, size_y, amount, room_min_size=room_min_size,
+              room_max_size=room_max_size, room_exact_size=room_exact_size,
+              seed=seed if flags & HAS_SEED else None,
+              grid=WeightGrid(size_x, size_y, weights=weights))
+    for i in range(0, len(rooms), 4):
+        room = Room(rooms[i + 2], rooms[i + 3])
+        room.bottom_left_coords = (rooms[i], rooms[i + 1])
+        # the weights of the room are already in the grid
+        map.placed_rooms.append(room)
+        map.room_index.add(room)
+    start = 0
+    corridor_cells = map.corridor_cells
+    for length in lengths:
+        end = start + item_length * length
+        items = hallway_items[start:end]
+        if version == 1:
+            hallway = Hallway(list(zip(items[0::2], items[1::2])))
+        else:
+            hallway = Hallway.from_runs(items)
+        map.added_hallways.append(hallway)
+        for coord in hallway:
+            corridor_cells[coord] = corridor_cells.get(coord, 0) + 1
+        start = end
+    return map
@@ -1,18 +1,49 @@
-import random
+import threading
 
-from algorithms import Edge, bowyer_watson, kruskal, shortest_path_a_star
+from algorithms import (Edge, distinct_edges, kruskal, shortest_path_a_star,
+                        shortest_path_bucket)
 from entities.hallway import Hallway
-from entities.map import Map
+from entities.map import Map, RoomAmountError, RoomPlacementError, RoomSizeError
 from entities.room import Room
+from hierarchical import HierarchicalRouter
+from services.stats import GenerationStats, optional_stage
+from triangulation import delaunay_triangulation
 
 TRIANGULATION_TRIES = 10
 EXTRA_EDGE_CHANCE = 5
 
+# how the paths of the hallways are searched
+A_STAR_ROUTING = "a_star"
+HIERARCHICAL_ROUTING = "hierarchical"
+BUCKET_ROUTING = "bucket"
+ROUTING_METHODS = (A_STAR_ROUTING, HIERARCHICAL_ROUTING, BUCKET_ROUTING)
+
 
 class NoTrianglesError(Exception):
     """Raised if bowyer-watson algorithm can not generate the triangulation."""
 
 
+# everything generate_dungeon raises when a dungeon cannot be made with the given parameters
+GENERATION_ERRORS = (RoomAmountError, RoomPlacementError, RoomSizeError, NoTrianglesError)
+
+
+class GenerationCancelled(Exception):
+    """Raised if generate_dungeon is cancelled before it finishes."""
+
+
+def check_cancelled(cancel: threading.Event | None) -> None:
+    """Stops the generation if it has been cancelled.
+
+    Args:
+        cancel (threading.Event | None): The cancel event, or None.
+
+    Raises:
+        GenerationCancelled: Raised if the event is set.
+    """
+    if cancel is not None and cancel.is_set():
+        raise GenerationCancelled("Generation was cancelled.")
+
+
 def convert_rooms_to_x_y_coords(rooms: list) -> list:
     """Takes a list of room objects and converts them to the x, y coordinates of the rooms.
 
@@ -29,7 +60,10 @@ def convert_rooms_to_x_y_coords(rooms: list) -> list:
     return coords
 
 
-def generate_dungeon(map: Map, extra_edges=True) -> list:
+def generate_dungeon(map: Map, extra_edges=True, stats: GenerationStats = None,
+                     progress=None, cancel: threading.Event = None,
+                     workers: int = 1, batch_size: int = None,
+                     routing: str = A_STAR_ROUTING) -> list:
     """Generates a path through the dungeon that visits every room.
     This is done by: \n
     1. Creating a delaunay triangulation using the rooms on the map.
@@ -39,57 +73,195 @@ def generate_dungeon(map: Map, extra_edges=True) -> list:
     4. Converting the edges into Hallways.
     5. Adding these Hallways to the map.
 
+    The work is done by iter_generate_dungeon, which can also be used directly
+    to get the results of each stage as soon as they are ready.
+
     Args:
         map (Map): A Map object containing the rooms.
+        stats (GenerationStats, optional): If given, the time spent in each stage
+        and the counters of each stage are collected in it. Defaults to None.
+        progress (callable, optional): Called as progress(stage, done, total) when a stage
+        starts and as it advances, for example after every hallway. Defaults to None.
+        cancel (threading.Event, optional): If the event is set, generation stops
+        between stages and between hallways. The map is left partially generated.
+        Defaults to None.
+        workers (int, optional): If more than 1, the paths of the hallways are searched
+        in this many processes at the same time, see ParallelRouter. Defaults to 1.
+        batch_size (int, optional): How many hallways are searched at the same time when
+        workers is more than 1. Hallways in the same batch do not see each other,
+        so batches of 1 give exactly the same dungeon as searching without workers.
+        Defaults to workers.
+        routing (str, optional): A_STAR_ROUTING searches every hallway cell by cell with
+        shortest_path_a_star. HIERARCHICAL_ROUTING searches them with a HierarchicalRouter,
+        which is much faster on large maps, but the hallways are not always the shortest
+        possible. BUCKET_ROUTING searches them with shortest_path_bucket, which keeps
+        the open cells in a bucket queue and always finds one of the cheapest paths.
+        Defaults to A_STAR_ROUTING.
+
+    Raises:
+        GenerationCancelled: Raised if cancel is set before generation finishes.
+        NoTrianglesError: Raised if the rooms could not be triangulated.
+        ValueError: Raised if routing is not one of ROUTING_METHODS,
+        or workers is used with HIERARCHICAL_ROUTING.
 
     Returns:
         list: The hallways that make up the path.
     """
+    return [value for kind, value in
+            iter_generate_dungeon(map, extra_edges, stats, progress, cancel,
+                                  workers, batch_size, routing)
+            if kind == "hallway"]
+
+
+def iter_generate_dungeon(map: Map, extra_edges=True, stats: GenerationStats = None,
+                          progress=None, cancel: threading.Event = None,
+                          workers: int = 1, batch_size: int = None,
+                          routing: str = A_STAR_ROUTING):
+    """Generates the dungeon like generate_dungeon, but yields the result of every stage
+    as soon as it is ready, so that the caller can for example draw or send the rooms
+    while the hallways are still being searched. Nothing is done before the first
+    event is asked for. The events are (kind, value) tuples, in this order:
+
+    - ("rooms", list): The placed rooms, once they have been triangulated.
+    - ("triangulation", list): The triangles of the triangulation.
+    - ("spanning_tree", list): The edges that get a hallway, the edges of the minimum
+      spanning tree and the extra edges, in the order their hallways are searched.
+    - ("hallway", Hallway): Every hallway right after it has been added to the map.
+
+    The arguments are the same as in generate_dungeon. The time the caller spends
+    between events is not counted in stats. If the caller stops before the last event,
+    the map is left partially generated.
+
+    Raises:
+        GenerationCancelled: Raised if cancel is set before generation finishes.
+        NoTrianglesError: Raised if the rooms could not be triangulated.
+        ValueError: Raised if routing is not one of ROUTING_METHODS,
+        or workers is used with HIERARCHICAL_ROUTING.
+
+    Yields:
+        tuple: The events as (kind, value).
+    """
+    if routing not in ROUTING_METHODS:
+        raise ValueError(f"Unknown routing method {routing!r}")
+    if routing != A_STAR_ROUTING and workers > 1:
+        raise ValueError("Only A_STAR_ROUTING can be used with workers.")
     triangles = []
     tries = 0
-    map.place_rooms()
+    if progress is not None:
+        progress("place_rooms", 0, 1)
+    check_cancelled(cancel)
+    with optional_stage(stats, "place_rooms"):
+        map.place_rooms(stats)
     x_y_coords = convert_rooms_to_x_y_coords(map.placed_rooms)
     while not triangles:
-        triangles = bowyer_watson(x_y_coords)
+        if progress is not None:
+            progress("triangulation", tries, TRIANGULATION_TRIES)
+        check_cancelled(cancel)
+        with optional_stage(stats, "triangulation"):
+            triangles = delaunay_triangulation(x_y_coords, stats)
+        if stats is not None:
+            stats.triangulation_tries += 1
         if not triangles:
-            map.place_rooms()
+            with optional_stage(stats, "place_rooms"):
+                map.place_rooms(stats)
             x_y_coords = convert_rooms_to_x_y_coords(map.placed_rooms)
         tries += 1
         if tries == TRIANGULATION_TRIES:
             raise NoTrianglesError("Could not triangulate, try again.")
+    yield ("rooms", map.placed_rooms)
+    yield ("triangulation", triangles)
+
+    if progress is not None:
+        progress("kruskal", 0, 1)
+    check_cancelled(cancel)
+    with optional_stage(stats, "kruskal"):
+        edges = distinct_edges([edge for triangle in triangles
+                              for edge in (triangle.edge0, triangle.edge1, triangle.edge2)])
+        vertices = [vertex for triangle in triangles
+                    for vertex in (triangle.v0, triangle.v1, triangle.v2)]
+
+        result = kruskal(vertices, edges)
+        if stats is not None:
+            stats.mst_edges += len(result)
+
+        if extra_edges:
+            in_tree = {edge.key() for edge in result}
+            for edge in edges:
+                if map.rng.randint(1, 100) <= EXTRA_EDGE_CHANCE and edge.key() not in in_tree:
+                    # chance to add removed edge back into the result
+                    result.append(edge)
+                    if stats is not None:
+                        stats.extra_edges += 1
+
+    map.rng.shuffle(result)
+    yield ("spanning_tree", result)
 
-    vertices = []
-    edges = []
-    for triangle in triangles:
-        vertices.append(triangle.edge0.v0)
-        vertices.append(triangle.edge0.v1)
-        vertices.append(triangle.edge1.v0)
-        vertices.append(triangle.edge1.v1)
-        vertices.append(triangle.edge2.v0)
-        vertices.append(triangle.edge2.v1)
-        edges.append(triangle.edge0)
-        edges.append(triangle.edge1)
-        edges.append(triangle.edge2)
-
-    result = kruskal(vertices, edges)
-
-    if extra_edges:
-        for edge in edges:
-            if random.randint(1, 100) <= EXTRA_EDGE_CHANCE and edge not in result:
-                # chance to add removed edge back into the result
-                result.append(edge)
-
-    random.shuffle(result)
-    added_hallways = []
+    if workers > 1:
+        hallways = _route_in_parallel(map, result, workers, batch_size or workers,
+                                      stats, progress, cancel)
+    else:
+        hallways = _route(map, result, routing, stats, progress, cancel)
+    for hallway in hallways:
+        yield ("hallway", hallway)
 
+    if progress is not None:
+        progress("a_star", len(result), len(result))
+
+
+def _route(map: Map, edges: list, routing: str, stats: GenerationStats = None,
+           progress=None, cancel: threading.Event = None):
+    """Searches the hallways of the edges one at a time, adds them to the map
+    and yields them. Progress is reported and cancel checked before every hallway.
+    """
+    router = HierarchicalRouter(map) if routing == HIERARCHICAL_ROUTING else None
     hallway: Hallway
     edge: Edge
-    for edge in result:
-        hallway = Hallway(shortest_path_a_star(map,
-                                               map.cells[(
-                                                   edge.v0.x, edge.v0.y)],
-                                               map.cells[(edge.v1.x, edge.v1.y)]))
-        map.add_hallway(hallway)
-        added_hallways.append(hallway)
-
-    return added_hallways
+    for done, edge in enumerate(edges):
+        if progress is not None:
+            progress("a_star", done, len(edges))
+        check_cancelled(cancel)
+        with optional_stage(stats, "a_star"):
+            start_cell = map.cells[(edge.v0.x, edge.v0.y)]
+            end_cell = map.cells[(edge.v1.x, edge.v1.y)]
+            if router is not None:
+                path = router.find_path(start_cell, end_cell, stats)
+            elif routing == BUCKET_ROUTING:
+                path = shortest_path_bucket(map, start_cell, end_cell, stats)
+            else:
+                path = shortest_path_a_star(map, start_cell, end_cell, stats)
+            hallway = Hallway(path, edge.key())
+            map.add_hallway(hallway)
+            if router is not None:
+                router.update(hallway)
+        yield hallway
+
+
+def _route_in_parallel(map: Map, edges: list, workers: int, batch_size: int,
+                       stats: GenerationStats = None, progress=None,
+                       cancel: threading.Event = None):
+    """Searches the hallways of the edges in batches with a ParallelRouter,
+    adds them to the map in the order of edges and yields them.
+    Progress is reported and cancel checked before every batch.
+    """
+    # imported here, so that multiprocessing is only loaded when it is used
+    from services.parallel import ParallelRouter, make_batches
+
+    with optional_stage(stats, "a_star"):
+        router = ParallelRouter(map, workers)
+    with router:
+        done = 0
+        for batch in make_batches(edges, batch_size):
+            if progress is not None:
+                progress("a_star", done, len(edges))
+            check_cancelled(cancel)
+            with optional_stage(stats, "a_star"):
+                paths = router.route([((edge.v0.x, edge.v0.y), (edge.v1.x, edge.v1.y))
+                                      for edge in batch], stats)
+                hallways = []
+                for edge, path in zip(batch, paths):
+                    hallway = Hallway(path, edge.key())
+                    map.add_hallway(hallway)
+                    router.mark_path(hallway)
+                    hallways.append(hallway)
+            done += len(batch)
+            yield from hallways
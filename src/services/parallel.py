@@ -0,0 +1,154 @@
+"""Finding paths for hallways in several processes that share the weights of the map."""
+import multiprocessing
+from multiprocessing import shared_memory
+
+from algorithms import shortest_path_a_star
+from entities.grid import WeightGrid
+from entities.map import Map
+from services.stats import GenerationStats
+
+# the shared memory and the map of a worker process, set by _start_worker
+_worker = {}
+
+
+def _start_worker(name: str, size_x: int, size_y: int) -> None:
+    """Attaches a worker process to the shared weights and creates a map that uses them."""
+    memory = shared_memory.SharedMemory(name=name)
+    grid = WeightGrid(size_x, size_y, weights=memory.buf.cast("d")[:size_x * size_y])
+    _worker["memory"] = memory
+    _worker["map"] = Map(size_x, size_y, 3, room_exact_size=1, grid=grid)
+
+
+def _route(job: tuple) -> tuple:
+    """Finds the path of one hallway in a worker process.
+
+    Args:
+        job (tuple): (start coords, end coords, state or seed of the random number generator).
+
+    Returns:
+        tuple: (path, the search counters recorded by GenerationStats.record_search,
+        the state of the random number generator after the search).
+    """
+    start, end, rng_state = job
+    map = _worker["map"]
+    if isinstance(rng_state, int):
+        map.rng.seed(rng_state)
+    else:
+        map.rng.setstate(rng_state)
+    stats = GenerationStats()
+    path = shortest_path_a_star(map, map.cells[start],
+                                map.cells[end], stats)
+    return path, stats.hallways[0], map.rng.getstate()
+
+
+class ParallelRouter:
+    """Finds paths for batches of hallways at the same time in worker processes.
+
+    The weights of the map are copied once into shared memory, which every worker reads
+    without copying. The paths of a batch are searched independently of each other,
+    so a hallway cannot use the discount of another hallway in the same batch.
+    After a batch, mark_path writes PATH_WEIGHT into the shared weights,
+    so the next batches see the hallways like the sequential search would.
+
+    With batches of one hallway, the random number generator of the map is passed to
+    the worker and back, so the result is exactly the same as without workers.
+    With larger batches, each search gets its own seed from the map's generator,
+    so the result still only depends on the seed, but not on the amount of workers.
+
+    Use as a context manager, so that the processes and the shared memory are released.
+    """
+
+    def __init__(self, map: Map, workers: int) -> None:
+        """
+        Args:
+            map (Map): The map whose hallways are searched. Its weights are copied
+            when the router is created.
+            workers (int): Amount of worker processes.
+
+        Raises:
+            ValueError: Raised if the weights of the map are not a buffer of doubles,
+            like the array of a dense map or the memory-mapped weights of a loaded one.
+            Chunked weights cannot be shared without allocating every cell.
+        """
+        try:
+            weight_format = memoryview(map.grid.weights).format
+        except TypeError:
+            weight_format = None
+        if weight_format != "d":
+            raise ValueError("Parallel routing needs a map whose weights are "
+                             "a buffer of doubles, like a map with dense storage.")
+        self.map = map
+        size = len(map.grid.weights)
+        self.memory = shared_memory.SharedMemory(create=True, size=max(size * 8, 1))
+        self.weights = self.memory.buf.cast("d")
+        self.weights[:size] = map.grid.weights
+        # spawned processes do not inherit the threads of the parent, like the UI worker
+        context = multiprocessing.get_context("spawn")
+        self.pool = context.Pool(workers, _start_worker,
+                                 (self.memory.name, map.size_x, map.size_y))
+
+    def route(self, ends: list, stats: GenerationStats = None) -> list:
+        """Finds the paths between the given cells at the same time.
+
+        Args:
+            ends (list): Pairs of (x, y) coordinates, in ((x, y), (x, y)) format.
+            stats (GenerationStats, optional): If given, the searches are recorded in it
+            in the order of ends. Defaults to None.
+
+        Returns:
+            list: The path of every pair, in the same order as ends.
+        """
+        rng = self.map.rng
+        if len(ends) == 1:
+            jobs = [(ends[0][0], ends[0][1], rng.getstate())]
+        else:
+            jobs = [(start, end, rng.getrandbits(64)) for start, end in ends]
+        results = self.pool.map(_route, jobs)
+        if len(ends) == 1:
+            rng.setstate(results[0][2])
+        paths = []
+        for path, search, _ in results:
+            if stats is not None:
+                stats.record_search(**search)
+            paths.append(path)
+        return paths
+
+    def mark_path(self, path: list) -> None:
+        """Copies the weights of the given cells from the map into the shared weights.
+        Called for every hallway that is added to the map between batches.
+
+        Args:
+            path (list): The coordinates that changed.
+        """
+        grid = self.map.grid
+        for coords in path:
+            index = grid.index(coords)
+            self.weights[index] = grid.weights[index]
+
+    def close(self) -> None:
+        """Stops the worker processes and releases the shared memory."""
+        self.pool.terminate()
+        self.pool.join()
+        self.weights.release()
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self) -> "ParallelRouter":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+
+def make_batches(items: list, batch_size: int) -> list:
+    """Splits a list into consecutive batches of at most batch_size items.
+
+    Args:
+        items (list): The items to split.
+        batch_size (int): Largest size of a batch.
+
+    Returns:
+        list: The batches as lists.
+    """
+    return [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+
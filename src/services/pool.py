@@ -0,0 +1,65 @@
+"""A pool of maps that are reused for generating dungeons one after another."""
+from entities.map import DENSE_STORAGE, RANDOM_PLACEMENT, Map
+
+
+class MapPool:
+    """Keeps maps that are no longer needed, so that the next dungeon of the same size
+    and storage can reuse one with Map.reset instead of allocating a new one.
+
+    A map that is released must not be used by the caller anymore,
+    because the next acquire clears it.
+
+    Attributes:
+        maxsize (int): How many free maps are kept.
+        maps (list): The free maps, the most recently released last.
+        created (int): How many maps acquire has created.
+        reused (int): How many times acquire has reused a map.
+    """
+
+    def __init__(self, maxsize: int = 4) -> None:
+        """
+        Args:
+            maxsize (int, optional): How many free maps are kept. Defaults to 4.
+        """
+        self.maxsize = maxsize
+        self.maps = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, size_x: int, size_y: int, amount: int, room_min_size: int = -1,
+                room_max_size: int = -1, room_exact_size: int = -1, seed: int = None,
+                placement: str = RANDOM_PLACEMENT, storage: str = DENSE_STORAGE) -> Map:
+        """Returns a map for a new dungeon, like Map(...) with the same arguments.
+        A free map of the same size and storage is reset and reused if there is one.
+
+        Raises:
+            ValueError, RoomSizeError, RoomAmountError: Raised if the arguments are invalid,
+            like in Map.
+
+        Returns:
+            Map: A map whose rooms have been created but not placed.
+        """
+        for index in range(len(self.maps) - 1, -1, -1):
+            map = self.maps[index]
+            if map.get_size() == (size_x, size_y) and map.storage == storage:
+                map.reset(amount, room_min_size, room_max_size, room_exact_size,
+                          seed=seed, placement=placement)
+                del self.maps[index]
+                self.reused += 1
+                return map
+
+        self.created += 1
+        return Map(size_x, size_y, amount, room_min_size=room_min_size,
+                   room_max_size=room_max_size, room_exact_size=room_exact_size,
+                   seed=seed, placement=placement, storage=storage)
+
+    def release(self, map: Map) -> None:
+        """Gives a map back to the pool. If the pool is full,
+        the oldest free map is dropped.
+
+        Args:
+            map (Map): A map that is no longer used.
+        """
+        self.maps.append(map)
+        if len(self.maps) > self.maxsize:
+            del self.maps[0]
@@ -0,0 +1,127 @@
+"""Optional instrumentation for the dungeon generation pipeline."""
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class GenerationStats:
+    """Collects timings and counters while generate_dungeon runs.
+    Pass an instance to generate_dungeon to fill it. When no instance is given,
+    nothing is collected.
+
+    Attributes:
+        stage_times (dict): Seconds spent in each stage, by stage name.
+        placement_tries (int): How many times a room was tried to be placed.
+        placement_strikes (int): How many times all rooms were removed and placement restarted.
+        triangulation_tries (int): How many times the rooms were triangulated.
+        triangles_created (int): Triangles created by the triangulation.
+        triangles_destroyed (int): Triangles removed by the triangulation.
+        mst_edges (int): Edges in the minimum spanning tree.
+        extra_edges (int): Removed edges that were added back.
+        hallways (list): For every hallway, a dictionary with the amount of
+        nodes expanded and pushed by the search, the length of the hallway
+        and the time spent in the search.
+        track_memory (bool): Whether memory is recorded for each stage.
+        stage_memory (dict): If track_memory is True, for each stage a dictionary with
+        the highest amount of bytes allocated during the stage ("peak") and the bytes
+        that were still allocated when it ended ("retained"), both counted from
+        what was allocated when the stage started.
+        peak_memory (int): If track_memory is True, the highest amount of bytes traced by
+        tracemalloc during any stage, including what was allocated before the stage.
+        Stages reset the peak of tracemalloc, so the peak of a whole run is read from here.
+    """
+
+    def __init__(self, track_memory: bool = False) -> None:
+        """
+        Args:
+            track_memory (bool, optional): Record memory for each stage with tracemalloc.
+            Memory is only recorded while tracemalloc is tracing, so the caller
+            starts and stops it, see memory_report.py. Defaults to False.
+        """
+        self.track_memory = track_memory
+        self.stage_memory = {}
+        self.peak_memory = 0
+        self.stage_times = {}
+        self.placement_tries = 0
+        self.placement_strikes = 0
+        self.triangulation_tries = 0
+        self.triangles_created = 0
+        self.triangles_destroyed = 0
+        self.mst_edges = 0
+        self.extra_edges = 0
+        self.hallways = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """Adds the time spent inside the with block to the given stage.
+
+        Args:
+            name (str): Name of the stage.
+        """
+        tracking = self.track_memory and tracemalloc.is_tracing()
+        if tracking:
+            allocated = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_times[name] = self.stage_times.get(name, 0.0) + \
+                time.perf_counter() - start
+            if tracking:
+                current, peak = tracemalloc.get_traced_memory()
+                memory = self.stage_memory.setdefault(name, {"peak": 0, "retained": 0})
+                # a stage that runs several times is as high as its highest run,
+                # and keeps what all of its runs kept
+                memory["peak"] = max(memory["peak"], peak - allocated)
+                memory["retained"] += current - allocated
+                self.peak_memory = max(self.peak_memory, peak)
+
+    def record_search(self, expanded: int, pushed: int, length: int,
+                      seconds: float = 0.0) -> None:
+        """Records the work done by one hallway search.
+
+        Args:
+            expanded (int): Amount of cells whose neighbors were checked.
+            pushed (int): Amount of cells added to the priority queue.
+            length (int): Amount of cells in the resulting hallway, or 0 if no path was found.
+            seconds (float, optional): Time spent in the search. Defaults to 0.0.
+        """
+        self.hallways.append({"expanded": expanded, "pushed": pushed, "length": length,
+                              "seconds": seconds})
+
+    def as_dict(self) -> dict:
+        """Returns all collected values in a dictionary that can be saved as JSON.
+
+        Returns:
+            dict: The collected values.
+        """
+        return {
+            "stage_times": dict(self.stage_times),
+            "placement_tries": self.placement_tries,
+            "placement_strikes": self.placement_strikes,
+            "triangulation_tries": self.triangulation_tries,
+            "triangles_created": self.triangles_created,
+            "triangles_destroyed": self.triangles_destroyed,
+            "mst_edges": self.mst_edges,
+            "extra_edges": self.extra_edges,
+            "nodes_expanded": sum(hallway["expanded"] for hallway in self.hallways),
+            "nodes_pushed": sum(hallway["pushed"] for hallway in self.hallways),
+            "hallways": [dict(hallway) for hallway in self.hallways],
+            "stage_memory": {name: dict(memory) for name, memory in self.stage_memory.items()},
+        }
+
+
+@contextmanager
+def optional_stage(stats: GenerationStats | None, name: str):
+    """Times a stage if stats is given, and does nothing otherwise.
+
+    Args:
+        stats (GenerationStats | None): Where the time is added, or None.
+        name (str): Name of the stage.
+    """
+    if stats is None:
+        yield
+    else:
+        with stats.stage(name):
+            yield
@@ -0,0 +1,73 @@
+"""Runs dungeon generation in a background thread, so that the user interface does not freeze."""
+import queue
+import threading
+
+from entities.map import Map
+from services.generate import GenerationCancelled, generate_dungeon
+
+
+class GenerationWorker:
+    """Generates a dungeon in a daemon thread. The thread reports back through a queue
+    that the owner reads with poll, for example from a tkinter after callback,
+    because tkinter may only be used from the thread that runs its main loop.
+
+    Messages are (kind, value) tuples:
+        ("progress", (stage, done, total)): generation advanced.
+        ("done", hallways): generation finished, the map is ready.
+        ("cancelled", None): generation stopped because cancel was called.
+        ("error", exception): generation failed, with any exception.
+    """
+
+    def __init__(self, map: Map, extra_edges: bool = True) -> None:
+        """
+        Args:
+            map (Map): The map that is generated. It must not be used until the worker is done.
+            extra_edges (bool, optional): Passed to generate_dungeon. Defaults to True.
+        """
+        self.map = map
+        self.extra_edges = extra_edges
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def cancel(self) -> None:
+        """Asks the generation to stop. It stops at the next hallway or stage,
+        and then reports ("cancelled", None).
+        """
+        self.cancel_event.set()
+
+    def is_running(self) -> bool:
+        return self.thread.is_alive()
+
+    def poll(self) -> list:
+        """Returns the messages sent since the last call without waiting.
+
+        Returns:
+            list: (kind, value) tuples in the order they were sent.
+        """
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def _report_progress(self, stage: str, done: int, total: int) -> None:
+        self.messages.put(("progress", (stage, done, total)))
+
+    def _run(self) -> None:
+        try:
+            hallways = generate_dungeon(self.map, extra_edges=self.extra_edges,
+                                        progress=self._report_progress,
+                                        cancel=self.cancel_event)
+        except GenerationCancelled:
+            self.messages.put(("cancelled", None))
+        except Exception as exception:
+            # besides GENERATION_ERRORS, a bug must not end the thread silently,
+            # because the owner waits for a message
+            self.messages.put(("error", exception))
+        else:
+            self.messages.put(("done", hallways))
@@ -0,0 +1,44 @@
+import json
+import os
+
+from batch import job_name, parse_seeds, run_batch
+
+
+def test_parse_seeds():
+    assert parse_seeds("3:6") == [3, 4, 5]
+    assert parse_seeds("1,7,2") == [1, 7, 2]
+
+
+def test_job_names_differ_in_every_parameter():
+    params = {"map_size_x": 40, "map_size_y": 40, "amount": 4}
+    names = {job_name(params, 0), job_name(params, 1)}
+    for key, value in [("room_exact_size", 3), ("extra_edges", False),
+                       ("placement", "free_space"), ("storage", "chunked"),
+                       ("routing", "bucket")]:
+        names.add(job_name({**params, key: value}, 0))
+    assert len(names) == 7
+    assert job_name(dict(reversed(params.items())), 0) == job_name(params, 0)
+
+
+def test_dungeons_are_written_to_disk(tmp_path):
+    params = [{"map_size_x": 40, "map_size_y": 40, "amount": 4},
+              {"map_size_x": 5, "map_size_y": 5, "amount": 30}]
+    summary = run_batch(params, [0, 1, 2], str(tmp_path), workers=2)
+    assert summary["generated"] == 3
+    assert summary["failures"] == {"RoomPlacementError": 3}
+    files = sorted(os.listdir(tmp_path))
+    assert len(files) == 3
+    with open(tmp_path / files[0], encoding="utf-8") as file:
+        data = json.load(file)
+    assert data["size"] == [40, 40]
+    assert len(data["rooms"]) == 4
+    assert len(data["hallways"]) >= 3
+
+
+def test_invalid_parameters_are_counted_as_failures(tmp_path):
+    params = [{"map_size_x": 40, "map_size_y": 40, "amount": 4},
+              {"map_size_x": 40, "map_size_y": 40, "amount": 4, "placement": "unknown"},
+              {"map_size_x": 40, "map_size_y": 40, "amount": 4, "routing": "unknown"}]
+    summary = run_batch(params, [0, 1], str(tmp_path), workers=2)
+    assert summary["generated"] == 2
+    assert summary["failures"] == {"ValueError": 4}
@@ -0,0 +1,33 @@
+from benchmark import STAGES, compare_to_baseline, make_cases, run_benchmarks, run_case
+
+
+def test_run_case_times_every_stage():
+    params = {"map_size_x": 40, "map_size_y": 40, "amount": 5,
+              "room_min_size": 2, "room_max_size": 3}
+    result = run_case(params, seed=1)
+    assert set(result["stages"]) == set(STAGES)
+    assert result["hallways"] >= 4
+    assert result["counters"]["mst_edges"] == 4
+    assert run_case(params, seed=1)["hallways"] == result["hallways"]
+
+
+def test_generation_errors_are_counted_as_failures():
+    invalid = {"map_size_x": 40, "map_size_y": 40, "amount": 5,
+               "room_min_size": 4, "room_max_size": 2}
+    valid = dict(invalid, room_min_size=2, room_max_size=3)
+    results = run_benchmarks([invalid, valid], seeds=[0, 1])
+    assert [result["failures"] for result in results] == [2, 0]
+    assert results[1]["hallways"] >= 8
+
+
+def test_slower_stages_are_reported():
+    cases = make_cases(quick=True)
+    assert cases
+    stages = dict.fromkeys(STAGES, 0.1)
+    baseline = {"cases": [{"name": "a", "stages": stages, "total": 0.4}]}
+    slower = dict(stages, a_star=0.5)
+    regressions = compare_to_baseline(
+        [{"name": "a", "stages": slower, "total": 0.8}], baseline)
+    assert ("a", "a_star", 5.0) in [(name, stage, round(ratio, 6))
+                                    for name, stage, ratio in regressions]
+    assert ("a", "kruskal") not in [(name, stage) for name, stage, _ in regressions]
@@ -1,3 +1,7 @@
+import random
+
+import pytest
+
 from algorithms import bowyer_watson
 
 
@@ -31,3 +35,21 @@ def test_rooms_that_are_on_the_same_line_result_in_0_triangles():
     assert len(triangles) == 0
     triangles = bowyer_watson([(1, 1), (0, 0), (20, 20)])
     assert len(triangles) == 0
+
+
+def test_numpy_backend_gives_the_same_triangles():
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    inputs = [[(0, 0), (10, 10), (0, 5)], [(0, 0), (10, 0), (56, 0)],
+              [(i, i**2) for i in range(300)],
+              list({(rng.randint(0, 500), rng.randint(0, 500)) for _ in range(300)})]
+    for coords in inputs:
+        expected = bowyer_watson(coords)
+        result = bowyer_watson(coords, backend="numpy")
+        assert [str(triangle) for triangle in result] == \
+            [str(triangle) for triangle in expected]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        bowyer_watson([(0, 0), (1, 2), (2, 2)], backend="fortran")
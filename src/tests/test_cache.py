@@ -0,0 +1,47 @@
+from entities.map import CHUNKED_STORAGE, FREE_SPACE_PLACEMENT, Map
+from services.cache import DungeonCache
+from services.export import map_to_dict
+from services.generate import BUCKET_ROUTING, generate_dungeon
+
+
+def test_same_seed_gives_same_dungeon():
+    first = Map(60, 60, 8, seed=42)
+    second = Map(60, 60, 8, seed=42)
+    generate_dungeon(first)
+    generate_dungeon(second)
+    assert map_to_dict(first) == map_to_dict(second)
+    other = Map(60, 60, 8, seed=43)
+    generate_dungeon(other)
+    assert map_to_dict(other) != map_to_dict(first)
+
+
+def test_memory_cache():
+    cache = DungeonCache(maxsize=2)
+    map = cache.get(50, 50, 5, seed=1)
+    assert cache.get(50, 50, 5, seed=1) is map
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.get(50, 50, 5, seed=2)
+    cache.get(50, 50, 5, seed=3)
+    assert cache.get(50, 50, 5, seed=1) is not map
+    assert cache.misses == 4
+
+
+def test_disk_cache(tmp_path):
+    map = DungeonCache(directory=str(tmp_path)).get(50, 50, 5, seed=7)
+    cache = DungeonCache(directory=str(tmp_path))
+    loaded = cache.get(50, 50, 5, seed=7)
+    assert cache.disk_hits == 1
+    assert cache.misses == 0
+    assert map_to_dict(loaded) == map_to_dict(map)
+    assert list(loaded.grid.weights) == list(map.grid.weights)
+
+
+def test_every_parameter_is_in_the_key():
+    cache = DungeonCache()
+    map = cache.get(50, 50, 5, seed=1)
+    placed = cache.get(50, 50, 5, seed=1, placement=FREE_SPACE_PLACEMENT)
+    chunked = cache.get(50, 50, 5, seed=1, storage=CHUNKED_STORAGE)
+    routed = cache.get(50, 50, 5, seed=1, routing=BUCKET_ROUTING)
+    assert len({id(map), id(placed), id(chunked), id(routed)}) == 4
+    assert cache.misses == 4
+    assert chunked.storage == CHUNKED_STORAGE
@@ -0,0 +1,89 @@
+import pytest
+
+from entities.map import Map, RoomPlacementError
+from entities.room import Room
+from services.editing import DungeonEditor
+from services.export import load_map, map_from_dict, map_to_dict, save_map
+from services.generate import generate_dungeon
+from values import EMPTY_WEIGHT, PATH_WEIGHT, ROOM_WEIGHT
+
+
+def connected_rooms(editor: DungeonEditor) -> set:
+    start = next(iter(editor.rooms))
+    reached = {start}
+    stack = [start]
+    while stack:
+        coords = stack.pop()
+        for first, second in editor.hallways:
+            if coords in (first, second):
+                other = second if coords == first else first
+                if other not in reached:
+                    reached.add(other)
+                    stack.append(other)
+    return reached
+
+
+def assert_weights_are_correct(map: Map):
+    for x in range(map.size_x):
+        for y in range(map.size_y):
+            if (x, y) in map.corridor_cells:
+                expected = PATH_WEIGHT
+            elif any(room.covers((x, y)) for room in map.placed_rooms):
+                expected = ROOM_WEIGHT
+            else:
+                expected = EMPTY_WEIGHT
+            assert map.grid.get_weight((x, y)) == expected
+
+
+def test_adding_and_removing_rooms():
+    map = Map(80, 80, 15, seed=4)
+    generate_dungeon(map)
+    editor = DungeonEditor(map)
+    assert set(editor.hallways.values()) == set(map.added_hallways)
+    hallway_count = len(map.added_hallways)
+
+    room = Room(3, 3)
+    room.bottom_left_coords = next((x, y) for x in range(0, 77, 4) for y in range(0, 77, 4)
+                                   if map.room_index.is_free((x, y), 3, 3))
+    added = editor.add_room(room)
+    assert 1 <= len(added) < hallway_count
+    assert all(room.bottom_left_coords in hallway.ends for hallway in added)
+    assert connected_rooms(editor) == set(editor.rooms)
+    assert len(editor.tree) == len(editor.rooms) - 1
+
+    for room in list(map.placed_rooms[:5]):
+        editor.remove_room(room)
+        assert room not in map.placed_rooms
+        assert all(room.bottom_left_coords not in edge for edge in editor.hallways)
+        assert connected_rooms(editor) == set(editor.rooms)
+    assert set(editor.hallways.values()) == set(map.added_hallways)
+    assert_weights_are_correct(map)
+
+
+def test_room_must_fit():
+    map = Map(50, 50, 5, seed=1)
+    generate_dungeon(map)
+    editor = DungeonEditor(map)
+    room = Room(3, 3)
+    room.bottom_left_coords = map.placed_rooms[0].bottom_left_coords
+    with pytest.raises(RoomPlacementError):
+        editor.add_room(room)
+    room.bottom_left_coords = (49, 0)
+    with pytest.raises(RoomPlacementError):
+        editor.add_room(room)
+    with pytest.raises(ValueError):
+        editor.remove_room(room)
+
+
+def test_editing_a_loaded_map(tmp_path):
+    original = Map(100, 100, 15, seed=3)
+    generate_dungeon(original)
+    save_map(original, tmp_path / "map.bin")
+    for map in (load_map(tmp_path / "map.bin"), map_from_dict(map_to_dict(original))):
+        editor = DungeonEditor(map)
+        assert set(editor.hallways.values()) == set(map.added_hallways)
+        hallway_count = len(map.added_hallways)
+        added = editor.add_room(Room(2, 2))
+        assert len(added) < hallway_count
+        assert len(map.added_hallways) == len(editor.hallways)
+        assert connected_rooms(editor) == set(editor.rooms)
@@ -0,0 +1,73 @@
+from array import array
+
+import pytest
+
+from entities.map import Map
+from services.export import (HAS_SEED, HEADER, MAGIC, MapFormatError, load_map, map_to_dict,
+                             save_map)
+from services.generate import generate_dungeon
+from values import PATH_WEIGHT
+
+
+@pytest.fixture
+def dungeon():
+    map = Map(80, 60, 10, seed=5)
+    generate_dungeon(map)
+    return map
+
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_save_and_load(dungeon, tmp_path, use_mmap):
+    path = str(tmp_path / "dungeon.map")
+    save_map(dungeon, path)
+    loaded = load_map(path, use_mmap=use_mmap)
+    assert map_to_dict(loaded) == map_to_dict(dungeon)
+    assert list(loaded.grid.weights) == list(dungeon.grid.weights)
+
+
+def test_loaded_map_changes_do_not_touch_file(dungeon, tmp_path):
+    path = str(tmp_path / "dungeon.map")
+    save_map(dungeon, path)
+    loaded = load_map(path)
+    loaded.reset_placement()
+    loaded.grid.set_weight((0, 0), PATH_WEIGHT)
+    assert loaded.cells[(0, 0)].weight == PATH_WEIGHT
+    assert list(load_map(path).grid.weights) == list(dungeon.grid.weights)
+
+
+def test_map_without_seed(tmp_path):
+    map = Map(20, 20, 3)
+    path = str(tmp_path / "empty.map")
+    save_map(map, path)
+    assert load_map(path).seed is None
+
+
+def test_invalid_files(dungeon, tmp_path):
+    path = tmp_path / "broken.map"
+    path.write_bytes(b"not a map")
+    with pytest.raises(MapFormatError):
+        load_map(str(path))
+    save_map(dungeon, str(path))
+    path.write_bytes(path.read_bytes()[:-8])
+    with pytest.raises(MapFormatError):
+        load_map(str(path))
+
+
+def test_version_1_files_can_be_loaded(dungeon, tmp_path):
+    # version 1 stored the hallways cell by cell
+    rooms = array("i")
+    for room in dungeon.placed_rooms:
+        rooms.extend((*room.bottom_left_coords, room.size_x, room.size_y))
+    lengths = array("i", [len(hallway) for hallway in dungeon.added_hallways])
+    cells = array("i", [value for hallway in dungeon.added_hallways
+                        for coord in hallway for value in coord])
+    header = HEADER.pack(MAGIC, 1, HAS_SEED, dungeon.size_x, dungeon.size_y, dungeon.amount,
+                         dungeon.room_min_size, dungeon.room_max_size,
+                         dungeon.room_exact_size, dungeon.seed, len(dungeon.placed_rooms),
+                         len(lengths), len(cells) // 2)
+    path = tmp_path / "old.map"
+    path.write_bytes(header + bytes(array("d", dungeon.grid.weights)) + bytes(rooms) +
+                     bytes(lengths) + bytes(cells))
+    loaded = load_map(str(path))
+    assert map_to_dict(loaded) == map_to_dict(dungeon)
+    assert loaded.corridor_cells == dungeon.corridor_cells
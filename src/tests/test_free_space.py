@@ -0,0 +1,48 @@
+import random
+
+from entities.free_space import FreeSpace
+
+
+def free_cells(free_space: FreeSpace) -> set:
+    return {(x, y) for rect_x, rect_y, width, height in free_space.rectangles
+            for x in range(rect_x, rect_x + width) for y in range(rect_y, rect_y + height)}
+
+
+def test_rectangles_cover_exactly_the_free_cells():
+    rng = random.Random(4)
+    free_space = FreeSpace(30, 20)
+    used = set()
+    while True:
+        size_x, size_y = rng.randint(1, 5), rng.randint(1, 5)
+        coords = free_space.choose_position(size_x, size_y, rng)
+        if coords is None:
+            break
+        room = {(x, y) for x in range(coords[0], coords[0] + size_x)
+                for y in range(coords[1], coords[1] + size_y)}
+        assert not room & used
+        assert max(x for x, _ in room) < 30 and max(y for _, y in room) < 20
+        used |= room
+        free_space.occupy(coords, size_x, size_y)
+        all_cells = {(x, y) for x in range(30) for y in range(20)}
+        assert free_cells(free_space) == all_cells - used
+        rectangles = free_space.rectangles
+        assert len(set(rectangles)) == len(rectangles)
+        for rectangle in rectangles:
+            for other in rectangles:
+                if other != rectangle:
+                    assert not (other[0] <= rectangle[0] and other[1] <= rectangle[1] and
+                                rectangle[0] + rectangle[2] <= other[0] + other[2] and
+                                rectangle[1] + rectangle[3] <= other[1] + other[3])
+
+
+def test_room_fits_only_where_there_is_space():
+    free_space = FreeSpace(10, 10)
+    free_space.occupy((0, 0), 10, 6)
+    free_space.occupy((0, 6), 6, 4)
+    rng = random.Random(1)
+    assert free_space.choose_position(5, 4, rng) is None
+    assert free_space.choose_position(4, 5, rng) is None
+    positions = {free_space.choose_position(2, 3, rng) for _ in range(100)}
+    assert positions == {(6, 6), (7, 6), (8, 6), (6, 7), (7, 7), (8, 7)}
+    free_space.clear()
+    assert free_space.rectangles == [(0, 0, 10, 10)]
@@ -1,5 +1,13 @@
+import threading
+
+import pytest
+
 from entities.map import Map
-from services.generate import generate_dungeon
+from services.export import load_map, save_map
+from services.generate import GenerationCancelled, generate_dungeon, iter_generate_dungeon
+from services.parallel import ParallelRouter
+from services.stats import GenerationStats
+from values import PATH_WEIGHT
 
 
 def test_rooms_are_connected():
@@ -16,3 +24,117 @@ def test_placing_rooms_many_times():
         map = Map(100, 100, 3)
         hallways = generate_dungeon(map, extra_edges=False)
         assert len(hallways) == 2
+
+
+def test_stats_are_collected():
+    map = Map(100, 100, 10)
+    stats = GenerationStats()
+    hallways = generate_dungeon(map, extra_edges=False, stats=stats)
+    assert set(stats.stage_times) == {"place_rooms", "triangulation", "kruskal", "a_star"}
+    assert stats.placement_tries >= 10
+    assert stats.triangulation_tries >= 1
+    assert stats.triangles_created > stats.triangles_destroyed > 0
+    assert stats.mst_edges == 9
+    assert stats.extra_edges == 0
+    assert len(stats.hallways) == len(hallways)
+    for hallway, record in zip(hallways, stats.hallways):
+        assert record["length"] == len(hallway.coords)
+        assert record["expanded"] >= 1
+        assert record["pushed"] >= record["expanded"]
+    assert stats.as_dict()["nodes_expanded"] == sum(
+        record["expanded"] for record in stats.hallways)
+
+
+def test_progress_is_reported():
+    reports = []
+    hallways = generate_dungeon(Map(100, 100, 10), extra_edges=False,
+                                progress=lambda *report: reports.append(report))
+    assert [stage for stage, _, _ in reports[:3]] == ["place_rooms", "triangulation", "kruskal"]
+    assert [report for report in reports if report[0] == "a_star"] == \
+        [("a_star", done, 9) for done in range(10)]
+    assert len(hallways) == 9
+
+
+def test_cancel_stops_between_hallways():
+    map = Map(100, 100, 10)
+    cancel = threading.Event()
+
+    def progress(stage, done, _total):
+        if stage == "a_star" and done == 3:
+            cancel.set()
+
+    with pytest.raises(GenerationCancelled):
+        generate_dungeon(map, extra_edges=False, progress=progress, cancel=cancel)
+    assert len(map.added_hallways) == 3
+
+
+def test_parallel_routing_with_batches_of_one_is_sequential():
+    map = Map(150, 150, 15, seed=3)
+    sequential = generate_dungeon(map)
+    map = Map(150, 150, 15, seed=3)
+    parallel = generate_dungeon(map, workers=2, batch_size=1)
+    assert [hallway.coords for hallway in parallel] == \
+        [hallway.coords for hallway in sequential]
+
+
+def test_parallel_routing_connects_rooms():
+    map = Map(150, 150, 15, seed=4)
+    stats = GenerationStats()
+    hallways = generate_dungeon(map, extra_edges=False, stats=stats, workers=2, batch_size=4)
+    assert len(hallways) == 14
+    assert len(stats.hallways) == 14
+    for hallway in hallways:
+        start, end = hallway.ends
+        assert start in hallway.coords and end in hallway.coords
+        for coords in hallway.coords:
+            assert map.grid.get_weight(coords) == PATH_WEIGHT
+
+
+def test_parallel_routing_needs_dense_storage():
+    map = Map(150, 150, 15, seed=4, storage="chunked")
+    with pytest.raises(ValueError):
+        generate_dungeon(map, workers=2)
+
+
+def test_parallel_routing_on_a_loaded_map(tmp_path):
+    map = Map(100, 100, 8, seed=6)
+    map.place_rooms()
+    save_map(map, tmp_path / "map.bin")
+    loaded = load_map(tmp_path / "map.bin")
+    assert isinstance(loaded.grid.weights, memoryview)
+    start, end = (room.bottom_left_coords for room in loaded.placed_rooms[:2])
+    with ParallelRouter(loaded, 1) as router:
+        path, = router.route([(start, end)])
+    assert path[0] == start and path[-1] == end
+
+
+def test_streaming_yields_stages_in_order():
+    map = Map(120, 120, 12, seed=9)
+    events = iter_generate_dungeon(map)
+    kind, rooms = next(events)
+    assert kind == "rooms" and len(rooms) == 12
+    assert not map.added_hallways
+    kind, triangles = next(events)
+    assert kind == "triangulation" and triangles
+    kind, edges = next(events)
+    assert kind == "spanning_tree" and len(edges) >= 11
+    hallways = []
+    for kind, hallway in events:
+        assert kind == "hallway"
+        assert map.added_hallways[-1] is hallway
+        hallways.append(hallway)
+    assert len(hallways) == len(edges)
+
+    map = Map(120, 120, 12, seed=9)
+    assert [hallway.path for hallway in generate_dungeon(map)] == \
+        [hallway.path for hallway in hallways]
+
+
+def test_streaming_can_stop_early():
+    map = Map(120, 120, 12, seed=9)
+    stats = GenerationStats()
+    for kind, _ in iter_generate_dungeon(map, stats=stats):
+        if kind == "hallway":
+            break
+    assert len(map.added_hallways) == 1
+    assert len(stats.hallways) == 1
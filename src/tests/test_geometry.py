@@ -0,0 +1,25 @@
+from entities.geometry import Edge, Triangle, Vertex
+
+
+def test_vertices_with_same_coordinates_are_deduplicated():
+    vertices = {Vertex(1, 2), Vertex(1, 2), Vertex(2, 1)}
+    assert len(vertices) == 2
+
+
+def test_edges_do_not_depend_on_direction():
+    edge1 = Edge(Vertex(0, 0), Vertex(3, 4))
+    edge2 = Edge(Vertex(3, 4), Vertex(0, 0))
+    assert edge1 == edge2
+    assert edge1.key() == edge2.key()
+    assert len({edge1, edge2}) == 1
+    assert edge1.length == 5
+
+
+def test_triangle_fields_are_calculated():
+    triangle = Triangle(Vertex(0, 0), Vertex(2, 0), Vertex(0, 2))
+    assert triangle.circumcenter == (1, 1)
+    assert abs(triangle.circumcircle_radius - 2 ** 0.5) < 1e-9
+    assert triangle.vertex_in_circumcircle(Vertex(1, 1))
+    assert not triangle.vertex_in_circumcircle(Vertex(3, 3))
+    assert triangle.edge0 == Edge(Vertex(0, 0), Vertex(2, 0))
+    assert triangle.edge2.v0 == Vertex(0, 2)
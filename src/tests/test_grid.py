@@ -0,0 +1,60 @@
+from entities.grid import TILE_SIZE, CellView, ChunkedWeightGrid, WeightGrid
+
+
+def test_fill_and_fill_rect():
+    grid = WeightGrid(10, 5, 1)
+    assert len(grid.weights) == 50
+    grid.fill_rect((2, 1), 3, 2, 3)
+    assert sum(grid.weights) == 44 + 6 * 3
+    assert grid.get_weight((2, 1)) == 3
+    assert grid.get_weight((4, 2)) == 3
+    assert grid.get_weight((5, 2)) == 1
+    grid.fill(0.5)
+    assert sum(grid.weights) == 25
+
+
+def test_index_and_coords_match():
+    grid = WeightGrid(7, 3)
+    for x in range(7):
+        for y in range(3):
+            assert grid.coords(grid.index((x, y))) == (x, y)
+
+
+def test_cell_view_writes_to_grid():
+    grid = WeightGrid(4, 4)
+    cells = CellView(grid)
+    assert len(cells) == 16
+    assert (3, 3) in cells
+    assert (4, 0) not in cells
+    assert cells.get((-1, 0)) is None
+    cells[(1, 2)].weight = 5
+    assert grid.get_weight((1, 2)) == 5
+    assert cells[(1, 2)] == cells[(1, 2)]
+
+
+def test_chunked_grid_allocates_only_changed_tiles():
+    grid = ChunkedWeightGrid(20000, 20000, 1)
+    assert len(grid.weights) == 20000 * 20000
+    assert grid.get_weight((19999, 19999)) == 1
+    grid.set_weight((5, 5), 1)
+    assert grid.allocated_cells() == 0
+    grid.set_weight((19999, 19999), 0.5)
+    grid.fill_rect((60, 10), 10, 3, 3)
+    assert grid.allocated_cells() == 3 * TILE_SIZE * TILE_SIZE
+    assert grid.get_weight((19999, 19999)) == 0.5
+    assert grid.weights[grid.index((19999, 19999))] == 0.5
+    assert [grid.get_weight((x, 11)) for x in range(59, 71)] == [1] + [3] * 10 + [1]
+    grid.weights[grid.index((7, 8))] = 2
+    assert grid.get_weight((7, 8)) == 2
+    grid.fill(1)
+    assert grid.allocated_cells() == 0
+
+
+def test_chunked_grid_matches_dense_grid():
+    dense = WeightGrid(150, 70, 1)
+    chunked = ChunkedWeightGrid(150, 70, 1)
+    for grid in (dense, chunked):
+        grid.fill_rect((20, 5), 100, 60, 3)
+        grid.set_weight((149, 69), 0.5)
+        grid.set_weight((25, 6), 0.5)
+    assert list(chunked.weights) == list(dense.weights)
@@ -0,0 +1,24 @@
+from entities.hallway import RUN_LENGTH, Hallway
+
+
+def test_path_order_is_kept():
+    path = [(5, 5), (5, 4), (4, 4), (3, 4), (3, 5)]
+    hallway = Hallway(path, ((3, 5), (5, 5)))
+    assert hallway.path == path
+    assert hallway.coords == sorted(path)
+    assert len(hallway) == 5
+    assert hallway.ends == ((3, 5), (5, 5))
+
+
+def test_straight_parts_are_single_runs():
+    path = [(x, 0) for x in range(100)] + [(99, y) for y in range(1, 50)]
+    hallway = Hallway(path)
+    assert len(hallway.runs) == 2 * RUN_LENGTH
+    assert list(hallway) == path
+
+
+def test_any_coordinates_can_be_stored():
+    for path in ([], [(2, 3)], [(0, 0), (1, 0), (1, 1), (4, 5), (5, 5)], [(1, 1), (1, 1)]):
+        hallway = Hallway(path)
+        assert hallway.path == path
+        assert Hallway.from_runs(hallway.runs).path == path
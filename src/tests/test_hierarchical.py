@@ -0,0 +1,76 @@
+import pytest
+
+from algorithms import shortest_path_a_star
+from entities.map import CHUNKED_STORAGE, Map
+from hierarchical import HierarchicalRouter
+from services.generate import HIERARCHICAL_ROUTING, generate_dungeon
+from values import PATH_WEIGHT, ROOM_WEIGHT
+
+
+def path_cost(map: Map, path: list) -> float:
+    return sum(map.grid.get_weight(coords) for coords in path[1:])
+
+
+def assert_connected(path: list, start: tuple, end: tuple):
+    assert path[0] == start
+    assert path[-1] == end
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        assert abs(x1 - x2) + abs(y1 - y2) == 1
+
+
+def test_path_on_empty_map_is_shortest():
+    map = Map(100, 100, 3)
+    router = HierarchicalRouter(map)
+    path = router.find_path(map.get_cell((3, 5)), map.get_cell((90, 70)))
+    assert_connected(path, (3, 5), (90, 70))
+    assert len(path) == 87 + 65 + 1
+    path = router.find_path(map.get_cell((3, 5)), map.get_cell((3, 5)))
+    assert path == [(3, 5)]
+
+
+def test_path_inside_one_cluster_goes_around_rooms():
+    map = Map(50, 50, 3)
+    map.grid.fill_rect((5, 0), 1, 10, ROOM_WEIGHT)
+    router = HierarchicalRouter(map)
+    path = router.find_path(map.get_cell((2, 2)), map.get_cell((8, 2)))
+    assert path_cost(map, path) == path_cost(
+        map, shortest_path_a_star(map, map.get_cell((2, 2)), map.get_cell((8, 2))))
+
+
+def test_paths_are_close_to_a_star():
+    map = Map(200, 200, 20, seed=2)
+    map.place_rooms()
+    router = HierarchicalRouter(map)
+    rooms = map.placed_rooms
+    for first, second in zip(rooms, rooms[1:]):
+        start = map.cells[first.bottom_left_coords]
+        end = map.cells[second.bottom_left_coords]
+        path = router.find_path(start, end)
+        assert_connected(path, start.coords, end.coords)
+        best = path_cost(map, shortest_path_a_star(map, start, end))
+        assert path_cost(map, path) <= best * 1.5
+
+
+def test_update_uses_new_hallways():
+    map = Map(100, 100, 3)
+    router = HierarchicalRouter(map)
+    path = router.find_path(map.get_cell((0, 50)), map.get_cell((99, 50)))
+    assert path_cost(map, path) >= 99
+    assert router.intra
+    hallway = [(x, 50) for x in range(100)]
+    for coords in hallway:
+        map.grid.set_weight(coords, PATH_WEIGHT)
+    router.update(hallway)
+    path = router.find_path(map.get_cell((0, 50)), map.get_cell((99, 50)))
+    assert path_cost(map, path) == 99 * PATH_WEIGHT
+
+
+def test_generate_dungeon_with_hierarchical_routing():
+    map = Map(300, 300, 20, seed=5, storage=CHUNKED_STORAGE)
+    hallways = generate_dungeon(map, extra_edges=False, routing=HIERARCHICAL_ROUTING)
+    assert len(hallways) == 19
+    for hallway in hallways:
+        start, end = hallway.ends
+        assert start in hallway.coords and end in hallway.coords
+    with pytest.raises(ValueError):
+        generate_dungeon(Map(50, 50, 3), routing="unknown")
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmark import compare_import_time, measure_import_time
+
+SOURCE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["tkinter", "matplotlib", "numpy"]
+
+
+def loaded_heavy_modules(module: str) -> list:
+    code = (f"import sys, {module}\n"
+            f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))")
+    process = subprocess.run([sys.executable, "-c", code], cwd=SOURCE_DIRECTORY,
+                             capture_output=True, text=True, check=True)
+    return [name for name in process.stdout.strip().split(",") if name]
+
+
+@pytest.mark.parametrize("module", ["core", "index", "batch", "benchmark", "services.cache"])
+def test_headless_modules_do_not_import_ui_libraries(module):
+    assert loaded_heavy_modules(module) == []
+
+
+def test_ui_does_not_import_plotting_libraries():
+    assert loaded_heavy_modules("ui.ui") == ["tkinter"]
+
+
+def test_import_time_is_measured():
+    seconds = measure_import_time(repeat=1)
+    assert 0 < seconds < 5
+    assert compare_import_time(seconds, {}) == []
+    assert compare_import_time(seconds, {"import_time": seconds / 2})[0][:2] == ("import", "core")
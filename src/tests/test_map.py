@@ -2,7 +2,10 @@ import pytest
 
 from entities.cell import Cell
 from entities.hallway import Hallway
-from entities.map import Map, RoomPlacementError, RoomSizeError
+from entities.map import FREE_SPACE_PLACEMENT, Map, RoomPlacementError, RoomSizeError
+from entities.room import Room
+from services.generate import generate_dungeon
+from services.stats import GenerationStats
 from values import EMPTY_WEIGHT, PATH_WEIGHT, ROOM_WEIGHT
 
 
@@ -46,6 +49,31 @@ def test_hallways_are_added():
     assert hallway_cells == 4
 
 
+def test_cells_show_placed_rooms_and_hallways():
+    map = Map(20, 20, 3, room_exact_size=3)
+    room = map.place_new_room(Room(3, 3))
+    x, y = room.bottom_left_coords
+    assert map.cells[(x, y)].weight == ROOM_WEIGHT
+    assert map.cells[(x + 2, y + 2)].weight == ROOM_WEIGHT
+    room_weights = sum(cell.weight for cell in map.cells.values())
+    assert room_weights == EMPTY_WEIGHT * 391 + ROOM_WEIGHT * 9
+    outside = (x + 3, y) if x + 3 < 20 else (x - 1, y)
+    assert map.get_cell(outside).weight == EMPTY_WEIGHT
+    map.add_hallway(Hallway([outside]))
+    assert map.cells[outside].weight == PATH_WEIGHT
+    assert map.get_cell(outside).weight == PATH_WEIGHT
+
+
+def test_reset_placement_empties_cells():
+    map = Map(30, 30, 5, room_exact_size=2)
+    map.place_rooms()
+    map.add_hallway(Hallway([(0, 0), (0, 1)]))
+    map.reset_placement()
+    assert not map.placed_rooms
+    for cell in map.cells.values():
+        assert cell.weight == EMPTY_WEIGHT
+
+
 def test_map_size_is_correct():
     map = Map(1000, 1000, 3)
     assert map.get_size()[0] == 1000
@@ -74,3 +102,69 @@ def test_max_room_size_cannot_be_less_than_min_room_size():
 def test_3_rooms_with_same_size_as_map_cannot_be_placed():
     with pytest.raises(RoomPlacementError):
         Map(100, 100, 3, room_exact_size=100).place_rooms()
+
+
+def test_free_space_placement_places_dense_maps():
+    stats = GenerationStats()
+    for seed in range(5):
+        map = Map(40, 40, 80, room_min_size=2, room_max_size=5, seed=seed,
+                  placement=FREE_SPACE_PLACEMENT)
+        map.place_rooms(stats)
+        assert len(map.placed_rooms) == 80
+        for index, room in enumerate(map.placed_rooms):
+            for other in map.placed_rooms[index + 1:]:
+                assert not room.overlaps(other.bottom_left_coords, other.size_x, other.size_y)
+    assert stats.placement_tries < 5 * 80 * 10
+
+
+def test_free_space_placement_fails_immediately_if_rooms_cannot_fit():
+    map = Map(10, 10, 7, room_exact_size=4, placement=FREE_SPACE_PLACEMENT)
+    stats = GenerationStats()
+    with pytest.raises(RoomPlacementError):
+        map.place_rooms(stats)
+    assert stats.placement_tries == 0
+
+
+def test_unknown_placement_method():
+    with pytest.raises(ValueError):
+        Map(10, 10, 3, placement="somewhere")
+
+
+def test_removing_keeps_hallways_over_rooms():
+    map = Map(20, 20, 3)
+    room = Room(4, 4)
+    room.bottom_left_coords = (2, 2)
+    map.add_room(room)
+    first = Hallway([(x, 3) for x in range(10)])
+    second = Hallway([(3, y) for y in range(10)])
+    map.add_hallway(first)
+    map.add_hallway(second)
+    map.remove_hallway(first)
+    assert map.cells[(3, 3)].weight == PATH_WEIGHT
+    assert map.cells[(2, 3)].weight == ROOM_WEIGHT
+    assert map.cells[(8, 3)].weight == EMPTY_WEIGHT
+    map.remove_room(room)
+    assert map.cells[(3, 3)].weight == PATH_WEIGHT
+    assert map.cells[(2, 3)].weight == EMPTY_WEIGHT
+    map.remove_hallway(second)
+    assert map.cells[(3, 3)].weight == EMPTY_WEIGHT
+    assert not map.corridor_cells
+
+
+def test_reset_map_generates_the_same_dungeon_as_a_new_map():
+    map = Map(120, 120, 10, seed=1)
+    generate_dungeon(map)
+    grid = map.grid
+    buffers = map.search_buffers
+    map.reset(12, room_min_size=3, room_max_size=5, seed=2)
+    assert not map.added_hallways and not map.corridor_cells and not map.placed_rooms
+    generate_dungeon(map)
+    new_map = Map(120, 120, 12, room_min_size=3, room_max_size=5, seed=2)
+    generate_dungeon(new_map)
+    assert [room.bottom_left_coords for room in map.placed_rooms] == \
+        [room.bottom_left_coords for room in new_map.placed_rooms]
+    assert [hallway.coords for hallway in map.added_hallways] == \
+        [hallway.coords for hallway in new_map.added_hallways]
+    assert list(map.grid.weights) == list(new_map.grid.weights)
+    assert map.grid is grid
+    assert map.search_buffers is buffers
@@ -0,0 +1,38 @@
+import tracemalloc
+
+from entities.map import Map
+from memory_report import MEMORY_STAGES, main, measure_memory
+from services.generate import generate_dungeon
+from services.stats import GenerationStats
+
+
+def test_memory_is_recorded_for_every_stage():
+    params = {"map_size_x": 100, "map_size_y": 100, "amount": 10}
+    result = measure_memory(params, seed=1)
+    assert set(result["stages"]) == set(MEMORY_STAGES)
+    # the weights of the cells are 8 bytes each
+    assert result["stages"]["create_map"]["retained"] >= 100 * 100 * 8
+    for memory in result["stages"].values():
+        assert memory["peak"] >= memory["retained"]
+    assert result["peak"] >= result["retained"] > 0
+    # every search runs on top of the map, which stays allocated
+    stages = result["stages"]
+    assert result["peak"] >= stages["create_map"]["retained"] + stages["a_star"]["peak"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_memory_is_not_recorded_by_default():
+    tracemalloc.start()
+    try:
+        stats = GenerationStats()
+        generate_dungeon(Map(50, 50, 5, seed=1), stats=stats)
+    finally:
+        tracemalloc.stop()
+    assert stats.stage_memory == {}
+    assert stats.stage_times
+
+
+def test_report_is_written(tmp_path):
+    output = tmp_path / "memory.json"
+    assert main(["--size", "60x60", "--amount", "5", "--output", str(output)]) == 0
+    assert output.exists()
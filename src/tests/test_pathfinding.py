@@ -1,7 +1,9 @@
 import pytest
 
-from algorithms import shortest_path_a_star
-from entities.map import Map
+import algorithms
+from algorithms import shortest_path_a_star, shortest_path_bucket
+from entities.map import CHUNKED_STORAGE, Map
+from services.generate import BUCKET_ROUTING, generate_dungeon
 
 TEST_ROOM_WEIGHT = 5
 TEST_ROOM_WEIGHT_2 = 4
@@ -30,3 +32,76 @@ def test_path_length_is_correct_a_star(setup: Map):
     path = shortest_path_a_star(
         setup, setup.get_cell((0, 0)), setup.get_cell((2, 0)))
     assert len(path) == 3
+
+
+def test_search_buffers_are_reused():
+    map = Map(500, 500, 3)
+    path = shortest_path_a_star(map, map.get_cell((10, 10)), map.get_cell((12, 10)))
+    assert len(path) == 3
+    buffers = map.search_buffers
+    path = shortest_path_a_star(map, map.get_cell((499, 499)), map.get_cell((499, 497)))
+    assert path == [(499, 499), (499, 498), (499, 497)]
+    assert map.search_buffers is buffers
+    assert buffers.generation == 2
+
+
+def test_chunked_maps_give_the_same_dungeon(monkeypatch):
+    dense = Map(120, 100, 8, seed=6)
+    generate_dungeon(dense)
+    # the chunked map also keeps its search state in dictionaries
+    monkeypatch.setattr(algorithms, "DENSE_SEARCH_MAX_CELLS", 100)
+    chunked = Map(120, 100, 8, seed=6, storage=CHUNKED_STORAGE)
+    generate_dungeon(chunked)
+    assert isinstance(chunked.search_buffers, algorithms.SparseSearchBuffers)
+    assert [hallway.coords for hallway in chunked.added_hallways] == \
+        [hallway.coords for hallway in dense.added_hallways]
+    assert list(chunked.grid.weights) == list(dense.grid.weights)
+
+
+def test_path_on_huge_chunked_map():
+    map = Map(20000, 20000, 3, storage=CHUNKED_STORAGE)
+    path = shortest_path_a_star(map, map.get_cell((19990, 19990)), map.get_cell((19999, 19999)))
+    assert len(path) == 19
+    assert isinstance(map.search_buffers, algorithms.SparseSearchBuffers)
+    assert map.grid.allocated_cells() == 0
+
+
+def path_cost(map: Map, path: list) -> float:
+    return sum(map.grid.get_weight(coords) for coords in path[1:])
+
+
+def test_bucket_search_finds_cheapest_path(setup: Map):
+    path = shortest_path_bucket(setup, setup.get_cell((0, 0)), setup.get_cell((49, 49)))
+    assert len(path) == 99
+    assert shortest_path_bucket(setup, setup.get_cell((3, 3)), setup.get_cell((3, 3))) == [(3, 3)]
+    setup.cells[(1, 0)].weight = TEST_ROOM_WEIGHT
+    setup.cells[(1, 1)].weight = TEST_ROOM_WEIGHT
+    path = shortest_path_bucket(setup, setup.get_cell((0, 0)), setup.get_cell((2, 0)))
+    assert len(path) == 7
+    assert path_cost(setup, path) == 6
+
+
+def test_bucket_search_is_never_more_expensive_than_a_star():
+    map = Map(150, 150, 15, seed=8)
+    map.place_rooms()
+    rooms = map.placed_rooms
+    for first, second in zip(rooms, rooms[1:]):
+        start = map.cells[first.bottom_left_coords]
+        end = map.cells[second.bottom_left_coords]
+        path = shortest_path_bucket(map, start, end)
+        assert path[0] == start.coords and path[-1] == end.coords
+        assert path_cost(map, path) <= path_cost(map, shortest_path_a_star(map, start, end))
+
+
+def test_bucket_search_grows_its_ring_for_heavy_cells():
+    map = Map(30, 30, 3)
+    map.grid.fill_rect((5, 0), 1, 30, 40)
+    path = shortest_path_bucket(map, map.get_cell((0, 10)), map.get_cell((10, 10)))
+    assert len(path) == 11
+    assert path_cost(map, path) == 9 + 40
+
+
+def test_generate_dungeon_with_bucket_routing():
+    map = Map(100, 100, 10, seed=2)
+    hallways = generate_dungeon(map, extra_edges=False, routing=BUCKET_ROUTING)
+    assert len(hallways) == 9
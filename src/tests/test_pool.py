@@ -0,0 +1,32 @@
+from entities.map import CHUNKED_STORAGE
+from services.generate import generate_dungeon
+from services.pool import MapPool
+
+
+def test_released_maps_are_reused():
+    pool = MapPool(maxsize=2)
+    map = pool.acquire(80, 80, 5, seed=1)
+    generate_dungeon(map)
+    pool.release(map)
+    reused = pool.acquire(80, 80, 6, seed=2)
+    assert reused is map
+    assert len(reused.created_rooms) == 6
+    assert not reused.added_hallways
+    assert (pool.created, pool.reused) == (1, 1)
+
+
+def test_maps_of_other_sizes_are_not_reused():
+    pool = MapPool(maxsize=2)
+    map = pool.acquire(80, 80, 5)
+    pool.release(map)
+    assert pool.acquire(80, 60, 5) is not map
+    assert pool.acquire(80, 80, 5, storage=CHUNKED_STORAGE) is not map
+    assert pool.maps == [map]
+
+
+def test_pool_keeps_at_most_maxsize_maps():
+    pool = MapPool(maxsize=2)
+    maps = [pool.acquire(50, 50, 3) for _ in range(3)]
+    for map in maps:
+        pool.release(map)
+    assert pool.maps == maps[1:]
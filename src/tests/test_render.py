@@ -0,0 +1,29 @@
+from entities.hallway import Hallway
+from entities.map import Map
+from entities.room import Room
+from ui.render import (DOOR_COLOR, HALLWAY_COLOR, ROOM_COLOR, grid_steps,
+                       render_map_image)
+
+
+def test_map_is_rasterized():
+    map = Map(20, 10, 3)
+    room = Room(3, 2)
+    room.bottom_left_coords = (4, 5)
+    map.add_room(room)
+    map.add_hallway(Hallway([(0, 0), (1, 0), (1, 1), (4, 5), (5, 5)]))
+    map.add_hallway(Hallway([(1, 1), (1, 2)]))
+    image = render_map_image(map)
+    assert image.shape == (10, 20, 4)
+    assert tuple(image[0, 1]) == HALLWAY_COLOR
+    assert tuple(image[2, 1]) == HALLWAY_COLOR
+    assert tuple(image[5, 4]) == DOOR_COLOR
+    assert tuple(image[5, 5]) == ROOM_COLOR
+    assert tuple(image[6, 6]) == ROOM_COLOR
+    assert tuple(image[9, 19]) == (0, 0, 0, 0)
+    assert (image[:, :, 3] > 0).sum() == 4 + 6
+
+
+def test_grid_adapts_to_zoom():
+    assert grid_steps(50) == (5, True)
+    assert grid_steps(500) == (50, False)
+    assert grid_steps(20000)[0] >= 2000
@@ -21,3 +21,15 @@ def test_room_coords_are_correct():
     room.bottom_left_coords = (0, 0)
     coords = room.get_all_coords()
     assert coords == []
+
+
+def test_room_covers_and_overlaps():
+    room = Room(3, 2)
+    room.bottom_left_coords = (4, 4)
+    assert room.covers((4, 4))
+    assert room.covers((6, 5))
+    assert not room.covers((7, 5))
+    assert not room.covers((6, 6))
+    assert room.overlaps((6, 5), 5, 5)
+    assert not room.overlaps((7, 4), 1, 1)
+    assert not room.overlaps((0, 0), 4, 10)
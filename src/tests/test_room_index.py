@@ -0,0 +1,27 @@
+from entities.room import Room
+from entities.room_index import RoomIndex
+
+
+def make_room(x, y, size_x, size_y):
+    room = Room(size_x, size_y)
+    room.bottom_left_coords = (x, y)
+    return room
+
+
+def test_free_space_is_detected():
+    index = RoomIndex(4)
+    index.add(make_room(2, 2, 4, 4))
+    assert not index.is_free((5, 5), 2, 2)
+    assert not index.is_free((0, 0), 3, 3)
+    assert index.is_free((6, 2), 4, 4)
+    assert index.is_free((0, 0), 2, 10)
+
+
+def test_large_rooms_and_removal():
+    index = RoomIndex(2)
+    room = make_room(0, 0, 10, 10)
+    index.add(room)
+    assert not index.is_free((9, 9), 1, 1)
+    index.remove(room)
+    assert index.is_free((9, 9), 1, 1)
+    assert not index.buckets
@@ -1,6 +1,6 @@
 import pytest
 
-from algorithms import bowyer_watson, kruskal
+from algorithms import UnionFind, bowyer_watson, distinct_edges, kruskal
 from entities.geometry import Edge, Vertex
 
 
@@ -10,7 +10,8 @@ def test_triangle():
     edge3 = Edge(Vertex(0, 1), Vertex(1, 1))
     result = kruskal([edge1.v0, edge1.v1, edge2.v0, edge2.v1,
                      edge3.v0, edge3.v1], [edge1, edge2, edge3])
-    assert len(result) == 3
+    # vertices with the same coordinates are the same node, so 3 nodes need 2 edges
+    assert len(result) == 2
 
 
 def test_rectangle():
@@ -20,7 +21,7 @@ def test_rectangle():
     edge4 = Edge(Vertex(1, 1), Vertex(1, 0))
     result = kruskal([edge1.v0, edge1.v1, edge2.v0, edge2.v1, edge3.v0, edge3.v1, edge4.v0, edge4.v1], [
         edge1, edge2, edge3, edge4])
-    assert len(result) == 4
+    assert len(result) == 3
 
 
 def test_linear_path_does_not_get_modified():
@@ -31,3 +32,22 @@ def test_linear_path_does_not_get_modified():
     result = kruskal([edge1.v0, edge1.v1, edge2.v0, edge2.v1, edge3.v0,
                      edge3.v1, edge4.v0, edge4.v1], [edge1, edge2, edge3, edge4])
     assert len(result) == 4
+
+
+def test_union_find():
+    union_find = UnionFind(6)
+    assert union_find.union(0, 1)
+    assert union_find.union(2, 3)
+    assert union_find.union(1, 3)
+    assert not union_find.union(0, 2)
+    assert union_find.find(0) == union_find.find(3)
+    assert union_find.find(4) != union_find.find(0)
+
+
+def test_duplicate_edges_are_considered_once():
+    edge = Edge(Vertex(0, 0), Vertex(0, 1))
+    same_edge = Edge(Vertex(0, 1), Vertex(0, 0))
+    other = Edge(Vertex(0, 1), Vertex(2, 1))
+    assert distinct_edges([edge, same_edge, other, edge]) == [edge, other]
+    result = kruskal([edge.v0, edge.v1, other.v1], [edge, same_edge, other])
+    assert result == [edge, other]
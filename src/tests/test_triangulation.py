@@ -0,0 +1,124 @@
+import random
+
+from algorithms import bowyer_watson
+from triangulation import (Triangulation, delaunay_triangulation,
+                           in_circumcircle, orientation)
+
+
+def test_3_rooms_results_in_one_triangle():
+    assert len(delaunay_triangulation([(0, 0), (10, 10), (0, 5)])) == 1
+    assert len(delaunay_triangulation([(0, 0), (1, 2), (2, 2)])) == 1
+
+
+def test_rooms_that_are_on_the_same_line_result_in_0_triangles():
+    assert delaunay_triangulation([(0, 0), (10, 0), (56, 0)]) == []
+    assert delaunay_triangulation([(0, 5), (0, 23), (0, 123456)]) == []
+    assert delaunay_triangulation([(1, 1), (0, 0), (20, 20)]) == []
+    assert delaunay_triangulation([(0, 0), (1, 1)]) == []
+
+
+def test_triangulation_is_delaunay():
+    rng = random.Random(5)
+    coords = list({(rng.randint(0, 200), rng.randint(0, 200)) for _ in range(300)})
+    triangles = delaunay_triangulation(coords)
+    for triangle in triangles:
+        a = (triangle.v0.x, triangle.v0.y)
+        b = (triangle.v1.x, triangle.v1.y)
+        c = (triangle.v2.x, triangle.v2.y)
+        assert orientation(a, b, c) > 0
+        for coord in coords:
+            assert in_circumcircle(a, b, c, coord) <= 0
+    used = {(vertex.x, vertex.y) for triangle in triangles
+            for vertex in (triangle.v0, triangle.v1, triangle.v2)}
+    assert used == set(coords)
+
+
+def test_points_in_convex_position():
+    coords = [(i, i**2) for i in range(1000)]
+    assert len(delaunay_triangulation(coords)) == 998
+
+
+def test_adjacency_is_consistent():
+    triangulation = Triangulation(0, 0, 100, 100)
+    rng = random.Random(1)
+    for _ in range(200):
+        triangulation.add_vertex((rng.randint(0, 100), rng.randint(0, 100)))
+    for triangle, triangle_vertices in enumerate(triangulation.vertices):
+        if triangle_vertices is None:
+            continue
+        for neighbor in triangulation.neighbors[triangle]:
+            if neighbor is not None:
+                assert triangle in triangulation.neighbors[neighbor]
+
+
+def test_hull_is_complete_for_nearly_collinear_rooms():
+    # the rooms are almost on the same line, so their triangle has a huge circumcircle
+    # that a supertriangle vertex placed too close would fall into
+    triangles = delaunay_triangulation([(0, 0), (100000, 1), (200000, 3)])
+    assert len(triangles) == 1
+    triangles = delaunay_triangulation([(0, 0), (100000, 1), (200000, 3), (100000, 50000)])
+    assert len(triangles) == 2
+    edges = {frozenset(((vertex1.x, vertex1.y), (vertex2.x, vertex2.y)))
+             for triangle in triangles
+             for vertex1, vertex2 in ((triangle.v0, triangle.v1), (triangle.v1, triangle.v2),
+                                      (triangle.v2, triangle.v0))}
+    assert frozenset(((0, 0), (100000, 1))) in edges
+    assert frozenset(((100000, 1), (200000, 3))) in edges
+
+
+def test_same_result_as_bowyer_watson():
+    inputs = [[(0, 0), (10, 10), (0, 5)], [(0, 0), (1, 2), (2, 2)],
+              [(0, 0), (10, 0), (56, 0)], [(10, -6), (13, -6), (-6, -6)],
+              [(0, 5), (0, 23), (0, 123456)], [(0, -6), (0, -5), (0, -4)],
+              [(0, 0), (1, 1), (2, 2)], [(1, 1), (0, 0), (20, 20)]]
+    rng = random.Random(3)
+    inputs.append(list({(rng.randint(0, 60), rng.randint(0, 60)) for _ in range(40)}))
+    for coords in inputs:
+        assert triangle_set(delaunay_triangulation(coords)) == \
+            triangle_set(bowyer_watson(coords))
+
+
+def triangle_set(triangles):
+    return {frozenset((vertex.x, vertex.y) for vertex in (triangle.v0, triangle.v1, triangle.v2))
+            for triangle in triangles}
+
+
+def test_removing_vertices_keeps_triangulation_delaunay():
+    rng = random.Random(3)
+    triangulation = Triangulation(0, 0, 30, 30)
+    coords = set()
+    for _ in range(300):
+        if coords and rng.random() < 0.4:
+            coord = rng.choice(sorted(coords))
+            triangulation.remove_vertex(coord)
+            coords.remove(coord)
+        else:
+            coord = (rng.randint(0, 30), rng.randint(0, 30))
+            triangulation.add_vertex(coord)
+            coords.add(coord)
+    triangles = triangulation.get_triangles()
+    for triangle in triangles:
+        a = (triangle.v0.x, triangle.v0.y)
+        b = (triangle.v1.x, triangle.v1.y)
+        c = (triangle.v2.x, triangle.v2.y)
+        assert orientation(a, b, c) > 0
+        for coord in coords:
+            assert in_circumcircle(a, b, c, coord) <= 0
+    assert len(triangles) == len(delaunay_triangulation(list(coords)))
+    for triangle, triangle_vertices in enumerate(triangulation.vertices):
+        if triangle_vertices is None:
+            continue
+        for neighbor in triangulation.neighbors[triangle]:
+            if neighbor is not None:
+                assert triangle in triangulation.neighbors[neighbor]
+
+
+def test_neighbors_and_edges():
+    triangulation = Triangulation(0, 0, 10, 10)
+    for coord in [(0, 0), (10, 0), (0, 10), (10, 10), (4, 5)]:
+        triangulation.add_vertex(coord)
+    assert sorted(triangulation.neighbors_of((4, 5))) == [(0, 0), (0, 10), (10, 0), (10, 10)]
+    assert len(triangulation.edges()) == 8
+    triangulation.remove_vertex((4, 5))
+    assert len(triangulation.edges()) == 5
+    assert len(triangulation.get_triangles()) == 2
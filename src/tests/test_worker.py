@@ -0,0 +1,52 @@
+import time
+
+from entities.map import Map, RoomPlacementError
+from services.worker import GenerationWorker
+
+
+def wait_for_result(worker: GenerationWorker) -> tuple:
+    messages = []
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        messages += worker.poll()
+        if messages and messages[-1][0] != "progress":
+            return messages[-1], messages[:-1]
+        time.sleep(0.01)
+    raise AssertionError("worker did not finish")
+
+
+def test_worker_generates_map():
+    map = Map(100, 100, 10, seed=3)
+    worker = GenerationWorker(map)
+    worker.start()
+    (kind, hallways), progress = wait_for_result(worker)
+    assert kind == "done"
+    assert hallways == map.added_hallways
+    assert progress[0] == ("progress", ("place_rooms", 0, 1))
+    worker.thread.join()
+    assert not worker.is_running()
+
+
+def test_worker_can_be_cancelled():
+    worker = GenerationWorker(Map(100, 100, 10, seed=3))
+    worker.cancel()
+    worker.start()
+    assert wait_for_result(worker)[0] == ("cancelled", None)
+
+
+def test_worker_reports_errors():
+    worker = GenerationWorker(Map(10, 10, 30, room_exact_size=5))
+    worker.start()
+    kind, error = wait_for_result(worker)[0]
+    assert kind == "error"
+    assert isinstance(error, RoomPlacementError)
+
+
+def test_worker_reports_unexpected_errors():
+    map = Map(100, 100, 10, seed=3)
+    map.place_rooms = None
+    worker = GenerationWorker(map)
+    worker.start()
+    kind, error = wait_for_result(worker)[0]
+    assert kind == "error"
+    assert isinstance(error, TypeError)
@@ -0,0 +1,428 @@
+"""An incremental Delaunay triangulation that scales to large amounts of rooms.
+
+Unlike bowyer_watson in algorithms.py, which checks every new vertex against every triangle,
+this triangulation remembers which triangles are next to each other. A new vertex is located
+by walking from the previously added triangle towards it, and only the triangles around the
+vertex are checked and replaced. When the vertices are added in a spatially sorted order,
+each walk is short, and building the whole triangulation takes about O(n log n) time.
+"""
+from entities.geometry import Triangle, Vertex
+
+
+def orientation(a: tuple, b: tuple, c: tuple):
+    """Returns a positive number if the points a, b and c are in counterclockwise order,
+    a negative number if they are in clockwise order, and 0 if they are on the same line.
+    """
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+
+def in_circumcircle(a: tuple, b: tuple, c: tuple, d: tuple):
+    """Returns a positive number if the point d is inside the circumcircle
+    of the counterclockwise triangle a, b, c, a negative number if it is outside,
+    and 0 if it is on the circle. The result is exact for integer coordinates.
+    """
+    adx = a[0] - d[0]
+    ady = a[1] - d[1]
+    bdx = b[0] - d[0]
+    bdy = b[1] - d[1]
+    cdx = c[0] - d[0]
+    cdy = c[1] - d[1]
+    return ((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy)
+            + (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy)
+            + (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady))
+
+
+def supertriangle_margin(span: int) -> int:
+    """Returns how far the supertriangle's vertices are placed from the area of the rooms.
+
+    The supertriangle's vertices are removed at the end, so they must not be inside
+    the circumcircle of any triangle between the rooms, or some of those triangles
+    (usually ones on the convex hull) would be missing from the result.
+    For integer coordinates inside a square of width span, a triangle's area is at least 1/2
+    and its sides are at most span * sqrt(2) long, so its circumradius is less than 1.5 * span^3.
+    Placing the vertices more than twice that far away keeps them outside every such circle.
+    The predicates below are exact for integers, so the large coordinates are not a problem.
+    Non-integer coordinates do not have this guarantee.
+
+    Args:
+        span (int): Width of the square that contains all rooms.
+
+    Returns:
+        int: The distance.
+    """
+    return 4 * span ** 3 + span
+
+
+def hilbert_index(x: int, y: int, order: int) -> int:
+    """Returns the position of a point along a Hilbert curve that fills a 2^order sized square.
+    Points that are close to each other on the curve are also close to each other on the map.
+    """
+    index = 0
+    side = 1 << (order - 1)
+    while side > 0:
+        rx = 1 if x & side else 0
+        ry = 1 if y & side else 0
+        index += side * side * ((3 * rx) ^ ry)
+        if ry == 0:
+            if rx == 1:
+                x = side - 1 - x
+                y = side - 1 - y
+            x, y = y, x
+        side >>= 1
+    return index
+
+
+def spatial_order(x_y_coords: list) -> list:
+    """Sorts coordinates along a Hilbert curve.
+
+    Args:
+        x_y_coords (list): List of (x, y) coordinates.
+
+    Returns:
+        list: The same coordinates in Hilbert curve order.
+    """
+    if not x_y_coords:
+        return []
+    smallest_x = min(coord[0] for coord in x_y_coords)
+    smallest_y = min(coord[1] for coord in x_y_coords)
+    span = max(max(coord[0] for coord in x_y_coords) - smallest_x,
+               max(coord[1] for coord in x_y_coords) - smallest_y)
+    order = max(1, int(span).bit_length())
+    return sorted(x_y_coords, key=lambda coord: hilbert_index(
+        int(coord[0] - smallest_x), int(coord[1] - smallest_y), order))
+
+
+class Triangulation:
+    """A Delaunay triangulation that vertices can be added to one at a time.
+
+    Triangles are stored by their index. For the triangle t, vertices[t] holds
+    the indices of its 3 vertices in counterclockwise order, and neighbors[t][i] is the
+    triangle on the other side of the edge opposite to vertex i. The first 3 vertices
+    belong to a supertriangle that contains the whole area.
+
+    Attributes:
+        points (list): Coordinates of every vertex in (x, y) format.
+        vertices (list): Vertex indices of every triangle, or None if the triangle was removed.
+        neighbors (list): Neighboring triangles of every triangle.
+        triangles_created (int): How many triangles have been created in total.
+        triangles_destroyed (int): How many triangles have been removed in total.
+    """
+
+    def __init__(self, smallest_x: int, smallest_y: int, largest_x: int, largest_y: int) -> None:
+        """
+        Args:
+            smallest_x (int): Smallest x-coordinate that a vertex can have.
+            smallest_y (int): Smallest y-coordinate that a vertex can have.
+            largest_x (int): Largest x-coordinate that a vertex can have.
+            largest_y (int): Largest y-coordinate that a vertex can have.
+        """
+        self.bounds = (smallest_x, smallest_y, largest_x, largest_y)
+        span = max(largest_x - smallest_x, largest_y - smallest_y) + 1
+        margin = supertriangle_margin(span)
+        center_x = (smallest_x + largest_x) // 2
+        self.points = [(smallest_x - margin, smallest_y - margin),
+                       (largest_x + margin, smallest_y - margin),
+                       (center_x, largest_y + margin)]
+        self.vertices = [[0, 1, 2]]
+        self.neighbors = [[None, None, None]]
+        self.vertex_triangle = [0, 0, 0]
+        self.index_of = {}
+        self.free = []
+        self.last = 0
+        self.triangles_created = 1
+        self.triangles_destroyed = 0
+
+    def _new_triangle(self, vertices: list, neighbors: list) -> int:
+        """Stores a triangle, reusing the place of a removed triangle if possible."""
+        self.triangles_created += 1
+        if self.free:
+            triangle = self.free.pop()
+            self.vertices[triangle] = vertices
+            self.neighbors[triangle] = neighbors
+            return triangle
+        self.vertices.append(vertices)
+        self.neighbors.append(neighbors)
+        return len(self.vertices) - 1
+
+    def _remove_triangle(self, triangle: int) -> None:
+        self.triangles_destroyed += 1
+        self.vertices[triangle] = None
+        self.neighbors[triangle] = None
+        self.free.append(triangle)
+
+    def locate(self, point: tuple) -> int:
+        """Finds the triangle that contains the point by walking towards it
+        from the last triangle that was created.
+
+        Args:
+            point (tuple): Coordinates in (x, y) format.
+
+        Returns:
+            int: Index of a triangle that contains the point.
+        """
+        points = self.points
+        triangle = self.last
+        # the edge that is checked first rotates so that the walk cannot loop forever
+        start = 0
+        while True:
+            triangle_vertices = self.vertices[triangle]
+            for offset in range(3):
+                i = (start + offset) % 3
+                a = points[triangle_vertices[(i + 1) % 3]]
+                b = points[triangle_vertices[(i + 2) % 3]]
+                if orientation(a, b, point) < 0:
+                    triangle = self.neighbors[triangle][i]
+                    start = (start + 1) % 3
+                    break
+            else:
+                return triangle
+
+    def add_vertex(self, point: tuple) -> int:
+        """Adds a vertex to the triangulation. The triangles whose circumcircle contains
+        the vertex are removed, and the hole is filled with triangles that connect
+        the vertex to the edges of the hole.
+
+        Args:
+            point (tuple): Coordinates of the vertex in (x, y) format.
+
+        Raises:
+            ValueError: Raised if the point is outside the area given to the constructor.
+
+        Returns:
+            int: Index of the vertex.
+        """
+        if point in self.index_of:
+            return self.index_of[point]
+        smallest_x, smallest_y, largest_x, largest_y = self.bounds
+        if not (smallest_x <= point[0] <= largest_x and smallest_y <= point[1] <= largest_y):
+            raise ValueError(f"Point {point} is outside the triangulated area.")
+
+        points = self.points
+        vertices = self.vertices
+        neighbors = self.neighbors
+
+        # find all triangles whose circumcircle contains the point
+        first = self.locate(point)
+        cavity = {first}
+        stack = [first]
+        while stack:
+            triangle = stack.pop()
+            for neighbor in neighbors[triangle]:
+                if neighbor is None or neighbor in cavity:
+                    continue
+                a, b, c = vertices[neighbor]
+                if in_circumcircle(points[a], points[b], points[c], point) > 0:
+                    cavity.add(neighbor)
+                    stack.append(neighbor)
+
+        new_vertex = len(points)
+        points.append(point)
+        self.vertex_triangle.append(None)
+        self.index_of[point] = new_vertex
+
+        # connect the new vertex to every edge on the boundary of the cavity
+        boundary = []
+        for triangle in cavity:
+            triangle_vertices = vertices[triangle]
+            for i in range(3):
+                outside = neighbors[triangle][i]
+                if outside not in cavity:
+                    boundary.append((triangle_vertices[(i + 1) % 3],
+                                     triangle_vertices[(i + 2) % 3], outside, triangle))
+        starts_at = {}
+        ends_at = {}
+        for a, b, outside, _ in boundary:
+            triangle = self._new_triangle([a, b, new_vertex], [None, None, outside])
+            if outside is not None:
+                # the outside triangle has the same edge as b, a, so the vertex
+                # opposite to the edge is the one that is neither a nor b
+                outside_vertices = vertices[outside]
+                for i in range(3):
+                    if outside_vertices[i] != a and outside_vertices[i] != b:
+                        neighbors[outside][i] = triangle
+            starts_at[a] = triangle
+            ends_at[b] = triangle
+            self.vertex_triangle[a] = triangle
+            self.vertex_triangle[b] = triangle
+        for a, b, _, _ in boundary:
+            triangle = starts_at[a]
+            neighbors[triangle][0] = starts_at[b]
+            neighbors[triangle][1] = ends_at[a]
+        # the old triangles are freed only now, so that their places are not reused
+        # while the new triangles are still being connected to their neighbors
+        for old in cavity:
+            self._remove_triangle(old)
+
+        self.vertex_triangle[new_vertex] = triangle
+        self.last = triangle
+        return new_vertex
+
+    def _set_neighbor(self, outside: int | None, a: int, b: int, triangle: int) -> None:
+        """Makes the triangle outside, which has the edge a, b, point to triangle across that edge."""
+        if outside is None:
+            return
+        outside_vertices = self.vertices[outside]
+        for i in range(3):
+            if outside_vertices[i] != a and outside_vertices[i] != b:
+                self.neighbors[outside][i] = triangle
+
+    def _star(self, vertex: int) -> list:
+        """Returns the triangles around a vertex in counterclockwise order,
+        as (triangle, position of the vertex in the triangle) pairs.
+        """
+        first = self.vertex_triangle[vertex]
+        star = []
+        triangle = first
+        while True:
+            i = self.vertices[triangle].index(vertex)
+            star.append((triangle, i))
+            # the next triangle shares the edge from the vertex to the vertex after i + 1
+            triangle = self.neighbors[triangle][(i + 1) % 3]
+            if triangle == first:
+                return star
+
+    def neighbors_of(self, point: tuple) -> list:
+        """Returns the coordinates of the vertices that share an edge with the given vertex,
+        leaving out the vertices of the supertriangle.
+
+        Args:
+            point (tuple): Coordinates of a vertex in (x, y) format.
+
+        Returns:
+            list: Coordinates in (x, y) format.
+        """
+        vertex = self.index_of[point]
+        result = []
+        for triangle, i in self._star(vertex):
+            other = self.vertices[triangle][(i + 1) % 3]
+            if other >= 3:
+                result.append(self.points[other])
+        return result
+
+    def remove_vertex(self, point: tuple) -> None:
+        """Removes a vertex from the triangulation. The triangles around the vertex
+        are removed, and the polygon that is left is filled by cutting off ears,
+        each time choosing an ear whose circumcircle contains no other vertex of the polygon.
+        This keeps the triangulation Delaunay, and the work depends only on the amount
+        of triangles around the vertex.
+
+        Args:
+            point (tuple): Coordinates of the vertex in (x, y) format.
+
+        Raises:
+            KeyError: Raised if there is no vertex at the given coordinates.
+        """
+        vertex = self.index_of.pop(point)
+        points = self.points
+        vertices = self.vertices
+        star = self._star(vertex)
+
+        # the polygon around the vertex in counterclockwise order, and for each of its
+        # edges, the triangle on the other side
+        polygon = []
+        outside = []
+        for triangle, i in star:
+            polygon.append(vertices[triangle][(i + 1) % 3])
+            outside.append(self.neighbors[triangle][i])
+
+        created = []
+        while len(polygon) > 3:
+            size = len(polygon)
+            for j in range(size):
+                a, b, c = polygon[j], polygon[(j + 1) % size], polygon[(j + 2) % size]
+                if orientation(points[a], points[b], points[c]) <= 0:
+                    continue
+                if any(in_circumcircle(points[a], points[b], points[c], points[other]) > 0
+                       for other in polygon if other not in (a, b, c)):
+                    continue
+                break
+            else:
+                raise RuntimeError(f"No ear found when removing the vertex at {point}")
+            triangle = self._new_triangle([a, b, c], [outside[(j + 1) % size], None, outside[j]])
+            self._set_neighbor(outside[j], a, b, triangle)
+            self._set_neighbor(outside[(j + 1) % size], b, c, triangle)
+            created.append(triangle)
+            # the edge a, c of the new triangle is now an edge of the polygon
+            del polygon[(j + 1) % size]
+            del outside[(j + 1) % size]
+            outside[j if j + 1 < size else j - 1] = triangle
+        a, b, c = polygon
+        triangle = self._new_triangle([a, b, c], [outside[1], outside[2], outside[0]])
+        self._set_neighbor(outside[0], a, b, triangle)
+        self._set_neighbor(outside[1], b, c, triangle)
+        self._set_neighbor(outside[2], c, a, triangle)
+        created.append(triangle)
+
+        # as in add_vertex, the old triangles are freed only after the new ones are connected
+        for old, _ in star:
+            self._remove_triangle(old)
+        for triangle in created:
+            for corner in vertices[triangle]:
+                self.vertex_triangle[corner] = triangle
+        self.vertex_triangle[vertex] = None
+        self.last = created[-1]
+
+    def edges(self) -> set:
+        """Returns every edge between two vertices that are not part of the supertriangle.
+
+        Returns:
+            set: The edges as pairs of (x, y) coordinates, the smaller coordinates first.
+        """
+        result = set()
+        for triangle_vertices in self.vertices:
+            if triangle_vertices is None:
+                continue
+            for i in range(3):
+                a = triangle_vertices[i]
+                b = triangle_vertices[(i + 1) % 3]
+                if a >= 3 and b >= 3:
+                    result.add((min(self.points[a], self.points[b]),
+                                max(self.points[a], self.points[b])))
+        return result
+
+    def get_triangles(self) -> list:
+        """Returns the triangles of the triangulation, leaving out
+        every triangle that shares a vertex with the supertriangle.
+
+        Returns:
+            list: List of Triangle objects.
+        """
+        vertex_objects = {}
+        triangles = []
+        for triangle_vertices in self.vertices:
+            if triangle_vertices is None or min(triangle_vertices) < 3:
+                continue
+            corners = []
+            for index in triangle_vertices:
+                if index not in vertex_objects:
+                    vertex_objects[index] = Vertex(*self.points[index])
+                corners.append(vertex_objects[index])
+            triangles.append(Triangle(*corners))
+        return triangles
+
+
+def delaunay_triangulation(x_y_coords: list, stats=None) -> list:
+    """Creates a Delaunay triangulation by adding the coordinates to a Triangulation
+    in Hilbert curve order. Returns the same kind of result as bowyer_watson.
+
+    Args:
+        x_y_coords (list): List of (x, y) coordinates (representing rooms)
+        that are added to the triangulation.
+        stats (GenerationStats, optional): If given, the amount of created and removed
+        triangles is added to it. Defaults to None.
+
+    Returns:
+        list: List of triangles that are in the valid Delaunay triangulation.
+    """
+    if len(x_y_coords) < 3:
+        return []
+    triangulation = Triangulation(min(coord[0] for coord in x_y_coords),
+                                  min(coord[1] for coord in x_y_coords),
+                                  max(coord[0] for coord in x_y_coords),
+                                  max(coord[1] for coord in x_y_coords))
+    for coord in spatial_order(x_y_coords):
+        triangulation.add_vertex(coord)
+    if stats is not None:
+        stats.triangles_created += triangulation.triangles_created
+        stats.triangles_destroyed += triangulation.triangles_destroyed
+    return triangulation.get_triangles()
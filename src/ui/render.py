@@ -0,0 +1,58 @@
+"""Turns a map into an image, so it can be drawn with a single matplotlib call."""
+import numpy as np
+
+from entities.map import Map
+
+HALLWAY_COLOR = (1, 0.4, 0.4, 1)
+ROOM_COLOR = (0.3, 0.3, 0.3, 1)
+DOOR_COLOR = (0.3, 0.3, 0.7, 1)
+
+# the grid lines between single cells are only drawn when at most this many cells are visible
+MINOR_GRID_MAX_CELLS = 100
+
+
+def render_map_image(map: Map) -> np.ndarray:
+    """Rasterizes the rooms, doors and hallways of the map into an RGBA image.
+    Empty cells are transparent. Rooms are drawn over hallways, and doors over rooms,
+    like display_map used to draw them. Every cell is written only once
+    even if several hallways go through it.
+
+    Args:
+        map (Map): A Map object containing all the rooms and hallways.
+
+    Returns:
+        np.ndarray: Array of shape (height, width, 4), where image[y, x] is the color of cell (x, y).
+    """
+    width, height = map.get_size()
+    image = np.zeros((height, width, 4))
+
+    # every corridor cell is in map.corridor_cells once, however many hallways use it
+    if map.corridor_cells:
+        coords = np.array(list(map.corridor_cells))
+        image[coords[:, 1], coords[:, 0]] = HALLWAY_COLOR
+
+    for room in map.placed_rooms:
+        x, y = room.bottom_left_coords
+        image[y:y + room.size_y, x:x + room.size_x] = ROOM_COLOR
+    for room in map.placed_rooms:
+        x, y = room.bottom_left_coords
+        image[y, x] = DOOR_COLOR
+    return image
+
+
+def grid_steps(visible_cells: float) -> tuple:
+    """Chooses the distance between major grid lines for the amount of visible cells,
+    and whether grid lines between single cells are drawn.
+
+    Args:
+        visible_cells (float): Width or height of the visible area in cells.
+
+    Returns:
+        tuple: (major step, True if the minor grid is drawn).
+    """
+    major_step = 1
+    for step in (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000):
+        major_step = step
+        if visible_cells / step <= 10:
+            break
+    return major_step, visible_cells <= MINOR_GRID_MAX_CELLS
@@ -1,14 +1,8 @@
 import tkinter as tk
 
-import numpy as np
-from matplotlib import pyplot
-from matplotlib.patches import Rectangle
-
-from entities.hallway import Hallway
 from entities.map import (Map, RoomAmountError, RoomPlacementError,
                           RoomSizeError)
-from entities.room import Room
-from services.generate import NoTrianglesError, generate_dungeon
+from services.worker import GenerationWorker
 from values import (DEFAULT_ARGS, MAX_AMOUNT_OF_ROOMS, MAX_MAP_SIZE_X,
                     MAX_MAP_SIZE_Y)
 
@@ -37,14 +31,24 @@ def validate_int(name: str, checked: str) -> int:
     return checked
 
 
+# how often the generation worker is checked for progress, in milliseconds
+POLL_INTERVAL = 50
+
+STAGE_NAMES = {"place_rooms": "Placing rooms", "triangulation": "Triangulating",
+               "kruskal": "Choosing hallways", "a_star": "Digging hallways"}
+
+
 class UI:
 
     def __init__(self) -> None:
         self.root = tk.Tk()
         self.map = None
+        self.worker = None
         self.error_message = None
         self.run_button_text = tk.StringVar()
+        self.progress_text = tk.StringVar()
         self.create_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.handle_close)
 
     def change_run_button_text(self, text: str):
         self.run_button_text.set(text)
@@ -80,25 +84,76 @@ class UI:
                     f"Map size cannot be larger than {MAX_MAP_SIZE_X}x{MAX_MAP_SIZE_Y}.")
 
             self.change_error_text("")
-            self.change_run_button_text("Loading...")
-            self.root.update_idletasks()
-
             self.map = Map(map_size_x, map_size_y, amount, room_min_size=room_min_size,
                            room_max_size=room_max_size)
-            edges = generate_dungeon(self.map)
-        except (ValueError, RoomAmountError, RoomSizeError, RoomPlacementError, NoTrianglesError) as exception:
+        except (ValueError, RoomAmountError, RoomSizeError, RoomPlacementError) as exception:
             self.change_error_text(exception)
-            self.change_run_button_text("Run")
-            return
-        if not edges:
-            self.change_error_text(
-                "Dungeon cannot be generated with these parameters, try increasing amount of rooms.")
-            self.change_run_button_text("Run")
             return
 
-        display_map(self.map)
+        # the map is generated in a background thread, and the window keeps
+        # responding while poll_generation checks its progress
+        self.worker = GenerationWorker(self.map)
+        self.worker.start()
+        self.change_run_button_text("Loading...")
+        self.run_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.root.after(POLL_INTERVAL, self.poll_generation)
+
+    def handle_cancel_click(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.progress_text.set("Cancelling...")
+
+    def handle_close(self):
+        # the worker thread is a daemon, so it is enough to stop it from working
+        if self.worker is not None:
+            self.worker.cancel()
+        self.root.destroy()
+
+    def finish_generation(self):
+        self.worker = None
+        self.progress_text.set("")
         self.change_run_button_text("Run")
-        self.change_error_text("")
+        self.run_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+
+    def poll_generation(self):
+        """Shows the messages from the generation worker. Runs on the tkinter thread
+        every POLL_INTERVAL milliseconds until generation has finished.
+        """
+        if self.worker is None:
+            return
+        # checked before reading the messages, so a finished thread has sent all of them
+        finished = not self.worker.is_running()
+        for kind, value in self.worker.poll():
+            if kind == "progress":
+                stage, done, total = value
+                text = STAGE_NAMES.get(stage, stage)
+                if stage == "a_star":
+                    text += f" {done}/{total}"
+                self.progress_text.set(text)
+            elif kind == "cancelled":
+                self.finish_generation()
+                self.change_error_text("Generation was cancelled.")
+                return
+            elif kind == "error":
+                self.finish_generation()
+                self.change_error_text(value)
+                return
+            elif kind == "done":
+                self.finish_generation()
+                if not value:
+                    self.change_error_text(
+                        "Dungeon cannot be generated with these parameters, "
+                        "try increasing amount of rooms.")
+                    return
+                display_map(self.map)
+                return
+        if finished:
+            self.finish_generation()
+            self.change_error_text("Generation stopped unexpectedly.")
+            return
+        self.root.after(POLL_INTERVAL, self.poll_generation)
 
     def create_ui(self):
         amount = tk.StringVar(self.root)
@@ -116,6 +171,9 @@ class UI:
                                         room_max_size.get(),
                                         map_size_x.get(),
                                         map_size_y.get()))
+        self.cancel_button = tk.Button(self.root, text="Cancel", state=tk.DISABLED,
+                                       command=self.handle_cancel_click)
+        progress_label = tk.Label(self.root, textvariable=self.progress_text)
 
         amount_label = tk.Label(
             self.root, text=f"Amount of rooms (max: {MAX_AMOUNT_OF_ROOMS})")
@@ -145,17 +203,53 @@ class UI:
         map_size_y_label.pack()
         map_size_y_entry.pack()
         self.run_button.pack()
+        self.cancel_button.pack()
+        progress_label.pack()
 
     def start(self):
         self.root.mainloop()
 
 
+def update_grid(axis) -> None:
+    """Adjusts the ticks and grid lines of the axis to the visible area,
+    so that zooming in shows grid lines between single cells, but a large map
+    is not covered with thousands of lines.
+
+    Args:
+        axis: The matplotlib axis that shows the map.
+    """
+    from matplotlib.ticker import MultipleLocator, NullLocator
+
+    from ui.render import grid_steps
+
+    x_start, x_end = axis.get_xlim()
+    y_start, y_end = axis.get_ylim()
+    major_step, show_minor = grid_steps(max(x_end - x_start, y_end - y_start))
+    for axis_side in (axis.xaxis, axis.yaxis):
+        axis_side.set_major_locator(MultipleLocator(major_step))
+        axis_side.set_minor_locator(MultipleLocator(1) if show_minor else NullLocator())
+    axis.grid(which='major', alpha=0.5)
+    if show_minor:
+        axis.grid(which='minor', alpha=0.2)
+    else:
+        axis.grid(False, which='minor')
+
+
 def display_map(map: Map):
     """Displays a matplotlib graph showing the result of the program.
+    The map is drawn as a single image, so drawing time does not grow
+    with the amount of rooms and hallways.
 
     Args:
         map (Map): A Map object containing all the rooms and hallways.
     """
+    # matplotlib and numpy are imported only when the first map is shown,
+    # because importing them takes longer than starting the rest of the program
+    from matplotlib import pyplot
+    from matplotlib.patches import Rectangle
+
+    from ui.render import render_map_image
+
     pyplot.style.use("Solarize_Light2")
     map_width = map.get_size()[0]
     map_height = map.get_size()[1]
@@ -163,33 +257,14 @@ def display_map(map: Map):
     figure.canvas.manager.set_window_title(
         f"Dungeon {map_width}x{map_height}, {len(map.placed_rooms)} rooms")
     axis = figure.add_subplot(1, 1, 1)
+    axis.imshow(render_map_image(map), origin="lower", interpolation="nearest",
+                extent=(0, map_width, 0, map_height))
     axis.set_aspect('equal')
     axis.set_xlim(0, map_width)
     axis.set_ylim(0, map_height)
-    larger_dimension = max(map_width, map_height)
-    major_ticks = np.arange(0, larger_dimension, 20)
-    minor_ticks = np.arange(0, larger_dimension, 1)
-    axis.set_xticks(major_ticks)
-    axis.set_xticks(minor_ticks, minor=True)
-    axis.set_yticks(major_ticks)
-    axis.set_yticks(minor_ticks, minor=True)
-    axis.grid(which='both')
-    axis.grid(which='minor', alpha=0.2)
-    axis.grid(which='major', alpha=0.5)
-
-    hallway: Hallway
-    for hallway in map.added_hallways:
-        for coord in hallway.coords:
-            square = Rectangle(coord, 1, 1, fc=(1, 0.4, 0.4, 1))
-            axis.add_patch(square)
-
-    room: Room
-    for room in map.placed_rooms:
-        rectangle = Rectangle(room.bottom_left_coords,
-                              room.size_x, room.size_y, fc=(0.3, 0.3, 0.3, 1))
-        door = Rectangle(room.bottom_left_coords, 1, 1, fc=(0.3, 0.3, 0.7, 1))
-        axis.add_patch(rectangle)
-        axis.add_patch(door)
+    update_grid(axis)
+    axis.callbacks.connect("xlim_changed", update_grid)
+    axis.callbacks.connect("ylim_changed", update_grid)
 
     # Adds a rectangle showing the map's limits
     axis.add_patch(Rectangle((0, 0), map.get_size()[
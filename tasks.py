@@ -19,3 +19,20 @@ def test(ctx):
 @task
 def coverage(ctx):
     ctx.run("coverage run --branch -m pytest && coverage report -m")
+
+
+@task
+def bench(ctx, quick=False):
+    options = " --quick" if quick else ""
+    ctx.run("poetry run python src/benchmark.py --baseline benchmarks/baseline.json" +
+            options, pty=True)
+
+
+@task
+def importtime(ctx):
+    ctx.run('cd src && poetry run python -X importtime -c "import core" 2>&1 | tail -n 1')
+
+
+@task
+def memory(ctx, size="500x500", amount=100):
+    ctx.run(f"poetry run python src/memory_report.py --size {size} --amount {amount}", pty=True)